@@ -0,0 +1,81 @@
+"""
+Fake database backend for benchmarks.
+
+Behaves like a real backend from the server's point of view: blocking tools run
+on the database's worker threads, results are tabular and every table is also
+exposed as a resource. The work each call does is simulated so runs measure
+the server, not a database.
+"""
+
+import json
+import time
+from typing import Any, Dict, List
+
+from dbmesh.db.base import DBConfig, db_tool
+from dbmesh.db.results import TabularResult
+
+
+class FakeManager(DBConfig):
+    """
+    In-memory backend serving generated rows.
+
+    Args:
+        tables: Number of tables to expose as resources
+        rows: Rows returned by each query
+        columns: Columns of each row
+        latency: Seconds each query blocks its worker thread
+    """
+
+    name = "fake"
+
+    def __init__(self, tables: int = 10, rows: int = 100, columns: int = 8, latency: float = 0.0) -> None:
+        self.tables = tables
+        self.rows = rows
+        self.columns = columns
+        self.latency = latency
+        self.max_workers = 8
+
+    def setup_connection(self) -> None:
+        return True
+
+    def close_connection(self) -> None:
+        return True
+
+    @db_tool(read_only=True, sql_argument="sql")
+    def query(self, sql: str, limit: int = 0) -> TabularResult:
+        """Return generated rows for any SQL"""
+        if self.latency:
+            time.sleep(self.latency)
+        count = limit or self.rows
+        columns = [f"col_{i}" for i in range(self.columns)]
+        rows = [tuple(f"value_{r}_{c}" if c % 2 else r * c for c in range(self.columns)) for r in range(count)]
+        return TabularResult(columns=columns, rows=rows, types=["int4", "text"] * (self.columns // 2))
+
+    def get_tools(self) -> list:
+        return [(self.query, "fake_query", "Run a query against the fake database")]
+
+    def get_resources(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "uri": self.table_uri(i),
+                "name": f"table_{i}",
+                "description": f"Columns of fake table {i}",
+                "mime_type": "application/json",
+                "fn": self._table_resource(i),
+            }
+            for i in range(self.tables)
+        ]
+
+    def get_prompts(self) -> List[Dict[str, Any]]:
+        return []
+
+    def table_uri(self, index: int) -> str:
+        return f"fake://{self.name}/public/table_{index}"
+
+    def _table_resource(self, index: int):
+        def read() -> str:
+            return json.dumps(
+                {"table": f"table_{index}", "columns": [f"col_{i}" for i in range(self.columns)]}
+            )
+
+        return read
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Benchmark runner for dbmesh.
+
+Drives a DBMeshMCPServer backed by ExampleManager and a fake database with many
+concurrent MCP client sessions and reports latency percentiles, throughput and
+memory for list_tools, call_tool and read_resource. Sessions connect either to
+``sse_app()`` served on a localhost port inside this process, or straight to
+the MCP server over in-memory streams to leave HTTP out of the measurement.
+
+Results are written to ``.dbmesh/benchmarks/<commit>.json`` so runs of
+different commits can be compared with ``--compare``.
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+import anyio
+import uvicorn
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+from mcp.shared.memory import create_connected_server_and_client_session
+
+from dbmesh.benchmarks.backend import FakeManager
+from dbmesh.core.config import DBManager
+from dbmesh.db.example import ExampleManager
+from dbmesh.server import DBMeshMCPServer
+
+RESULTS_DIR = os.path.join(".dbmesh", "benchmarks")
+
+
+class BenchmarkDBManager(DBManager):
+    """DBManager serving the example backend and a fake database."""
+
+    def __init__(self, server: DBMeshMCPServer, fake: FakeManager) -> None:
+        self._fake = fake
+        super().__init__(server)
+
+    def setup(self):
+        self.VALID_DBS.extend([ExampleManager(), self._fake])
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of ``samples``."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(latencies: List[float], elapsed: float, errors: int = 0) -> Dict[str, Any]:
+    """Latency percentiles in milliseconds and throughput of one scenario."""
+    return {
+        "calls": len(latencies),
+        "errors": errors,
+        "calls_per_sec": round(len(latencies) / elapsed, 1) if elapsed > 0 else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def _max_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def build_server(rows: int = 100, tables: int = 10, latency: float = 0.0) -> DBMeshMCPServer:
+    """Server with the example backend and a fake database registered."""
+    # Serve only the benchmark databases, whatever config.yaml is around
+    server = DBMeshMCPServer(
+        "DBMesh-bench", log_level="WARNING", schema_snapshot_path=None, config_path=None, config_reload_interval=0
+    )
+    # Per-request logging would dominate the measurement.
+    logging.getLogger().setLevel(logging.WARNING)
+    BenchmarkDBManager(server, FakeManager(tables=tables, rows=rows, latency=latency))
+    return server
+
+
+@asynccontextmanager
+async def memory_sessions(server: DBMeshMCPServer, count: int) -> AsyncIterator[List[ClientSession]]:
+    """Client sessions connected to ``server`` over in-memory streams."""
+    async with server._app_lifespan(None):  # type: ignore[reportPrivateUsage]
+        async with _open_sessions(
+            count, lambda: create_connected_server_and_client_session(server._mcp_server)  # type: ignore[reportPrivateUsage]
+        ) as sessions:
+            yield sessions
+
+
+@asynccontextmanager
+async def sse_sessions(server: DBMeshMCPServer, count: int) -> AsyncIterator[List[ClientSession]]:
+    """Client sessions connected to ``server.sse_app()`` served on a localhost port."""
+    # Server-side SSE sessions outlive their clients in this mcp version and are
+    # cut off by the graceful shutdown timeout; keep uvicorn quiet about it.
+    config = uvicorn.Config(
+        server.sse_app(), host="127.0.0.1", port=0, log_level="critical", timeout_graceful_shutdown=1
+    )
+    http = uvicorn.Server(config)
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(http.serve)
+        while not http.started:
+            await anyio.sleep(0.01)
+        port = http.servers[0].sockets[0].getsockname()[1]
+        url = f"http://127.0.0.1:{port}{server.settings.sse_path}"
+
+        @asynccontextmanager
+        async def connect():
+            async with sse_client(url) as streams:
+                async with ClientSession(*streams) as session:
+                    await session.initialize()
+                    yield session
+
+        try:
+            async with _open_sessions(count, connect) as sessions:
+                yield sessions
+        finally:
+            http.should_exit = True
+
+
+@asynccontextmanager
+async def _open_sessions(count: int, connect: Callable[[], Any]) -> AsyncIterator[List[ClientSession]]:
+    async with AsyncExitStack() as stack:
+        sessions = [await stack.enter_async_context(connect()) for _ in range(count)]
+        yield sessions
+
+
+async def run_scenario(
+    sessions: List[ClientSession],
+    calls: int,
+    call: Callable[[ClientSession, int], Awaitable[Any]],
+) -> Dict[str, Any]:
+    """Issue ``calls`` calls from every session concurrently and summarize them."""
+    latencies: List[float] = []
+    errors = 0
+
+    async def client(session: ClientSession) -> None:
+        nonlocal errors
+        for i in range(calls):
+            start = time.perf_counter()
+            try:
+                result = await call(session, i)
+            except Exception:
+                errors += 1
+                continue
+            if getattr(result, "isError", False):
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    async with anyio.create_task_group() as tg:
+        for session in sessions:
+            tg.start_soon(client, session)
+    return summarize(latencies, time.perf_counter() - start, errors)
+
+
+def scenarios(tables: int) -> Dict[str, Callable[[ClientSession, int], Awaitable[Any]]]:
+    """The measured operations, keyed by name."""
+    uris = [FakeManager(tables=tables).table_uri(i) for i in range(tables)]
+    return {
+        "list_tools": lambda session, i: session.list_tools(),
+        "call_tool:add": lambda session, i: session.call_tool("add", {"a": i, "b": 1}),
+        "call_tool:fake_query": lambda session, i: session.call_tool(
+            "fake_query", {"sql": f"SELECT {i % 10} FROM bench"}
+        ),
+        "read_resource": lambda session, i: session.read_resource(uris[i % len(uris)]),
+    }
+
+
+async def run_benchmarks(
+    transport: str = "sse",
+    clients: int = 10,
+    calls: int = 100,
+    rows: int = 100,
+    tables: int = 10,
+    latency: float = 0.0,
+    trace_memory: bool = False,
+    only: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Run every scenario against a fresh server.
+
+    Args:
+        transport: "sse" for HTTP on localhost, "memory" for in-memory streams
+        clients: Concurrent client sessions
+        calls: Calls per session per scenario
+        rows: Rows returned by each fake query
+        tables: Fake tables exposed as resources
+        latency: Seconds each fake query blocks a worker thread
+        trace_memory: Record the peak Python allocation of each scenario
+        only: Names of the scenarios to run, all when None
+
+    Returns:
+        Run parameters and one summary per scenario
+    """
+    server = build_server(rows=rows, tables=tables, latency=latency)
+    open_sessions = sse_sessions if transport == "sse" else memory_sessions
+    results: Dict[str, Any] = {}
+    async with open_sessions(server, clients) as sessions:
+        for name, call in scenarios(tables).items():
+            if only and name not in only:
+                continue
+            # One untimed call per session warms caches and lazy imports.
+            await run_scenario(sessions, 1, call)
+            if trace_memory:
+                tracemalloc.start()
+            summary = await run_scenario(sessions, calls, call)
+            if trace_memory:
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                summary["peak_alloc_mb"] = round(peak / (1024 * 1024), 2)
+            summary["max_rss_mb"] = _max_rss_mb()
+            results[name] = summary
+    return {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": sys.version.split()[0],
+        "params": {
+            "transport": transport,
+            "clients": clients,
+            "calls": calls,
+            "rows": rows,
+            "tables": tables,
+            "latency": latency,
+        },
+        "results": results,
+    }
+
+
+def git_commit() -> str:
+    """Short hash of the checked-out commit, marked dirty with local changes."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{commit}-dirty" if dirty else commit
+
+
+def save_results(report: Dict[str, Any], directory: str = RESULTS_DIR) -> str:
+    """Write ``report`` to ``<directory>/<commit>.json`` and return the path."""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{report['commit']}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+def format_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> str:
+    """Render ``report`` as a table, with changes against ``baseline`` if given."""
+    header = f"{'scenario':<22}{'calls/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}{'rss MB':>9}"
+    lines = [f"commit {report['commit']}  {report['params']}", header]
+    for name, summary in report["results"].items():
+        line = (
+            f"{name:<22}{summary['calls_per_sec']:>10}{summary['p50_ms']:>10}"
+            f"{summary['p95_ms']:>10}{summary['p99_ms']:>10}{summary['errors']:>8}{summary['max_rss_mb']:>9}"
+        )
+        if "peak_alloc_mb" in summary:
+            line += f"  alloc {summary['peak_alloc_mb']} MB"
+        lines.append(line)
+        previous = (baseline or {}).get("results", {}).get(name)
+        if previous:
+            lines.append(
+                f"{'  vs ' + baseline['commit']:<22}{_change(previous['calls_per_sec'], summary['calls_per_sec']):>10}"
+                f"{_change(previous['p50_ms'], summary['p50_ms']):>10}"
+                f"{_change(previous['p95_ms'], summary['p95_ms']):>10}"
+                f"{_change(previous['p99_ms'], summary['p99_ms']):>10}"
+            )
+    return "\n".join(lines)
+
+
+def _change(before: float, after: float) -> str:
+    if not before:
+        return "-"
+    return f"{(after - before) / before * 100:+.1f}%"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transport", choices=["sse", "memory"], default="sse")
+    parser.add_argument("--clients", type=int, default=10, help="concurrent client sessions")
+    parser.add_argument("--calls", type=int, default=100, help="calls per session per scenario")
+    parser.add_argument("--rows", type=int, default=100, help="rows returned by each fake query")
+    parser.add_argument("--tables", type=int, default=10, help="fake tables exposed as resources")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds each fake query blocks")
+    parser.add_argument("--trace-memory", action="store_true", help="record peak allocations (slower)")
+    parser.add_argument("--only", action="append", help="run only this scenario (repeatable)")
+    parser.add_argument("--compare", help="results file of an earlier run to compare against")
+    parser.add_argument("--no-save", action="store_true", help="do not write results to disk")
+    args = parser.parse_args(argv)
+
+    report = anyio.run(
+        lambda: run_benchmarks(
+            transport=args.transport,
+            clients=args.clients,
+            calls=args.calls,
+            rows=args.rows,
+            tables=args.tables,
+            latency=args.latency,
+            trace_memory=args.trace_memory,
+            only=args.only,
+        )
+    )
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print(format_report(report, baseline))
+    if not args.no_save:
+        print(f"Saved results to {save_results(report)}")
+    errors = sum(summary["errors"] for summary in report["results"].values())
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for dbmesh.
+
+Imports ``dbmesh.server`` in fresh interpreters, which builds the server and
+its databases from a configuration file, and reports how long that takes, how
+many modules it loads, which backend modules were imported and the slowest
+modules according to ``python -X importtime``. Databases are not connected.
+
+Results are written to ``.dbmesh/benchmarks/startup/<commit>.json`` so runs of
+different commits can be compared with ``--compare``.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from dbmesh.benchmarks.run_benchmarks import RESULTS_DIR, _change, git_commit, save_results
+
+STARTUP_RESULTS_DIR = os.path.join(RESULTS_DIR, "startup")
+
+# Runs in the child interpreter; prints its measurements as JSON on the last line
+_CHILD = """
+import json, sys, time
+start = time.perf_counter()
+import dbmesh.server
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    "seconds": elapsed,
+    "modules": len(sys.modules),
+    "backends": sorted(name for name in sys.modules if name.startswith("dbmesh.db.")),
+    "databases": [db.database_name for db in dbmesh.server.db_manager.VALID_DBS],
+}))
+"""
+
+
+def parse_importtime(output: str) -> Dict[str, int]:
+    """Self import time in microseconds per module from ``-X importtime`` output."""
+    times: Dict[str, int] = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        times[fields[2].strip()] = int(fields[0])
+    return times
+
+
+def measure_startup(config_path: Optional[str] = None) -> Dict[str, Any]:
+    """Import ``dbmesh.server`` once in a fresh interpreter and return its measurements."""
+    env = dict(os.environ)
+    env["DBMESH_CONFIG_PATH"] = config_path or ""
+    env["DBMESH_SCHEMA_SNAPSHOT_PATH"] = ""
+    env["DBMESH_LOG_LEVEL"] = "WARNING"
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _CHILD], capture_output=True, text=True, env=env
+    )
+    wall = time.perf_counter() - start
+    if completed.returncode != 0:
+        raise RuntimeError(f"dbmesh failed to start:\n{completed.stderr[-2000:]}")
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["wall_seconds"] = wall
+    result["import_times"] = parse_importtime(completed.stderr)
+    return result
+
+
+def run_startup_benchmark(runs: int = 10, config_path: Optional[str] = None, top: int = 10) -> Dict[str, Any]:
+    """
+    Measure startup ``runs`` times.
+
+    Args:
+        runs: Fresh interpreters to start
+        config_path: Database configuration file; None serves the default databases
+        top: Slowest modules to report
+
+    Returns:
+        Run parameters, median and spread of the timings, and the slowest modules
+    """
+    samples = [measure_startup(config_path) for _ in range(runs)]
+    seconds = [sample["seconds"] for sample in samples]
+    # Median self time per module across runs
+    modules = set().union(*(sample["import_times"] for sample in samples))
+    self_times = {
+        name: statistics.median(sample["import_times"].get(name, 0) for sample in samples) for name in modules
+    }
+    slowest = sorted(self_times.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": sys.version.split()[0],
+        "params": {"runs": runs, "config_path": config_path},
+        "results": {
+            "startup": {
+                "median_ms": round(statistics.median(seconds) * 1000, 1),
+                "min_ms": round(min(seconds) * 1000, 1),
+                "max_ms": round(max(seconds) * 1000, 1),
+                "process_ms": round(statistics.median(s["wall_seconds"] for s in samples) * 1000, 1),
+                "modules": samples[-1]["modules"],
+                "backends": samples[-1]["backends"],
+                "databases": samples[-1]["databases"],
+                "slowest_modules_ms": {name: round(us / 1000, 1) for name, us in slowest},
+            }
+        },
+    }
+
+
+def format_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> str:
+    """Render ``report`` as text, with changes against ``baseline`` if given."""
+    summary = report["results"]["startup"]
+    lines = [
+        f"commit {report['commit']}  {report['params']}",
+        f"import dbmesh.server  median {summary['median_ms']} ms  min {summary['min_ms']} ms  "
+        f"max {summary['max_ms']} ms  process {summary['process_ms']} ms  modules {summary['modules']}",
+    ]
+    previous = (baseline or {}).get("results", {}).get("startup")
+    if previous:
+        lines.append(
+            f"  vs {baseline['commit']}  median {_change(previous['median_ms'], summary['median_ms'])}  "
+            f"modules {_change(previous['modules'], summary['modules'])}"
+        )
+    lines.append(f"databases {', '.join(summary['databases'])}")
+    lines.append(f"backend modules {', '.join(summary['backends'])}")
+    lines.append("slowest modules (self ms):")
+    lines.extend(f"  {ms:>8}  {name}" for name, ms in summary["slowest_modules_ms"].items())
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10, help="fresh interpreters to start")
+    parser.add_argument("--config", help="database configuration file (default: example backend only)")
+    parser.add_argument("--top", type=int, default=10, help="slowest modules to list")
+    parser.add_argument("--compare", help="results file of an earlier run to compare against")
+    parser.add_argument("--no-save", action="store_true", help="do not write results to disk")
+    args = parser.parse_args(argv)
+
+    report = run_startup_benchmark(runs=args.runs, config_path=args.config, top=args.top)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print(format_report(report, baseline))
+    if not args.no_save:
+        print(f"Saved results to {save_results(report, STARTUP_RESULTS_DIR)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
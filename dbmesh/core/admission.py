@@ -0,0 +1,228 @@
+"""
+Per-client admission control for tool calls.
+
+Each client gets a token bucket limiting its call rate and a cap on its
+concurrent calls. Calls that cannot start right away wait in a bounded queue
+and are dispatched in weighted fair order, so a chatty client waits behind its
+own backlog rather than in front of everyone else's. Calls are rejected at once
+when the client is over its rate or the queue is full, and after
+``queue_timeout`` seconds of waiting. Idle clients are forgotten once their
+bucket would have refilled, or when the caller reports them gone.
+"""
+
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Optional, Set
+
+import anyio
+
+
+class AdmissionRejected(Exception):
+    """Raised when a call is not admitted.
+
+    Attributes:
+        reason: "rate", "queue_full" or "queue_timeout"
+    """
+
+    def __init__(self, message: str, reason: str) -> None:
+        super().__init__(message)
+        self.reason = reason
+
+
+class _Waiter:
+    __slots__ = ("tag", "event", "admitted")
+
+    def __init__(self, tag: float) -> None:
+        self.tag = tag
+        self.event = anyio.Event()
+        self.admitted = False
+
+
+class _Client:
+    def __init__(self, weight: float, burst: float) -> None:
+        self.weight = weight
+        self.tokens = burst
+        self.refilled = time.monotonic()
+        self.running = 0
+        # Virtual finish time of the client's most recently queued call
+        self.finish_tag = 0.0
+        self.waiting: Deque[_Waiter] = deque()
+
+
+class AdmissionController:
+    """
+    Admission control keyed by client.
+
+    Args:
+        max_concurrent: Calls running at once across all clients; 0 is unlimited
+        max_per_client: Calls one client may run at once; 0 is unlimited
+        rate: Calls per second each client may start; 0 is unlimited
+        burst: Calls a client may start at once before ``rate`` applies
+        max_queue: Calls that may wait for a slot across all clients
+        queue_timeout: Seconds a call may wait before it is rejected
+        weights: Share of each client relative to the default weight of 1
+    """
+
+    def __init__(
+        self,
+        *,
+        max_concurrent: int = 0,
+        max_per_client: int = 0,
+        rate: float = 0.0,
+        burst: int = 10,
+        max_queue: int = 100,
+        queue_timeout: float = 10.0,
+        weights: Optional[Dict[str, float]] = None,
+    ) -> None:
+        self.max_concurrent = max_concurrent
+        self.max_per_client = max_per_client
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.weights = weights or {}
+        self._clients: Dict[str, _Client] = {}
+        self._backlogged: Set[str] = set()
+        self._running = 0
+        self._queued = 0
+        self._virtual_time = 0.0
+        self._last_sweep = time.monotonic()
+
+    @property
+    def running(self) -> int:
+        return self._running
+
+    @property
+    def queued(self) -> int:
+        return self._queued
+
+    def forget(self, client: str) -> None:
+        """Drop the state of a client that is gone, e.g. a closed session, unless it still has calls."""
+        state = self._clients.get(client)
+        if state is not None and not state.running and not state.waiting:
+            del self._clients[client]
+
+    @asynccontextmanager
+    async def admit(self, client: str) -> AsyncIterator[None]:
+        """
+        Hold a slot for ``client`` for the duration of the block.
+
+        Raises:
+            AdmissionRejected: The call was not admitted
+        """
+        await self._acquire(client)
+        try:
+            yield
+        finally:
+            self._release(client)
+
+    async def _acquire(self, key: str) -> None:
+        self._sweep()
+        client = self._clients.get(key)
+        if client is None:
+            client = self._clients[key] = _Client(self.weights.get(key, 1.0), self.burst)
+        if self.rate > 0:
+            self._refill(client)
+            if client.tokens < 1:
+                self._forget_if_idle(key, client)
+                raise AdmissionRejected(
+                    f"Rate limit of {self.rate:g} calls/s exceeded; retry later", "rate"
+                )
+            client.tokens -= 1
+
+        waiter = _Waiter(max(self._virtual_time, client.finish_tag) + 1 / client.weight)
+        client.finish_tag = waiter.tag
+        client.waiting.append(waiter)
+        self._backlogged.add(key)
+        self._queued += 1
+        self._dispatch()
+        if waiter.admitted:
+            return
+        if self._queued > self.max_queue:
+            self._dequeue(key, client, waiter)
+            self._forget_if_idle(key, client)
+            raise AdmissionRejected("Server is overloaded; too many calls are queued", "queue_full")
+
+        try:
+            with anyio.fail_after(self.queue_timeout):
+                await waiter.event.wait()
+        except TimeoutError:
+            if waiter.admitted:
+                return
+            self._dequeue(key, client, waiter)
+            self._forget_if_idle(key, client)
+            raise AdmissionRejected(
+                f"Timed out after {self.queue_timeout:g}s waiting for a free slot", "queue_timeout"
+            ) from None
+        except BaseException:
+            if waiter.admitted:
+                self._release(key)
+            else:
+                self._dequeue(key, client, waiter)
+                self._forget_if_idle(key, client)
+            raise
+
+    def _release(self, key: str) -> None:
+        client = self._clients[key]
+        client.running -= 1
+        self._running -= 1
+        self._dispatch()
+        self._forget_if_idle(key, client)
+
+    def _dispatch(self) -> None:
+        """Start queued calls in virtual finish time order while slots are free."""
+        while self._backlogged and (not self.max_concurrent or self._running < self.max_concurrent):
+            best_key = None
+            best = None
+            for key in self._backlogged:
+                client = self._clients[key]
+                if self.max_per_client and client.running >= self.max_per_client:
+                    continue
+                if best is None or client.waiting[0].tag < best.waiting[0].tag:
+                    best_key, best = key, client
+            if best is None:
+                return
+            waiter = best.waiting.popleft()
+            if not best.waiting:
+                self._backlogged.discard(best_key)
+            self._queued -= 1
+            self._virtual_time = waiter.tag
+            best.running += 1
+            self._running += 1
+            waiter.admitted = True
+            waiter.event.set()
+
+    def _dequeue(self, key: str, client: _Client, waiter: _Waiter) -> None:
+        client.waiting.remove(waiter)
+        if not client.waiting:
+            self._backlogged.discard(key)
+        self._queued -= 1
+
+    def _refill(self, client: _Client) -> None:
+        now = time.monotonic()
+        client.tokens = min(self.burst, client.tokens + (now - client.refilled) * self.rate)
+        client.refilled = now
+
+    def _sweep(self) -> None:
+        """Forget idle clients whose bucket has refilled since their last call."""
+        now = time.monotonic()
+        # A bucket refills completely in burst / rate seconds
+        if self.rate <= 0 or now - self._last_sweep < self.burst / self.rate:
+            return
+        self._last_sweep = now
+        for key, client in list(self._clients.items()):
+            if client.running or client.waiting:
+                continue
+            if client.tokens + (now - client.refilled) * self.rate >= self.burst:
+                del self._clients[key]
+
+    def _forget_if_idle(self, key: str, client: _Client) -> None:
+        # An idle client with a full bucket is indistinguishable from a new one.
+        if client.running or client.waiting:
+            return
+        if self.rate > 0:
+            self._refill(client)
+            if client.tokens < self.burst:
+                return
+        self._clients.pop(key, None)
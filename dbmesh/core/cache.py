@@ -0,0 +1,157 @@
+"""
+Result cache for read-only tool calls.
+
+Entries are keyed on the tool name plus canonicalized arguments, bounded by an
+LRU entry limit, expire after their database's TTL and are tagged with the
+tables they read so a write to a table only drops the results that depend on it.
+Results whose tables are unknown are dropped by a write to any table of their
+database.
+"""
+
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Set, Tuple
+
+from dbmesh.db.sql import normalize_sql
+
+# Stands in for the tables of results that could depend on any table; no
+# table is named by an empty string
+_ANY = ""
+_ANY_TABLE = frozenset({_ANY})
+
+
+def cache_key(tool: str, arguments: Dict[str, Any], sql_argument: Optional[str] = None) -> str:
+    """Canonical cache key for a tool call."""
+    if sql_argument and isinstance(arguments.get(sql_argument), str):
+        arguments = {**arguments, sql_argument: normalize_sql(arguments[sql_argument])}
+    return tool + ":" + json.dumps(arguments, sort_keys=True, separators=(",", ":"), default=str)
+
+
+@dataclass
+class _Entry:
+    value: Any
+    expires: float
+    database: str
+    tables: FrozenSet[str]
+
+
+class ResultCache:
+    """
+    Size-bounded LRU cache with per-entry TTL and table-level invalidation.
+
+    Args:
+        max_entries: Maximum number of cached results
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._by_table: Dict[Tuple[str, str], Set[str]] = {}
+        self._generations: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a fresh cached value or None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.expires <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.value
+
+    def generation(self, database: str) -> int:
+        """Invalidation counter of ``database``; pass it back to ``put``."""
+        return self._generations.get(database, 0)
+
+    def put(
+        self,
+        key: str,
+        value: Any,
+        *,
+        database: str,
+        tables: Iterable[str],
+        ttl: float,
+        generation: Optional[int] = None,
+    ) -> None:
+        """
+        Cache ``value`` for ``ttl`` seconds.
+
+        Args:
+            key: Key from ``cache_key``
+            value: Result to cache
+            database: Database the result was read from
+            tables: Tables the result depends on; none makes it depend on the
+                whole database, so a write to any of its tables drops it
+            ttl: Seconds until the entry expires
+            generation: Value of ``generation(database)`` taken before the read;
+                the result is discarded if a write invalidated the database since
+        """
+        if generation is not None and generation != self.generation(database):
+            return
+        if key in self._entries:
+            self._remove(key)
+        tables = frozenset(tables) or _ANY_TABLE
+        self._entries[key] = _Entry(value, time.monotonic() + ttl, database, tables)
+        for table in tables:
+            self._by_table.setdefault((database, table), set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def invalidate(self, database: str, tables: Optional[Iterable[str]] = None) -> int:
+        """
+        Drop cached results of ``database`` that depend on ``tables``.
+
+        Args:
+            database: Database that was written to
+            tables: Tables written to; None drops every result of the database
+
+        Returns:
+            Number of entries dropped
+        """
+        self._generations[database] = self.generation(database) + 1
+        if tables is None:
+            keys = [key for key, entry in self._entries.items() if entry.database == database]
+        else:
+            keys = set(self._by_table.get((database, _ANY), set()))
+            for table in tables:
+                keys |= self._by_table.get((database, table), set())
+        for key in keys:
+            self._remove(key)
+        self.invalidations += len(keys)
+        return len(keys)
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters for tuning the cache."""
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for table in entry.tables:
+            keys = self._by_table.get((entry.database, table))
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_table[(entry.database, table)]
@@ -1,23 +1,553 @@
-from db.postgres import PostgresManager
-from db.example import ExampleManager
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Literal, Optional
+
+import anyio
+import anyio.abc
+import anyio.to_thread
+from mcp.server.fastmcp import Context
+from mcp.server.fastmcp.resources import FunctionResource
+from mcp.server.fastmcp.utilities.logging import get_logger
+
+from dbmesh.core.federation import fan_out, merge
+from dbmesh.core.registry import BackendRegistry, load_database_config
+from dbmesh.core.snapshot import load_snapshot, save_snapshot
+from dbmesh.db.base import ToolAccess
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class DatabaseStatus:
+    """Availability of one database as last seen by its bring-up or health check."""
+
+    state: Literal["connecting", "healthy", "degraded"] = "connecting"
+    error: Optional[str] = None
+    # Whether the connections are set up; degraded databases without them are brought up again
+    connected: bool = False
+    # Failed attempts in a row, which space out the retries
+    failures: int = 0
+    since: float = field(default_factory=time.time)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"state": self.state, "error": self.error, "since": self.since}
+
 
-DB_CLASS_MANAGER_MAP = {
-    "postgres": PostgresManager,
-    "example": ExampleManager,
-}
 class DBManager:
-    def __init__(self, server) -> None:
+    # Seconds between incremental schema refreshes
+    SCHEMA_REFRESH_INTERVAL = 60.0
+    # Seconds between database health checks
+    HEALTH_CHECK_INTERVAL = 5.0
+    # Longest pause between retries of a degraded database
+    HEALTH_CHECK_MAX_BACKOFF = 60.0
+
+    def __init__(self, server, registry: Optional[BackendRegistry] = None) -> None:
         self._server = server
+        self.registry = registry or BackendRegistry()
         self.VALID_DBS = []
+        self.status: Dict[str, DatabaseStatus] = {}
+        self.snapshot_path = server.settings.schema_snapshot_path
+        # Settings and instance of every database by configuration entry, and
+        # the modification stamp of the file they were read from
+        self._config: Dict[str, Dict[str, Any]] = {}
+        self._config_stamp: Optional[tuple] = None
+        self._databases: Dict[str, Any] = {}
+        self._workers = 1
+        self._reload_lock = anyio.Lock()
+        self._task_group: Optional[anyio.abc.TaskGroup] = None
+        self._health_checks: Dict[int, anyio.CancelScope] = {}
         self.setup()
+        self.load_snapshot()
         self.add_all_tools()
+        self.add_federated_tools()
+        self.add_all_resources()
+        self.add_all_resource_templates()
+        server.add_lifespan(self.lifespan)
+        server.add_worker_initializer(self.init_worker)
+        server.metrics.add_collector(self.collect_metrics)
 
     def setup(self):
-        available_dbs = ["example"]
-        for db_type in available_dbs:
-            self.VALID_DBS.append(DB_CLASS_MANAGER_MAP[db_type]())
+        """Create the databases of the configuration file; only their backends are imported."""
+        config_path = self._server.settings.config_path
+        self._config_stamp = _file_stamp(config_path)
+        self._config = load_database_config(config_path)
+        for key, options in self._config.items():
+            self._databases[key] = self.registry.create(key, options)
+            self.VALID_DBS.append(self._databases[key])
+
+    def init_worker(self, index: int, workers: int):
+        """Give this worker process its share of every database's connections."""
+        self._workers = workers
+        for db_config_manager in self.VALID_DBS:
+            db_config_manager.share_connections(workers)
+        if index:
+            # The first worker keeps the shared schema snapshot up to date
+            self.snapshot_path = None
+
+    def load_snapshot(self):
+        """Restore introspected schemas from disk so tools are served before the first refresh."""
+        if not self.snapshot_path:
+            return
+        snapshot = load_snapshot(self.snapshot_path)
+        for db_config_manager in self.VALID_DBS:
+            data = snapshot.get(db_config_manager.snapshot_key())
+            if data is not None:
+                db_config_manager.load_schema_snapshot(data)
+
+    def save_snapshot(self):
+        """Persist every database's introspected schema to disk."""
+        databases = {}
+        for db_config_manager in self.VALID_DBS:
+            data = db_config_manager.dump_schema_snapshot()
+            if data is not None:
+                databases[db_config_manager.snapshot_key()] = data
+        if databases:
+            save_snapshot(self.snapshot_path, databases)
 
     def add_all_tools(self):
         for db_config_manager in self.VALID_DBS:
-            for tool_fn, name, des in db_config_manager.get_tools():
-                self._server.add_tool(tool_fn, name, des)
+            self._add_tools(db_config_manager, db_config_manager.get_tools())
+
+    def _register(self, db_config_manager):
+        """Register the tools, resources and resource templates of one database."""
+        self._add_tools(db_config_manager, db_config_manager.get_tools())
+        self._add_resources(db_config_manager, db_config_manager.get_resources())
+        for template in db_config_manager.get_resource_templates():
+            self._server.add_resource_template(**template, database=db_config_manager.database_name)
+
+    def add_federated_tools(self):
+        """Register the fan-out query tool when any database accepts SQL."""
+        names = [db.database_name for db in self.VALID_DBS if db.supports_federated_query]
+        if not names:
+            return
+        self._server.add_tool(
+            self.federated_query,
+            "federated_query",
+            "Run the same read-only SQL query concurrently on several databases and merge "
+            f"the rows, tagged with their database in the _shard column. Databases: {', '.join(names)}",
+            # Shards span databases, so results are coalesced but never cached
+            access=ToolAccess(read_only=True, sql_argument="sql"),
+        )
+
+    async def federated_query(
+        self,
+        sql: str,
+        params: Optional[List[Any]] = None,
+        databases: Optional[List[str]] = None,
+        order_by: Optional[List[str]] = None,
+        descending: bool = False,
+        limit: Optional[int] = None,
+        timeout: Optional[float] = None,
+        ctx: Context = None,
+    ):
+        """
+        Run a read-only query on several databases and merge the rows.
+
+        Databases that fail or run longer than the shard timeout are reported
+        under ``shards`` and the result is marked ``partial``.
+
+        Args:
+            sql: Query to run on every database
+            params: Query parameters
+            databases: Databases to query; all that accept SQL by default
+            order_by: Columns to merge-sort the rows by
+            descending: Sort from largest to smallest
+            limit: Return at most this many rows, the top ones with ``order_by``
+            timeout: Seconds each database may take, at most the configured shard timeout
+        """
+        shards = {db.database_name: db for db in self.VALID_DBS if db.supports_federated_query}
+        if databases:
+            unknown = [name for name in databases if name not in shards]
+            if unknown:
+                raise ValueError(f"Unknown databases: {', '.join(unknown)}; available: {', '.join(shards)}")
+            shards = {name: shards[name] for name in databases}
+        if limit is not None and limit < 0:
+            raise ValueError("limit must not be negative")
+        settings = self._server.settings
+        shard_timeout = settings.fan_out_shard_timeout or None
+        if timeout is not None and timeout > 0:
+            shard_timeout = min(timeout, shard_timeout) if shard_timeout else timeout
+
+        async def on_done(done: int, total: int) -> None:
+            if ctx is not None:
+                try:
+                    await ctx.report_progress(done, total)
+                except ValueError:
+                    # Called outside of a request
+                    pass
+
+        results, outcomes = await fan_out(
+            {
+                name: (lambda db=db: db.federated_query(sql, params, order_by, descending, limit))
+                for name, db in shards.items()
+            },
+            max_concurrency=settings.fan_out_max_concurrency,
+            timeout=shard_timeout,
+            on_done=on_done,
+        )
+        result = merge(results, outcomes, order_by=order_by, descending=descending, limit=limit)
+        for name, outcome in outcomes.items():
+            self._server.metrics.fan_out_shards.inc(database=name, status=outcome.status)
+            if outcome.status != "ok":
+                logger.warning(f"Federated query shard {name} {outcome.status}: {outcome.error}")
+        return result
+
+    def add_all_resources(self):
+        for db_config_manager in self.VALID_DBS:
+            self._add_resources(db_config_manager, db_config_manager.get_resources())
+
+    def add_all_resource_templates(self):
+        for db_config_manager in self.VALID_DBS:
+            for template in db_config_manager.get_resource_templates():
+                self._server.add_resource_template(**template, database=db_config_manager.database_name)
+
+    def _add_tools(self, db_config_manager, tools):
+        for tool_fn, name, des in tools:
+            self._server.add_tool(
+                db_config_manager.as_async_tool(tool_fn),
+                name,
+                des,
+                access=db_config_manager.tool_access(tool_fn, name),
+            )
+
+    def _add_resources(self, db_config_manager, resources):
+        for resource in resources:
+            self._server.add_resource(
+                FunctionResource(**resource), database=db_config_manager.database_name
+            )
+
+    async def connect_all(self):
+        """
+        Connect and warm every database concurrently, each within its connect
+        timeout. Databases that fail are marked degraded and left to the health
+        checks instead of failing startup. Schemas are revalidated afterwards in
+        the background, so tools restored from the snapshot are served meanwhile.
+        """
+        async with anyio.create_task_group() as tg:
+            for db_config_manager in self.VALID_DBS:
+                tg.start_soon(self._bring_up, db_config_manager)
+        healthy = sum(status.state == "healthy" for status in self.status.values())
+        logger.info(f"{healthy} of {len(self.VALID_DBS)} databases connected")
+
+    async def _bring_up(self, db_config_manager) -> bool:
+        """Set up the connections of one database; returns whether it connected."""
+        name = db_config_manager.database_name
+        status = self.status.setdefault(name, DatabaseStatus())
+        timeout = self._connect_timeout(db_config_manager)
+        try:
+            with anyio.fail_after(timeout):
+                await db_config_manager.asetup_connection()
+        except Exception as e:
+            self._set_status(db_config_manager, "degraded", _describe(e, timeout))
+            try:
+                await db_config_manager.aclose_connection()
+            except Exception as close_error:
+                logger.warning(f"Failed to close connections of {name}: {close_error}")
+            return False
+        status.connected = True
+        self._set_status(db_config_manager, "healthy")
+        return True
+
+    async def _introspect(self, db_config_manager, register: bool = True) -> bool:
+        """
+        Refresh the schema of one connected database; returns whether its tools
+        or resources changed. Without ``register`` the changes are left for the
+        caller to register. Failures leave the database usable; the periodic
+        refresh retries them.
+        """
+        try:
+            changes = await db_config_manager.refresh_schema()
+        except Exception as e:
+            logger.error(f"Schema refresh failed for {db_config_manager.database_name}: {e}")
+            return False
+        return self._apply_changes(db_config_manager, changes) if register else bool(changes)
+
+    def _connect_timeout(self, db_config_manager) -> Optional[float]:
+        timeout = getattr(db_config_manager, "connect_timeout", None)
+        return timeout or self._server.settings.database_connect_timeout or None
+
+    def _set_status(self, db_config_manager, state: str, error: Optional[str] = None):
+        name = db_config_manager.database_name
+        status = self.status.setdefault(name, DatabaseStatus())
+        if state == "degraded":
+            status.failures += 1
+            if status.state != "degraded":
+                logger.warning(f"Database {name} is degraded: {error}")
+        else:
+            status.failures = 0
+            if status.state == "degraded":
+                logger.info(f"Database {name} is available again")
+        if state != status.state:
+            status.since = time.time()
+        status.state = state
+        status.error = error
+        self._server.metrics.database_up.set(1 if state == "healthy" else 0, database=name)
+
+    def health(self) -> Dict[str, Dict[str, Any]]:
+        """Status of every database by name."""
+        return {name: status.to_dict() for name, status in self.status.items()}
+
+    async def close_all(self):
+        for db_config_manager in self.VALID_DBS:
+            await db_config_manager.aclose_connection()
+
+    def collect_metrics(self):
+        """Report connection pool usage of every database."""
+        for db_config_manager in self.VALID_DBS:
+            stats = db_config_manager.pool_stats()
+            if stats is not None:
+                self._server.metrics.observe_pool(db_config_manager.database_name, stats)
+
+    async def refresh_schemas(self):
+        """Apply schema changes of every available database to the registered tools and resources."""
+        changed = False
+
+        async def refresh(db_config_manager):
+            nonlocal changed
+            changed = await self._introspect(db_config_manager) or changed
+
+        async with anyio.create_task_group() as tg:
+            for db_config_manager in self.VALID_DBS:
+                status = self.status.get(db_config_manager.database_name)
+                if status is None or (status.connected and status.state != "degraded"):
+                    tg.start_soon(refresh, db_config_manager)
+        if changed:
+            await self._save_snapshot()
+
+    def _apply_changes(self, db_config_manager, changes) -> bool:
+        if not changes or not any(db is db_config_manager for db in self.VALID_DBS):
+            # Nothing changed, or the database was replaced by a reload meanwhile
+            return False
+        for name in changes.removed_tools:
+            self._server.remove_tool(name)
+        for uri in changes.removed_resources:
+            self._server.remove_resource(uri)
+        self._add_tools(db_config_manager, changes.tools)
+        self._add_resources(db_config_manager, changes.resources)
+        return True
+
+    async def _save_snapshot(self):
+        if not self.snapshot_path:
+            return
+        try:
+            await anyio.to_thread.run_sync(self.save_snapshot)
+        except OSError as e:
+            logger.error(f"Failed to save schema snapshot to {self.snapshot_path}: {e}")
+
+    async def _refresh_schemas_periodically(self):
+        # The first pass revalidates tools restored from the snapshot.
+        while True:
+            await self.refresh_schemas()
+            await anyio.sleep(self.SCHEMA_REFRESH_INTERVAL)
+
+    async def check_health(self):
+        """Check every database concurrently."""
+        async with anyio.create_task_group() as tg:
+            for db_config_manager in self.VALID_DBS:
+                tg.start_soon(self.check_database, db_config_manager)
+
+    async def check_database(self, db_config_manager):
+        """
+        Run a database's health check, which also warms its pools, and record
+        the outcome. Databases whose connections could not be set up are
+        brought up again instead.
+        """
+        status = self.status.setdefault(db_config_manager.database_name, DatabaseStatus())
+        if not status.connected:
+            if await self._bring_up(db_config_manager) and await self._introspect(db_config_manager):
+                await self._save_snapshot()
+            return
+        timeout = self._connect_timeout(db_config_manager)
+        try:
+            with anyio.fail_after(timeout):
+                await db_config_manager.check_health()
+        except Exception as e:
+            self._set_status(db_config_manager, "degraded", _describe(e, timeout))
+        else:
+            self._set_status(db_config_manager, "healthy")
+
+    async def _check_health_periodically(self, db_config_manager):
+        # Each database on its own schedule, so a slow one never delays the others
+        with anyio.CancelScope() as scope:
+            self._health_checks[id(db_config_manager)] = scope
+            try:
+                while True:
+                    status = self.status.get(db_config_manager.database_name)
+                    failures = min(status.failures, 8) if status is not None else 0
+                    await anyio.sleep(min(self.HEALTH_CHECK_INTERVAL * 2 ** failures, self.HEALTH_CHECK_MAX_BACKOFF))
+                    await self.check_database(db_config_manager)
+            finally:
+                self._health_checks.pop(id(db_config_manager), None)
+
+    def _watch(self, db_config_manager):
+        if self._task_group is not None:
+            self._task_group.start_soon(self._check_health_periodically, db_config_manager)
+
+    def _unwatch(self, db_config_manager):
+        scope = self._health_checks.pop(id(db_config_manager), None)
+        if scope is not None:
+            scope.cancel()
+
+    async def reload(self) -> bool:
+        """
+        Apply changes of the configuration file database by database.
+
+        Added databases are brought up and their tools registered; removed ones
+        lose their tools and are closed. A changed database is replaced by a new
+        instance whose tools replace the old ones; it keeps the open connections
+        when its ``connection_settings`` are unchanged, and otherwise is
+        connected before the old connections are closed. Databases whose
+        settings did not change are left alone.
+
+        Returns:
+            Whether any database changed
+        """
+        config_path = self._server.settings.config_path
+        async with self._reload_lock:
+            self._config_stamp = _file_stamp(config_path)
+            if self._config_stamp is None:
+                # Rather than falling back to the default databases
+                logger.warning(f"Not reloading {config_path}: the file does not exist")
+                return False
+            try:
+                config = await anyio.to_thread.run_sync(load_database_config, config_path)
+                added, removed, changed = _diff(self._config, config)
+                # Create every new instance first so a bad entry leaves all databases as they are
+                created = {key: self.registry.create(key, config[key]) for key in added + changed}
+            except Exception as e:
+                logger.error(f"Not reloading {config_path}: {e}")
+                return False
+            if not created and not removed:
+                return False
+            federated = self._federated_names()
+            for key in removed:
+                await self._remove_database(key)
+            async with anyio.create_task_group() as tg:
+                for key in added:
+                    tg.start_soon(self._add_database, key, created[key])
+                for key in changed:
+                    tg.start_soon(self._replace_database, key, created[key])
+            self._config = config
+            if self._federated_names() != federated:
+                self._server.remove_tool("federated_query")
+                self.add_federated_tools()
+            logger.info(
+                f"Reloaded {config_path}: {len(added)} added, {len(removed)} removed, {len(changed)} changed"
+            )
+        await self._save_snapshot()
+        return True
+
+    def _federated_names(self) -> List[str]:
+        return [db.database_name for db in self.VALID_DBS if db.supports_federated_query]
+
+    async def _add_database(self, key: str, db_config_manager):
+        db_config_manager.share_connections(self._workers)
+        if await self._bring_up(db_config_manager):
+            await self._introspect(db_config_manager, register=False)
+        self._databases[key] = db_config_manager
+        self.VALID_DBS.append(db_config_manager)
+        self._register(db_config_manager)
+        self._watch(db_config_manager)
+
+    async def _remove_database(self, key: str):
+        db_config_manager = self._databases.pop(key)
+        self.VALID_DBS = [db for db in self.VALID_DBS if db is not db_config_manager]
+        self._unwatch(db_config_manager)
+        self._server.remove_database(db_config_manager.database_name)
+        self.status.pop(db_config_manager.database_name, None)
+        self._server.metrics.database_up.remove(database=db_config_manager.database_name)
+        await self._close(db_config_manager)
+
+    async def _replace_database(self, key: str, db_config_manager):
+        previous = self._databases[key]
+        db_config_manager.share_connections(self._workers)
+        settings = previous.connection_settings()
+        adopt = (
+            type(previous) is type(db_config_manager)
+            and settings is not None
+            and settings == db_config_manager.connection_settings()
+        )
+        if adopt:
+            db_config_manager.adopt_connections(previous)
+            status = self.status.pop(previous.database_name, None)
+            if status is not None:
+                self.status[db_config_manager.database_name] = status
+        else:
+            if previous.snapshot_key() == db_config_manager.snapshot_key():
+                data = previous.dump_schema_snapshot()
+                if data is not None:
+                    db_config_manager.load_schema_snapshot(data)
+            # The previous instance keeps serving until the new one is connected
+            if await self._bring_up(db_config_manager):
+                await self._introspect(db_config_manager, register=False)
+        self._databases[key] = db_config_manager
+        self.VALID_DBS = [db_config_manager if db is previous else db for db in self.VALID_DBS]
+        self._unwatch(previous)
+        self._server.remove_database(previous.database_name)
+        self._register(db_config_manager)
+        self._watch(db_config_manager)
+        if previous.database_name != db_config_manager.database_name:
+            self.status.pop(previous.database_name, None)
+            self._server.metrics.database_up.remove(database=previous.database_name)
+        if not adopt:
+            # Idle connections close now, checked-out ones when their calls return them
+            await self._close(previous)
+
+    async def _close(self, db_config_manager):
+        try:
+            await db_config_manager.aclose_connection()
+        except Exception as e:
+            logger.warning(f"Failed to close connections of {db_config_manager.database_name}: {e}")
+
+    async def _reload_periodically(self):
+        interval = self._server.settings.config_reload_interval
+        config_path = self._server.settings.config_path
+        if not interval or not config_path:
+            return
+        while True:
+            await anyio.sleep(interval)
+            stamp = _file_stamp(config_path)
+            if stamp is not None and stamp != self._config_stamp:
+                await self.reload()
+
+    @asynccontextmanager
+    async def lifespan(self):
+        """Keep every database connected for the lifetime of the server."""
+        await self.connect_all()
+        try:
+            async with anyio.create_task_group() as tg:
+                self._task_group = tg
+                tg.start_soon(self._refresh_schemas_periodically)
+                tg.start_soon(self._reload_periodically)
+                for db_config_manager in self.VALID_DBS:
+                    self._watch(db_config_manager)
+                yield self
+                tg.cancel_scope.cancel()
+        finally:
+            self._task_group = None
+            await self.close_all()
+
+
+def _file_stamp(path: Optional[str]) -> Optional[tuple]:
+    """Modification time and size of ``path``, or None if it does not exist."""
+    try:
+        stat = os.stat(path) if path else None
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size) if stat is not None else None
+
+
+def _diff(old: Dict[str, Dict[str, Any]], new: Dict[str, Dict[str, Any]]) -> tuple:
+    """Keys of the databases added, removed and changed between two configurations."""
+    added = [key for key in new if key not in old]
+    removed = [key for key in old if key not in new]
+    changed = [key for key in new if key in old and new[key] != old[key]]
+    return added, removed, changed
+
+
+def _describe(error: Exception, timeout: Optional[float]) -> str:
+    if isinstance(error, TimeoutError) and not str(error):
+        return f"timed out after {timeout}s"
+    return str(error) or type(error).__name__
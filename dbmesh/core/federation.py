@@ -0,0 +1,192 @@
+"""
+Fan-out of one read-only query across several databases.
+
+Every database ("shard") runs the query concurrently, at most
+``max_concurrency`` at a time, and is cancelled after ``timeout`` seconds of
+running, which also cancels its statement. Shards that time out or fail are
+reported next to the rows of the others instead of failing the whole query, so
+a slow shard costs completeness rather than latency.
+
+Rows are prefixed with the name of the shard they came from. Shards are given
+``order_by`` and ``limit`` so each returns only its own top rows; those are
+combined with a k-way merge that stops after ``limit`` rows, so a top-N query
+never transfers or sorts the full union.
+"""
+
+import heapq
+import itertools
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Literal, Optional, Tuple
+
+import anyio
+
+from dbmesh.db.results import TabularResult
+
+ShardStatus = Literal["ok", "timeout", "error"]
+
+# Name of the column holding the shard a row came from
+SHARD_COLUMN = "_shard"
+
+
+@dataclass
+class ShardOutcome:
+    """
+    How one shard of a federated query ended.
+
+    Attributes:
+        status: "ok", "timeout" or "error"
+        seconds: Time the shard ran, excluding time waiting for a slot
+        rows: Rows returned by the shard
+        error: Error message of a failed shard
+    """
+
+    status: ShardStatus
+    seconds: float
+    rows: int = 0
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {"status": self.status, "seconds": round(self.seconds, 6), "rows": self.rows}
+        if self.error is not None:
+            data["error"] = self.error
+        return data
+
+
+async def fan_out(
+    shards: Dict[str, Callable[[], Awaitable[TabularResult]]],
+    *,
+    max_concurrency: int,
+    timeout: Optional[float],
+    on_done: Optional[Callable[[int, int], Awaitable[None]]] = None,
+) -> Tuple[Dict[str, TabularResult], Dict[str, ShardOutcome]]:
+    """
+    Run one query per shard concurrently.
+
+    Args:
+        shards: Coroutine function running the query, per shard name
+        max_concurrency: Shards running at the same time; 0 runs all at once
+        timeout: Seconds a shard may run before it is cancelled; None waits
+        on_done: Called with (finished, total) shards as each one ends
+
+    Returns:
+        Results of the shards that succeeded, and the outcome of every shard
+    """
+    results: Dict[str, TabularResult] = {}
+    outcomes: Dict[str, ShardOutcome] = {}
+    limiter = anyio.CapacityLimiter(max_concurrency or max(len(shards), 1))
+
+    async def run(name: str, query: Callable[[], Awaitable[TabularResult]]) -> None:
+        async with limiter:
+            start = time.perf_counter()
+            scope = anyio.move_on_after(timeout)
+            try:
+                with scope:
+                    results[name] = await query()
+            except Exception as e:
+                # The database may enforce the deadline itself with a statement timeout
+                timed_out = anyio.current_time() >= scope.deadline
+                outcomes[name] = ShardOutcome(
+                    "timeout" if timed_out else "error", time.perf_counter() - start, error=str(e).strip()
+                )
+            else:
+                seconds = time.perf_counter() - start
+                if scope.cancelled_caught:
+                    outcomes[name] = ShardOutcome("timeout", seconds, error=f"Timed out after {timeout}s")
+                else:
+                    outcomes[name] = ShardOutcome("ok", seconds, rows=len(results[name]))
+        if on_done is not None:
+            await on_done(len(outcomes), len(shards))
+
+    async with anyio.create_task_group() as tg:
+        for name, query in shards.items():
+            tg.start_soon(run, name, query)
+    return results, outcomes
+
+
+def _tagged(name: str, rows) -> Iterator[Tuple[str, Any]]:
+    for row in rows:
+        yield name, row
+
+
+def _sort_key(indexes: List[int]) -> Callable[[Tuple[str, Any]], tuple]:
+    # NULLs sort last ascending and first descending, as in PostgreSQL
+    def key(item: Tuple[str, Any]) -> tuple:
+        row = item[1]
+        return tuple((row[i] is None, row[i]) for i in indexes)
+
+    return key
+
+
+def merge(
+    results: Dict[str, TabularResult],
+    outcomes: Dict[str, ShardOutcome],
+    *,
+    order_by: Optional[List[str]] = None,
+    descending: bool = False,
+    limit: Optional[int] = None,
+) -> TabularResult:
+    """
+    Combine shard results into one result with a leading ``_shard`` column.
+
+    Shards whose columns differ from the first successful shard's are marked
+    as failed in ``outcomes`` and left out.
+
+    Args:
+        results: Result per shard that succeeded
+        outcomes: Outcome per shard, updated in place
+        order_by: Columns to order the merged rows by
+        descending: Order from largest to smallest
+        limit: Keep at most this many rows
+
+    Returns:
+        The merged rows, with the outcome of every shard under ``shards`` and
+        whether any shard is missing under ``partial``
+
+    Raises:
+        ValueError: ``order_by`` names an unknown column or values that cannot be compared
+    """
+    columns: Optional[List[str]] = None
+    types: Optional[List[str]] = None
+    reference = ""
+    sources: List[Tuple[str, TabularResult]] = []
+    for name in sorted(results):
+        result = results[name]
+        if columns is None:
+            columns, types, reference = result.columns, result.types, name
+        elif result.columns != columns:
+            outcomes[name].status = "error"
+            outcomes[name].error = f"Columns {result.columns} differ from {columns} of shard {reference}"
+            continue
+        sources.append((name, result))
+
+    streams = [_tagged(name, result.rows) for name, result in sources]
+    if order_by:
+        unknown = [col for col in order_by if col not in (columns or [])]
+        if unknown and columns is not None:
+            raise ValueError(f"Unknown order_by columns: {', '.join(unknown)}")
+        key = _sort_key([columns.index(col) for col in order_by] if columns else [])
+        try:
+            if limit is not None:
+                # Top-N: no shard contributes more than ``limit`` rows
+                select = heapq.nlargest if descending else heapq.nsmallest
+                streams = [iter(select(limit, stream, key=key)) for stream in streams]
+            else:
+                # Shards often return rows already in order, which sorts in linear time
+                streams = [iter(sorted(stream, key=key, reverse=descending)) for stream in streams]
+            merged = heapq.merge(*streams, key=key, reverse=descending)
+            items = list(itertools.islice(merged, limit))
+        except TypeError as e:
+            raise ValueError(f"Cannot order by {', '.join(order_by)}: {e}") from None
+    else:
+        items = list(itertools.islice(itertools.chain(*streams), limit))
+
+    return TabularResult(
+        columns=[SHARD_COLUMN] + (columns or []),
+        rows=[(name, *row) for name, row in items],
+        types=["text"] + types if types is not None else None,
+        extra={
+            "shards": {name: outcomes[name].to_dict() for name in sorted(outcomes)},
+            "partial": any(outcome.status != "ok" for outcome in outcomes.values()),
+        },
+    )
@@ -0,0 +1,278 @@
+"""
+Counters and histograms exposed in the Prometheus text format.
+
+A small in-process implementation: metrics live on the server, are updated on
+the request path with a dict lookup and a few additions, and are rendered on
+demand by the ``/metrics`` route. Gauges that mirror external state, such as
+pool usage, are refreshed by collectors run right before rendering.
+"""
+
+import bisect
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from dbmesh.core.tracing import current_trace
+
+# Latency buckets in seconds, from sub-millisecond cache hits to slow queries
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+
+
+class _Value(_Metric):
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        # Metrics without labels are exported from the start
+        self._values: Dict[Tuple[str, ...], float] = {} if self.labelnames else {(): 0.0}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def remove(self, **labels: str) -> None:
+        """Stop exporting the value of a label set, e.g. of a removed database."""
+        self._values.pop(self._key(labels), None)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        for key, value in self._values.items():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Value):
+    """Monotonically increasing value per label set."""
+
+    type = "counter"
+
+
+class Gauge(_Value):
+    """Value per label set that can go up and down."""
+
+    type = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        self._values[self._key(labels)] = value
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Distribution of observed values per label set in cumulative buckets."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: bucket counts (last one is +Inf), sum
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1][0] += value
+
+    def count(self, **labels: str) -> int:
+        series = self._series.get(self._key(labels))
+        return sum(series[0]) if series else 0
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        for key, (counts, total) in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total[0])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Set of metrics rendered together."""
+
+    def __init__(self) -> None:
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], None]] = []
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """Register a callable that refreshes gauges right before rendering."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        for collector in self._collectors:
+            collector()
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+
+class ServerMetrics(MetricsRegistry):
+    """Metrics recorded by DBMeshMCPServer."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        labels = ("tool", "database", "client")
+        self.tool_calls = self.counter(
+            "dbmesh_tool_calls_total", "Tool calls by outcome", labels + ("status",)
+        )
+        self.tool_seconds = self.histogram(
+            "dbmesh_tool_call_seconds", "End-to-end tool call latency", labels
+        )
+        self.conversion_seconds = self.histogram(
+            "dbmesh_result_conversion_seconds", "Time converting tool results to content", ("tool",)
+        )
+        self.resource_reads = self.counter(
+            "dbmesh_resource_reads_total", "Resource reads by outcome", ("database", "client", "status")
+        )
+        self.resource_seconds = self.histogram(
+            "dbmesh_resource_read_seconds", "Resource read latency", ("database", "client")
+        )
+        self.database_seconds = self.histogram(
+            "dbmesh_database_seconds",
+            "Time spent in blocking database calls per request",
+            ("database", "tool", "client"),
+        )
+        self.admission_rejections = self.counter(
+            "dbmesh_admission_rejections_total", "Tool calls rejected by admission control", ("client", "reason")
+        )
+        self.admission_queued = self.gauge("dbmesh_admission_queued", "Tool calls waiting for admission")
+        self.fan_out_shards = self.counter(
+            "dbmesh_fan_out_shards_total", "Federated query shards by outcome", ("database", "status")
+        )
+        self.database_up = self.gauge(
+            "dbmesh_database_up", "1 if a database passed its last bring-up or health check, else 0", ("database",)
+        )
+        self.sse_sessions = self.gauge("dbmesh_sse_sessions", "Open SSE sessions")
+        self.pool_connections = self.gauge(
+            "dbmesh_pool_connections", "Pooled connections by state", ("database", "state")
+        )
+        self.pool_saturation = self.gauge(
+            "dbmesh_pool_saturation", "Fraction of the pool's maximum size in use", ("database",)
+        )
+
+    def observe_pool(self, database: str, stats: Dict[str, int]) -> None:
+        """Record a pool's ``stats()`` snapshot."""
+        for state in ("in_use", "idle", "waiting"):
+            self.pool_connections.set(stats.get(state, 0), database=database, state=state)
+        max_size = stats.get("max_size") or 0
+        self.pool_saturation.set(stats.get("in_use", 0) / max_size if max_size else 0.0, database=database)
+
+
+class DatabaseTimer:
+    """Accumulates time spent in blocking database calls of one request."""
+
+    __slots__ = ("seconds",)
+
+    def __init__(self) -> None:
+        self.seconds = 0.0
+
+
+_database_timer: ContextVar[Optional[DatabaseTimer]] = ContextVar("dbmesh_database_timer", default=None)
+
+
+@contextmanager
+def database_timer() -> Iterator[DatabaseTimer]:
+    """Collect the database time of everything run in this context."""
+    timer = DatabaseTimer()
+    token = _database_timer.set(timer)
+    try:
+        yield timer
+    finally:
+        _database_timer.reset(token)
+
+
+def timed(fn: Callable[..., object]) -> Callable[..., object]:
+    """
+    Wrap a blocking callable so its run time counts toward the current request
+    and shows up as a span when the request is traced.
+
+    Returns ``fn`` itself when no request is being timed.
+    """
+    timer = _database_timer.get()
+    trace = current_trace()
+    if timer is None and trace is None:
+        return fn
+
+    def run(*args):
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            end = time.perf_counter()
+            if timer is not None:
+                timer.seconds += end - start
+            if trace is not None:
+                call = getattr(fn, "func", fn)
+                trace.add_span("database", start, end, call=getattr(call, "__name__", ""))
+
+    return run
@@ -0,0 +1,140 @@
+"""
+Registry of database backends, imported only when a database uses them.
+
+Backends are named by type ("postgres") and refer to their ``DBConfig`` class
+as a "module:Class" string, so knowing a backend costs nothing until a
+configured database needs it. Besides the built-in backends, installed
+packages can add their own through the ``dbmesh.backends`` entry point group::
+
+    [project.entry-points."dbmesh.backends"]
+    mysql = "dbmesh_mysql:MySQLManager"
+
+A database's ``type`` may also be a "module:Class" string directly.
+"""
+
+import importlib
+import os
+from importlib.metadata import entry_points
+from typing import Any, Dict, List, Optional, Type, Union
+
+from mcp.server.fastmcp.utilities.logging import get_logger
+
+from dbmesh.db.base import DBConfig
+
+logger = get_logger(__name__)
+
+ENTRY_POINT_GROUP = "dbmesh.backends"
+
+# Backends shipped with dbmesh: type -> "module:Class"
+BUILTIN_BACKENDS = {
+    "postgres": "dbmesh.db.postgres:PostgresManager",
+    "example": "dbmesh.db.example:ExampleManager",
+}
+
+# Databases served when no configuration file exists
+DEFAULT_DATABASES: Dict[str, Dict[str, Any]] = {"example": {"type": "example"}}
+
+
+class BackendRegistry:
+    """
+    Maps backend types to ``DBConfig`` classes, importing each on first use.
+
+    Args:
+        backends: Backends known without discovery, as type -> "module:Class"
+        entry_point_group: Entry point group scanned for more backends; None skips discovery
+    """
+
+    def __init__(
+        self,
+        backends: Optional[Dict[str, str]] = None,
+        entry_point_group: Optional[str] = ENTRY_POINT_GROUP,
+    ) -> None:
+        self._targets: Dict[str, Union[str, Type[DBConfig]]] = dict(BUILTIN_BACKENDS if backends is None else backends)
+        self._classes: Dict[str, Type[DBConfig]] = {}
+        self._entry_point_group = entry_point_group
+        self._discovered = entry_point_group is None
+
+    def register(self, name: str, target: Union[str, Type[DBConfig]]) -> None:
+        """Add or replace the backend ``name`` as a class or a "module:Class" string."""
+        self._targets[name] = target
+        self._classes.pop(name, None)
+
+    def names(self) -> List[str]:
+        """Known backend types. Reads entry point metadata but imports nothing."""
+        self._discover()
+        return sorted(self._targets)
+
+    def load(self, name: str) -> Type[DBConfig]:
+        """
+        The ``DBConfig`` class of backend ``name``, importing its module if needed.
+
+        Raises:
+            ValueError: The backend is unknown or does not provide a DBConfig
+        """
+        cls = self._classes.get(name)
+        if cls is not None:
+            return cls
+        target: Union[str, Type[DBConfig], None] = self._targets.get(name)
+        if target is None and ":" not in name:
+            self._discover()
+            target = self._targets.get(name)
+        if target is None:
+            if ":" not in name:
+                raise ValueError(f"Unknown database type: {name}; available: {', '.join(self.names())}")
+            target = name
+        cls = _import(target) if isinstance(target, str) else target
+        if not (isinstance(cls, type) and issubclass(cls, DBConfig)):
+            raise ValueError(f"Database type {name} does not refer to a DBConfig subclass")
+        self._classes[name] = cls
+        return cls
+
+    def create(self, key: str, options: Dict[str, Any]) -> DBConfig:
+        """
+        Instantiate the database ``key`` of a configuration file.
+
+        Args:
+            key: Name of the database entry, also its default ``type`` and ``name``
+            options: Settings of the entry; ``type`` picks the backend
+        """
+        options = dict(options)
+        cls = self.load(options.pop("type", key))
+        if "name" in getattr(cls, "model_fields", {}):
+            options.setdefault("name", key)
+        return cls(**options)
+
+    def _discover(self) -> None:
+        if self._discovered:
+            return
+        self._discovered = True
+        for entry_point in entry_points(group=self._entry_point_group):
+            # Built-in and explicitly registered backends take precedence
+            self._targets.setdefault(entry_point.name, entry_point.value)
+
+
+def _import(target: str) -> Any:
+    module_name, _, attribute = target.partition(":")
+    try:
+        module = importlib.import_module(module_name)
+        return getattr(module, attribute)
+    except (ImportError, AttributeError) as e:
+        raise ValueError(f"Cannot load database backend {target}: {e}") from None
+
+
+def load_database_config(path: Optional[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Read the ``databases`` section of a YAML configuration file.
+
+    Returns:
+        Settings per database entry, or ``DEFAULT_DATABASES`` when ``path`` is
+        None or does not exist
+    """
+    if not path or not os.path.exists(path):
+        return DEFAULT_DATABASES
+    import yaml
+
+    with open(path) as f:
+        config = yaml.safe_load(f) or {}
+    databases = config.get("databases") or {}
+    if not isinstance(databases, dict) or not all(isinstance(v, dict) for v in databases.values()):
+        raise ValueError(f"'databases' in {path} must map names to settings")
+    return databases
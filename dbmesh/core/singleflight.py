@@ -0,0 +1,69 @@
+"""
+Single-flight coalescing of identical concurrent calls.
+
+While a call for a key is in flight, later callers with the same key wait for
+it and share its result instead of starting their own execution.
+"""
+
+from typing import Any, Awaitable, Callable, Dict
+
+import anyio
+
+
+class _Call:
+    def __init__(self) -> None:
+        self.done = anyio.Event()
+        self.result: Any = None
+        self.error: Exception | None = None
+        self.completed = False
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one execution."""
+
+    def __init__(self) -> None:
+        self._calls: Dict[str, _Call] = {}
+        self.executions = 0
+        self.shared = 0
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run ``fn`` unless a call for ``key`` is already in flight.
+
+        If the executing caller is cancelled, waiting callers do not inherit the
+        cancellation; one of them runs ``fn`` again instead.
+
+        Args:
+            key: Identity of the call
+            fn: Zero-argument coroutine function producing the result
+
+        Returns:
+            The result of the shared execution
+        """
+        while True:
+            call = self._calls.get(key)
+            if call is None:
+                break
+            await call.done.wait()
+            if call.completed:
+                self.shared += 1
+                if call.error is not None:
+                    raise call.error
+                return call.result
+
+        call = self._calls[key] = _Call()
+        self.executions += 1
+        try:
+            call.result = await fn()
+            call.completed = True
+            return call.result
+        except Exception as e:
+            call.error = e
+            call.completed = True
+            raise
+        finally:
+            del self._calls[key]
+            call.done.set()
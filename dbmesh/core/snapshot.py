@@ -0,0 +1,69 @@
+"""
+Versioned on-disk snapshot of introspected schemas.
+
+The file is a one-line header followed by a compact JSON payload. Loading it
+on a cold start is a single read and parse instead of a fresh catalog
+introspection of every database.
+"""
+
+import json
+import os
+import tempfile
+from typing import Any, Dict
+
+from mcp.server.fastmcp.utilities.logging import get_logger
+
+logger = get_logger(__name__)
+
+SNAPSHOT_MAGIC = b"DBMESH-SNAPSHOT"
+SNAPSHOT_VERSION = 1
+_HEADER = SNAPSHOT_MAGIC + b" %d\n" % SNAPSHOT_VERSION
+
+
+def save_snapshot(path: str, databases: Dict[str, Any]) -> None:
+    """
+    Atomically write a snapshot file.
+
+    Args:
+        path: Destination file
+        databases: Mapping of database snapshot key to its serialized schema
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    payload = json.dumps({"databases": databases}, separators=(",", ":")).encode()
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".snapshot-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER)
+            f.write(payload)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def load_snapshot(path: str) -> Dict[str, Any]:
+    """
+    Read a snapshot file written by ``save_snapshot``.
+
+    Missing, corrupt or other-version files are ignored so the server falls
+    back to live introspection.
+
+    Args:
+        path: Snapshot file
+
+    Returns:
+        Mapping of database snapshot key to its serialized schema
+    """
+    try:
+        with open(path, "rb") as f:
+            if f.read(len(_HEADER)) != _HEADER:
+                logger.warning(f"Ignoring schema snapshot {path}: unknown format or version")
+                return {}
+            payload = f.read()
+        return json.loads(payload)["databases"]
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Ignoring unreadable schema snapshot {path}: {e}")
+        return {}
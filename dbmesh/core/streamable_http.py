@@ -0,0 +1,288 @@
+"""
+Stateless streamable HTTP transport.
+
+Every POST carries one JSON-RPC message (or a batch) and gets its responses in
+the HTTP response, so calls need no session and can go to any process or
+replica behind a load balancer. Nothing is kept between requests: ``initialize``
+is answered without creating a session, and no ``Mcp-Session-Id`` is issued.
+
+The response is plain JSON unless the client accepts ``text/event-stream`` and
+asked for progress (``_meta.progressToken``); then it is an SSE stream carrying
+the request's progress and log notifications followed by its response.
+Cancelling such a stream, e.g. by closing the connection, cancels the request.
+Server-initiated requests such as sampling are not available, and neither are
+tools whose state lives in one process, such as paginated queries and exports.
+"""
+
+import json
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Optional
+
+import anyio
+from mcp import types
+from mcp.server.lowlevel.server import Server as MCPServer
+from mcp.server.lowlevel.server import request_ctx
+from mcp.server.models import InitializationOptions
+from mcp.shared.context import RequestContext
+from mcp.shared.exceptions import McpError
+from mcp.server.fastmcp.utilities.logging import get_logger
+from pydantic import ValidationError
+from sse_starlette import EventSourceResponse
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.types import Receive, Scope, Send
+
+logger = get_logger(__name__)
+
+# Protocol versions a client may negotiate over this transport
+PROTOCOL_VERSIONS = (types.LATEST_PROTOCOL_VERSION, "2025-03-26")
+
+# Request model per JSON-RPC method
+_REQUEST_TYPES = {
+    request_type.model_fields["method"].annotation.__args__[0]: request_type
+    for request_type in types.ClientRequest.model_fields["root"].annotation.__args__
+}
+
+
+class StatelessSession:
+    """
+    Stands in for ``ServerSession`` while one stateless request is handled.
+
+    Notifications the handler sends, such as progress, go to ``send`` when the
+    response is streamed and are dropped otherwise.
+
+    Args:
+        client_key: Identity of the caller used in place of a session, e.g. its address
+        send: Writes a message to the response stream, or None for plain JSON responses
+    """
+
+    client_params: Optional[types.InitializeRequestParams] = None
+
+    def __init__(
+        self, client_key: str, send: Optional[Callable[[types.JSONRPCMessage], Awaitable[None]]] = None
+    ) -> None:
+        self.client_key = client_key
+        self._send = send
+
+    def check_client_capability(self, capability: types.ClientCapabilities) -> bool:
+        # The client's capabilities are not known without a session
+        return False
+
+    async def send_notification(self, notification: types.ServerNotification) -> None:
+        if self._send is None:
+            return
+        await self._send(
+            types.JSONRPCMessage(
+                types.JSONRPCNotification(
+                    jsonrpc="2.0", **notification.model_dump(by_alias=True, mode="json", exclude_none=True)
+                )
+            )
+        )
+
+    async def send_progress_notification(
+        self, progress_token: str | int, progress: float, total: float | None = None
+    ) -> None:
+        await self.send_notification(
+            types.ServerNotification(
+                types.ProgressNotification(
+                    method="notifications/progress",
+                    params=types.ProgressNotificationParams(
+                        progressToken=progress_token, progress=progress, total=total
+                    ),
+                )
+            )
+        )
+
+    async def send_log_message(self, level: types.LoggingLevel, data: Any, logger: str | None = None) -> None:
+        await self.send_notification(
+            types.ServerNotification(
+                types.LoggingMessageNotification(
+                    method="notifications/message",
+                    params=types.LoggingMessageNotificationParams(level=level, data=data, logger=logger),
+                )
+            )
+        )
+
+    async def send_resource_list_changed(self) -> None:
+        """Clients of a stateless server re-list instead of being notified."""
+
+    async def send_tool_list_changed(self) -> None:
+        """Clients of a stateless server re-list instead of being notified."""
+
+    async def send_prompt_list_changed(self) -> None:
+        """Clients of a stateless server re-list instead of being notified."""
+
+    async def send_request(self, request: Any, result_type: Any) -> Any:
+        raise McpError(
+            types.ErrorData(
+                code=types.INVALID_REQUEST,
+                message="Server requests are not available over stateless HTTP",
+            )
+        )
+
+
+class StatelessHTTPTransport:
+    """
+    ASGI app answering MCP requests over stateless HTTP.
+
+    Args:
+        server: Low-level server whose request handlers answer the requests
+        initialization_options: Capabilities and identity reported by ``initialize``
+        client_header: Header a trusted proxy sets to the caller's address, such as
+            X-Forwarded-For; without it callers are told apart by their peer address
+    """
+
+    def __init__(
+        self,
+        server: MCPServer,
+        initialization_options: InitializationOptions,
+        client_header: Optional[str] = None,
+    ) -> None:
+        self.server = server
+        self.initialization_options = initialization_options
+        self.client_header = client_header
+        self._lifespan_context: Any = None
+
+    @asynccontextmanager
+    async def lifespan(self) -> AsyncIterator[None]:
+        """Enter the server's lifespan once for all requests, as no session would."""
+        async with AsyncExitStack() as stack:
+            self._lifespan_context = await stack.enter_async_context(self.server.lifespan(self.server))
+            try:
+                yield
+            finally:
+                self._lifespan_context = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        request = Request(scope, receive)
+        if request.method != "POST":
+            response = Response("Method not allowed", status_code=405, headers={"Allow": "POST"})
+            await response(scope, receive, send)
+            return
+        response = await self._handle(request)
+        await response(scope, receive, send)
+
+    async def _handle(self, request: Request) -> Response:
+        body = await request.body()
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return _error_response(None, types.PARSE_ERROR, "Parse error")
+        batch = isinstance(payload, list)
+        try:
+            messages = [types.JSONRPCMessage.model_validate(item) for item in (payload if batch else [payload])]
+        except ValidationError as e:
+            return _error_response(None, types.INVALID_REQUEST, f"Invalid request: {e}")
+        requests = [message.root for message in messages if isinstance(message.root, types.JSONRPCRequest)]
+        if not requests:
+            # Notifications and responses need no answer
+            return Response(status_code=202)
+
+        client_key = self._client_key(request)
+        if "text/event-stream" in request.headers.get("accept", "") and any(map(_wants_progress, requests)):
+            return self._stream(requests, client_key)
+        session = StatelessSession(client_key)
+        content: List[Any] = [None] * len(requests)
+
+        async def respond(index: int, req: types.JSONRPCRequest) -> None:
+            content[index] = _dump(await self._respond(req, session))
+
+        async with anyio.create_task_group() as tg:
+            for index, req in enumerate(requests):
+                tg.start_soon(respond, index, req)
+        return JSONResponse(content if batch else content[0])
+
+    def _client_key(self, request: Request) -> str:
+        if self.client_header:
+            forwarded = request.headers.get(self.client_header, "")
+            # Proxies append to X-Forwarded-For; the first entry is the original caller
+            caller = forwarded.split(",", 1)[0].strip()
+            if caller:
+                return f"http:{caller}"
+        client = request.client
+        return f"http:{client.host}" if client is not None else "http"
+
+    def _stream(self, requests: List[types.JSONRPCRequest], client_key: str) -> Response:
+        send_stream, receive_stream = anyio.create_memory_object_stream[dict](16)
+
+        async def write(message: types.JSONRPCMessage) -> None:
+            await send_stream.send({"event": "message", "data": message.model_dump_json(by_alias=True, exclude_none=True)})
+
+        async def run() -> None:
+            async with send_stream:
+                session = StatelessSession(client_key, write)
+
+                async def respond(req: types.JSONRPCRequest) -> None:
+                    await write(await self._respond(req, session))
+
+                async with anyio.create_task_group() as tg:
+                    for req in requests:
+                        tg.start_soon(respond, req)
+
+        return EventSourceResponse(content=receive_stream, data_sender_callable=run)
+
+    async def _respond(self, message: types.JSONRPCRequest, session: StatelessSession) -> types.JSONRPCMessage:
+        request_type = _REQUEST_TYPES.get(message.method)
+        if request_type is None:
+            return _error(message.id, types.METHOD_NOT_FOUND, "Method not found")
+        try:
+            req = request_type.model_validate(message.model_dump(by_alias=True, mode="json", exclude_none=True))
+        except ValidationError as e:
+            return _error(message.id, types.INVALID_PARAMS, f"Invalid request parameters: {e}")
+        if isinstance(req, types.InitializeRequest):
+            return _result(message.id, types.ServerResult(self._initialize(req)))
+        handler = self.server.request_handlers.get(type(req))
+        if handler is None:
+            return _error(message.id, types.METHOD_NOT_FOUND, "Method not found")
+
+        meta = req.params.meta if req.params is not None else None
+        token = request_ctx.set(RequestContext(message.id, meta, session, self._lifespan_context))
+        try:
+            result = await handler(req)
+        except McpError as e:
+            return types.JSONRPCMessage(types.JSONRPCError(jsonrpc="2.0", id=message.id, error=e.error))
+        except Exception as e:
+            logger.error(f"Error handling {req.method}: {e}")
+            return _error(message.id, 0, str(e))
+        finally:
+            request_ctx.reset(token)
+        return _result(message.id, result)
+
+    def _initialize(self, request: types.InitializeRequest) -> types.InitializeResult:
+        options = self.initialization_options
+        requested = request.params.protocolVersion
+        return types.InitializeResult(
+            protocolVersion=requested if requested in PROTOCOL_VERSIONS else types.LATEST_PROTOCOL_VERSION,
+            capabilities=options.capabilities,
+            serverInfo=types.Implementation(name=options.server_name, version=options.server_version),
+            instructions=options.instructions,
+        )
+
+
+def _wants_progress(request: types.JSONRPCRequest) -> bool:
+    meta = (request.params or {}).get("_meta") or {}
+    return meta.get("progressToken") is not None
+
+
+def _result(request_id: types.RequestId, result: types.ServerResult) -> types.JSONRPCMessage:
+    return types.JSONRPCMessage(
+        types.JSONRPCResponse(
+            jsonrpc="2.0", id=request_id, result=result.model_dump(by_alias=True, mode="json", exclude_none=True)
+        )
+    )
+
+
+def _error(request_id: types.RequestId, code: int, message: str) -> types.JSONRPCMessage:
+    return types.JSONRPCMessage(
+        types.JSONRPCError(jsonrpc="2.0", id=request_id, error=types.ErrorData(code=code, message=message))
+    )
+
+
+def _dump(message: types.JSONRPCMessage) -> Any:
+    return message.model_dump(by_alias=True, mode="json", exclude_none=True)
+
+
+def _error_response(request_id: Any, code: int, message: str) -> Response:
+    return JSONResponse(
+        {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}, status_code=400
+    )
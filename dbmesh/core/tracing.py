@@ -0,0 +1,148 @@
+"""
+Opt-in timing spans for individual requests.
+
+A traced request records how long each phase of its handling took (cache
+lookup, tool dispatch, database calls, result conversion, hand-off to the
+transport) and is appended as one JSON line to a local file. Requests are
+traced when sampled by the server settings or when the client asks for it in
+the request's ``_meta``. Untraced requests pay one context variable lookup per
+span.
+"""
+
+import json
+import os
+import secrets
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+import anyio
+import anyio.to_thread
+from mcp.server.fastmcp.utilities.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Request ``_meta`` key a client sets to trace that request
+TRACE_META_KEY = "dbmesh_trace"
+
+
+class Trace:
+    """
+    Spans recorded for one request.
+
+    Attributes:
+        kind: "tool" or "resource"
+        name: Tool name or resource URI
+        attributes: Request details such as database and client
+        spans: Recorded spans, in the order they finished
+    """
+
+    def __init__(self, kind: str, name: str, **attributes: Any) -> None:
+        self.trace_id = secrets.token_hex(8)
+        self.kind = kind
+        self.name = name
+        self.attributes = attributes
+        self.spans: List[Dict[str, Any]] = []
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.duration: Optional[float] = None
+
+    def add_span(self, name: str, start: float, end: float, **attributes: Any) -> None:
+        """Record a span from ``perf_counter`` timestamps."""
+        self.spans.append({
+            "name": name,
+            "start_ms": round((start - self._start) * 1000, 3),
+            "duration_ms": round((end - start) * 1000, 3),
+            **attributes,
+        })
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[None]:
+        """Time the enclosed block as a span."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_span(name, start, time.perf_counter(), **attributes)
+
+    def finish(self, **attributes: Any) -> None:
+        """Mark the request as handled."""
+        self.attributes.update(attributes)
+        self.duration = time.perf_counter() - self._start
+
+    def to_dict(self) -> Dict[str, Any]:
+        duration = self.duration if self.duration is not None else time.perf_counter() - self._start
+        return {
+            "trace_id": self.trace_id,
+            "kind": self.kind,
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration_ms": round(duration * 1000, 3),
+            **self.attributes,
+            "spans": sorted(self.spans, key=lambda s: s["start_ms"]),
+        }
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("dbmesh_trace", default=None)
+_NO_SPAN = nullcontext()
+
+
+def current_trace() -> Optional[Trace]:
+    """The trace of the request being handled, if it is traced."""
+    return _current_trace.get()
+
+
+def span(name: str, **attributes: Any):
+    """Time the enclosed block as a span of the current trace, if any."""
+    trace = _current_trace.get()
+    if trace is None:
+        return _NO_SPAN
+    return trace.span(name, **attributes)
+
+
+@contextmanager
+def activate(trace: Optional[Trace]) -> Iterator[Optional[Trace]]:
+    """Make ``trace`` the current trace for the enclosed block."""
+    if trace is None:
+        yield None
+        return
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+def trace_requested(meta: Any) -> bool:
+    """Whether a request's ``_meta`` asks for the request to be traced."""
+    return bool(meta is not None and getattr(meta, TRACE_META_KEY, False))
+
+
+class TraceWriter:
+    """
+    Appends finished traces to a JSON lines file.
+
+    Args:
+        path: File to append to; parent directories are created
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = anyio.Lock()
+
+    async def write(self, trace: Trace) -> None:
+        """Append ``trace``; a failure is logged, never raised into the traced request."""
+        try:
+            line = json.dumps(trace.to_dict(), default=str) + "\n"
+            async with self._lock:
+                await anyio.to_thread.run_sync(self._append, line)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not write trace to {self.path}: {e}")
+
+    def _append(self, line: str) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a") as f:
+            f.write(line)
@@ -0,0 +1,214 @@
+"""
+Multi-process serving of the SSE app.
+
+The parent process builds the server (tools, resources and restored schema
+snapshots), moves those objects out of reach of the garbage collector and
+forks ``workers`` processes accepting connections on the server's port. On
+Linux every worker gets its own ``SO_REUSEPORT`` socket so the kernel spreads
+connections evenly; elsewhere they share one socket. Everything built before the fork is shared copy-on-write instead of
+being rebuilt per worker; connection pools are opened by each worker after the
+fork, sized to its share of the connection budget.
+
+An SSE session lives in the worker that accepted its GET, but the kernel hands
+the session's POSTs to any worker. Each worker therefore advertises a message
+path carrying its index (``/messages/3/?session_id=...``), and a worker
+receiving a POST for another worker's session forwards it over that worker's
+Unix socket.
+
+Tool calls are not routed beyond that: every call of a session runs in the
+session's worker. Result cursors of paginated queries live in the worker that
+opened them, so a cursor can only be continued on the session that opened it,
+or behind a load balancer with sticky sessions. Export files are shared through
+the export directory.
+"""
+
+import gc
+import multiprocessing
+import multiprocessing.connection
+import os
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+import anyio
+import httpx
+import uvicorn
+from mcp.server.fastmcp.utilities.logging import get_logger
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+logger = get_logger(__name__)
+
+# Seconds between restarts of a worker that keeps exiting
+_RESTART_DELAY = 1.0
+# Seconds a worker gets to finish open requests on shutdown
+_SHUTDOWN_TIMEOUT = 10.0
+
+
+def worker_socket_path(directory: str, index: int) -> str:
+    """Unix socket the worker ``index`` accepts forwarded messages on."""
+    return os.path.join(directory, f"worker-{index}.sock")
+
+
+def message_worker(path: str, message_path: str) -> Optional[int]:
+    """Index of the worker owning a message ``path`` under ``message_path``, or None."""
+    if not path.startswith(message_path):
+        return None
+    index = path[len(message_path):].split("/", 1)[0]
+    return int(index) if index.isdigit() else None
+
+
+class MessageRouter:
+    """
+    ASGI app serving the message path of one worker.
+
+    POSTs for this worker's sessions go to its SSE transport; the others are
+    forwarded to the worker that owns the session.
+
+    Args:
+        index: Index of this worker
+        message_path: Message path shared by all workers, e.g. "/messages/"
+        handle: The SSE transport's message handler
+        socket_dir: Directory of the workers' Unix sockets
+    """
+
+    def __init__(self, index: int, message_path: str, handle: ASGIApp, socket_dir: str) -> None:
+        self.index = index
+        self.message_path = message_path
+        self.handle = handle
+        self.socket_dir = socket_dir
+        # One client per worker, kept for the lifetime of the process
+        self._clients: Dict[int, httpx.AsyncClient] = {}
+        self.forwarded = 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        owner = message_worker(scope["path"], self.message_path)
+        if owner == self.index:
+            await self.handle(scope, receive, send)
+            return
+        response = await self._forward(owner, Request(scope, receive))
+        await response(scope, receive, send)
+
+    async def _forward(self, owner: Optional[int], request: Request) -> Response:
+        if owner is None:
+            return Response("Could not find session", status_code=404)
+        client = self._clients.get(owner)
+        if client is None:
+            transport = httpx.AsyncHTTPTransport(uds=worker_socket_path(self.socket_dir, owner))
+            client = self._clients[owner] = httpx.AsyncClient(transport=transport, base_url="http://worker")
+        try:
+            forwarded = await client.post(
+                request.url.path,
+                params=request.query_params,
+                content=await request.body(),
+                headers={"content-type": request.headers.get("content-type", "application/json")},
+            )
+        except httpx.TransportError as e:
+            # The owner is gone, and its sessions with it
+            logger.warning(f"Failed to forward message to worker {owner}: {e}")
+            return Response("Could not find session", status_code=404)
+        self.forwarded += 1
+        return Response(
+            forwarded.content,
+            status_code=forwarded.status_code,
+            media_type=forwarded.headers.get("content-type"),
+        )
+
+
+def serve(server: Any, workers: int) -> None:
+    """
+    Serve ``server``'s SSE app from ``workers`` forked processes until interrupted.
+
+    Workers that exit unexpectedly are restarted.
+
+    Args:
+        server: The DBMeshMCPServer to serve
+        workers: Number of worker processes
+    """
+    if not hasattr(os, "fork"):
+        raise RuntimeError("Serving with several workers requires os.fork")
+    settings = server.settings
+    listeners = _listeners(settings.host, settings.port, workers)
+    socket_dir = tempfile.mkdtemp(prefix="dbmesh-workers-")
+    # Keep the GC from touching, and so copying, pages built before the fork
+    gc.collect()
+    gc.freeze()
+
+    context = multiprocessing.get_context("fork")
+    processes: Dict[int, Any] = {}
+    stopping = False
+
+    def start(index: int) -> None:
+        process = context.Process(
+            target=_run_worker,
+            args=(server, index, workers, listeners[index], socket_dir),
+            name=f"dbmesh-worker-{index}",
+        )
+        process.start()
+        processes[index] = process
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+
+    previous = {sig: signal.signal(sig, stop) for sig in (signal.SIGINT, signal.SIGTERM)}
+    logger.info(f"Serving on {settings.host}:{settings.port} with {workers} workers")
+    try:
+        for index in range(workers):
+            start(index)
+        while not stopping:
+            multiprocessing.connection.wait([p.sentinel for p in processes.values()], timeout=_RESTART_DELAY)
+            for index, process in list(processes.items()):
+                if not stopping and not process.is_alive():
+                    logger.warning(f"Worker {index} exited with code {process.exitcode}, restarting it")
+                    time.sleep(_RESTART_DELAY)
+                    start(index)
+    finally:
+        for process in processes.values():
+            if process.is_alive():
+                process.terminate()
+        for process in processes.values():
+            process.join(_SHUTDOWN_TIMEOUT)
+            if process.is_alive():
+                process.kill()
+        for sig, handler in previous.items():
+            signal.signal(sig, handler)
+        for listener in set(listeners):
+            listener.close()
+        shutil.rmtree(socket_dir, ignore_errors=True)
+
+
+def _listeners(host: str, port: int, workers: int) -> List[socket.socket]:
+    if sys.platform.startswith("linux"):
+        # A shared socket wakes whichever worker is quickest to accept, which
+        # piles connections onto one worker. The sockets stay open in the parent,
+        # so connections for a restarting worker wait instead of being refused.
+        return [socket.create_server((host, port), backlog=2048, reuse_port=True) for _ in range(workers)]
+    listener = socket.create_server((host, port), backlog=2048)
+    return [listener] * workers
+
+
+def _run_worker(server: Any, index: int, workers: int, listener: socket.socket, socket_dir: str) -> None:
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, signal.SIG_DFL)
+    server.init_worker(index, workers)
+
+    path = worker_socket_path(socket_dir, index)
+    if os.path.exists(path):
+        # Left behind by a previous run of this worker
+        os.unlink(path)
+    forwarded = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    forwarded.bind(path)
+    forwarded.listen(128)
+
+    config = uvicorn.Config(
+        server.sse_app(worker=index, worker_socket_dir=socket_dir),
+        log_level=server.settings.log_level.lower(),
+        timeout_graceful_shutdown=_SHUTDOWN_TIMEOUT,
+    )
+    anyio.run(uvicorn.Server(config).serve, [listener, forwarded])
@@ -1,5 +1,84 @@
+import functools
+import inspect
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List
+from dataclasses import dataclass, field, replace
+from typing import Dict, Any, FrozenSet, List, Callable, Optional
+
+import anyio
+import anyio.to_thread
+from mcp.server.fastmcp.utilities.logging import get_logger
+
+from dbmesh.core.metrics import timed
+from dbmesh.db.results import TabularResult
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class CatalogChanges:
+    """
+    Tools and resources to swap after a database's schema changed.
+
+    ``tools`` and ``resources`` use the same shapes as ``DBConfig.get_tools`` and
+    ``DBConfig.get_resources``; removals are listed by tool name and resource URI.
+    """
+
+    tools: List[tuple] = field(default_factory=list)
+    resources: List[Dict[str, Any]] = field(default_factory=list)
+    removed_tools: List[str] = field(default_factory=list)
+    removed_resources: List[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.tools or self.resources or self.removed_tools or self.removed_resources)
+
+
+@dataclass(frozen=True)
+class ToolAccess:
+    """
+    How a tool touches its database.
+
+    The server uses this to decide whether a call may be served from the result
+    cache, which cached results a write invalidates and how long a call may run.
+    """
+
+    database: str = ""
+    read_only: bool = False
+    tables: FrozenSet[str] = frozenset()
+    sql_argument: Optional[str] = None
+    stateful: bool = False
+    cache_ttl: Optional[float] = None
+    timeout: Optional[float] = None
+
+
+def db_tool(
+    *,
+    read_only: bool = False,
+    tables: tuple = (),
+    sql_argument: Optional[str] = None,
+    stateful: bool = False,
+):
+    """
+    Declare how a tool method accesses its database.
+
+    Args:
+        read_only: The tool never modifies data
+        tables: Tables the tool always reads or writes
+        sql_argument: Name of the argument carrying SQL, parsed for further tables;
+            may also carry a list of statements, as strings or objects with a "sql" field
+        stateful: Results depend on server-side state (e.g. an open cursor),
+            so identical calls must never be cached or coalesced
+    """
+    def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+        fn.__dbmesh_access__ = ToolAccess(
+            read_only=read_only,
+            tables=frozenset(tables),
+            sql_argument=sql_argument,
+            stateful=stateful,
+        )
+        return fn
+
+    return decorator
+
 
 class DBConfig(ABC):
     """
@@ -8,7 +87,15 @@ class DBConfig(ABC):
     This class defines the interface that all database configurations must implement.
     It provides methods for managing database connections, retrieving tools, resources,
     and prompts specific to the database type.
+
+    Backends may implement the synchronous hooks only; the async variants used by the
+    server run them on a bounded per-database executor of ``max_workers`` threads, so
+    a slow blocking call cannot stall the event loop or other databases. Backends
+    configure the executor size through a ``max_workers`` attribute.
     """
+
+    #: Worker threads used when a backend does not set ``max_workers``.
+    DEFAULT_MAX_WORKERS = 4
     
     @abstractmethod
     def setup_connection(self) -> None:
@@ -44,10 +131,21 @@ class DBConfig(ABC):
         Must be implemented by concrete classes.
         
         Returns:
-            List of resource configurations
+            List of resource configurations with ``uri``, ``name``, ``description``,
+            ``mime_type`` and a zero-argument ``fn`` that produces the content
         """
         raise NotImplementedError
 
+    def get_resource_templates(self) -> List[Dict[str, Any]]:
+        """
+        Get list of resource templates, i.e. resources parameterized by their URI.
+
+        Returns:
+            List of template configurations with ``uri_template``, ``name``,
+            ``description``, ``mime_type`` and an ``fn`` taking the URI parameters
+        """
+        return []
+
     @abstractmethod
     def get_prompts(self) -> List[Dict[str, Any]]:
         """
@@ -57,4 +155,203 @@ class DBConfig(ABC):
         Returns:
             List of prompt configurations
         """
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
+
+    async def refresh_schema(self) -> Optional[CatalogChanges]:
+        """
+        Re-read the database schema and report tools/resources that changed.
+        Backends that generate tools from their schema override this.
+
+        Returns:
+            The changes to apply, or None if the backend has no generated tools
+        """
+        return None
+
+    async def check_health(self) -> None:
+        """
+        Run periodic background checks, such as measuring replica lag.
+        Called every few seconds while the server runs; does nothing by default.
+        """
+
+    @property
+    def supports_federated_query(self) -> bool:
+        """Whether this database can be a shard of the server's federated query tool."""
+        return type(self).federated_query is not DBConfig.federated_query
+
+    async def federated_query(
+        self,
+        sql: str,
+        params: Optional[List[Any]] = None,
+        order_by: Optional[List[str]] = None,
+        descending: bool = False,
+        limit: Optional[int] = None,
+    ) -> TabularResult:
+        """
+        Run a read-only SQL query as one shard of a federated query.
+        Backends that accept SQL override this; cancelling the call must cancel the query.
+
+        The shard results are merged by ``order_by`` and cut at ``limit``
+        afterwards, so a backend should return only its first ``limit`` rows
+        in that order rather than every row of the query.
+
+        Returns:
+            The rows of the query
+        """
+        raise NotImplementedError
+
+    def share_connections(self, workers: int) -> None:
+        """
+        Scale connection limits down for one of ``workers`` server processes, so
+        that all processes together stay within the configured limits.
+        Called in each worker before its connections are opened; does nothing by default.
+        """
+
+    def connection_settings(self) -> Optional[Dict[str, Any]]:
+        """
+        Settings the open connections depend on. When the configuration is
+        reloaded and only other settings of a database changed, its new instance
+        takes over the connections of the old one with ``adopt_connections``.
+
+        Returns:
+            The settings, or None to reconnect on any change (the default)
+        """
+        return None
+
+    def adopt_connections(self, previous: "DBConfig") -> None:
+        """
+        Take over the open connections of ``previous``, an instance of the same
+        class with equal ``connection_settings``, which is then dropped without
+        being closed. Must be implemented by backends that report connection settings.
+        """
+        raise NotImplementedError
+
+    def snapshot_key(self) -> str:
+        """
+        Identify this database in the on-disk schema snapshot.
+        Includes connection details so a reconfigured database never reuses a stale entry.
+        """
+        return type(self).__name__
+
+    def dump_schema_snapshot(self) -> Optional[Any]:
+        """
+        Serialize the introspected schema for the on-disk snapshot.
+
+        Returns:
+            JSON-compatible data, or None if there is nothing to persist
+        """
+        return None
+
+    def load_schema_snapshot(self, data: Any) -> None:
+        """
+        Restore a schema produced by ``dump_schema_snapshot``.
+        The next ``refresh_schema`` revalidates it against the live catalog.
+        """
+
+    def tool_access(self, fn: Callable[..., Any], name: Optional[str] = None) -> ToolAccess:
+        """
+        Describe how a tool returned by ``get_tools`` accesses this database.
+        Tools not declared with ``db_tool`` are treated as unknown writes.
+
+        Results are cacheable for ``result_cache_ttl`` seconds when the backend sets it,
+        and calls of the tool registered as ``name`` are cancelled after
+        ``tool_timeouts[name]`` seconds.
+        """
+        access = getattr(fn, "__dbmesh_access__", None) or ToolAccess()
+        return replace(
+            access,
+            database=self.database_name,
+            cache_ttl=getattr(self, "result_cache_ttl", None),
+            timeout=getattr(self, "tool_timeouts", {}).get(name) if name else None,
+        )
+
+    @property
+    def database_name(self) -> str:
+        """Name identifying this database in tool access, caching and metrics."""
+        return getattr(self, "name", type(self).__name__)
+
+    @property
+    def limiter(self) -> anyio.CapacityLimiter:
+        """Capacity limiter bounding this database's worker threads."""
+        limiter = getattr(self, "_limiter", None)
+        if limiter is None:
+            max_workers = getattr(self, "max_workers", self.DEFAULT_MAX_WORKERS)
+            limiter = self._limiter = anyio.CapacityLimiter(max_workers)
+        return limiter
+
+    async def run_sync(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        cancel: Optional[Callable[[], Any]] = None,
+    ) -> Any:
+        """
+        Run a blocking callable on this database's executor.
+
+        Args:
+            fn: Callable to run in a worker thread
+            *args: Positional arguments passed to ``fn``
+            cancel: Thread-safe callable that interrupts ``fn``, such as a
+                driver's cancel request. When given and the calling task is
+                cancelled, the worker thread is abandoned and ``cancel`` is
+                called so the database stops working on the statement.
+
+        Returns:
+            The callable's return value
+        """
+        if cancel is None:
+            return await anyio.to_thread.run_sync(timed(fn), *args, limiter=self.limiter)
+        try:
+            return await anyio.to_thread.run_sync(
+                timed(fn), *args, limiter=self.limiter, abandon_on_cancel=True
+            )
+        except anyio.get_cancelled_exc_class():
+            with anyio.CancelScope(shield=True):
+                try:
+                    await anyio.to_thread.run_sync(cancel)
+                except Exception as e:
+                    logger.warning(f"Failed to cancel statement on {self.database_name}: {e}")
+            raise
+
+    def pool_stats(self) -> Optional[Dict[str, int]]:
+        """
+        Connection pool usage in the shape of ``ConnectionPool.stats()``.
+        Returns None for databases without a pool.
+        """
+        return None
+
+    async def asetup_connection(self) -> None:
+        """
+        Async variant of ``setup_connection``.
+        Runs the synchronous hook on the executor unless overridden.
+        """
+        await self.run_sync(self.setup_connection)
+
+    async def aclose_connection(self) -> None:
+        """
+        Async variant of ``close_connection``.
+        Runs the synchronous hook on the executor unless overridden.
+        """
+        await self.run_sync(self.close_connection)
+
+    def as_async_tool(self, fn: Callable[..., Any]) -> Callable[..., Any]:
+        """
+        Adapt a tool callable so it never blocks the event loop.
+
+        Coroutine functions are returned unchanged. Synchronous callables are wrapped
+        in a coroutine function with the same signature that runs them on this
+        database's executor.
+
+        Args:
+            fn: Tool callable returned by ``get_tools``
+
+        Returns:
+            An async callable suitable for registration with the tool manager
+        """
+        if inspect.iscoroutinefunction(fn):
+            return fn
+
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            return await self.run_sync(functools.partial(fn, *args, **kwargs))
+
+        return wrapper
@@ -0,0 +1,170 @@
+"""
+Planner-based guard against expensive queries.
+
+Before a query runs, its ``EXPLAIN`` estimate is compared with the database's
+cost and row thresholds. A query over a threshold is rejected, wrapped in a
+``LIMIT``, or rejected with hints telling the agent which part of the plan to
+narrow. Estimates are cached by query fingerprint, so repeated queries skip the
+planner round trip.
+"""
+
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Literal, Optional, Tuple
+
+from dbmesh.db.sql import normalize_sql
+
+CostAction = Literal["reject", "limit", "narrow"]
+
+# Comments in front of the first keyword
+_LEADING_COMMENTS = re.compile(r"(?:\s*(?:--[^\n]*(?:\n|$)|/\*.*?\*/))*\s*", re.S)
+
+# Plan nodes worth pointing out when asking the agent to narrow a query
+_HINT_NODES = {
+    "Seq Scan", "Index Scan", "Index Only Scan", "Bitmap Heap Scan", "Function Scan",
+    "Nested Loop", "Hash Join", "Merge Join", "Sort", "Aggregate",
+}
+
+
+class QueryTooExpensive(ValueError):
+    """Raised when a query's planner estimate exceeds the database's thresholds."""
+
+    def __init__(self, message: str, estimate: "PlanEstimate") -> None:
+        super().__init__(message)
+        self.estimate = estimate
+
+
+@dataclass
+class PlanEstimate:
+    """
+    Planner estimate of a query.
+
+    Attributes:
+        cost: Total cost of the top plan node
+        rows: Rows the top plan node is expected to return
+        hints: The most expensive scans and joins, largest first
+    """
+
+    cost: float
+    rows: float
+    hints: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_plan(cls, plan: Dict[str, Any], max_hints: int = 3) -> "PlanEstimate":
+        """Build an estimate from the ``Plan`` of ``EXPLAIN (FORMAT JSON)``."""
+        nodes: List[Tuple[float, str]] = []
+        stack = [plan]
+        while stack:
+            node = stack.pop()
+            stack.extend(node.get("Plans", ()))
+            if node.get("Node Type") in _HINT_NODES:
+                nodes.append((node.get("Total Cost", 0.0), _describe(node)))
+        nodes.sort(key=lambda n: n[0], reverse=True)
+        return cls(
+            cost=plan.get("Total Cost", 0.0),
+            rows=plan.get("Plan Rows", 0),
+            hints=[description for _, description in nodes[:max_hints]],
+        )
+
+
+def _describe(node: Dict[str, Any]) -> str:
+    text = node["Node Type"]
+    if "Relation Name" in node:
+        text += f" on {node['Relation Name']}"
+    return f"{text} (~{int(node.get('Plan Rows', 0))} rows, cost {node.get('Total Cost', 0.0):.0f})"
+
+
+def query_fingerprint(sql: str) -> str:
+    """Key identifying ``sql`` independent of whitespace and parameter values; comments stay part of it."""
+    return hashlib.sha1(normalize_sql(sql).encode()).hexdigest()
+
+
+def is_select(sql: str) -> bool:
+    """Whether ``sql`` is a query the planner can estimate and a LIMIT can wrap."""
+    text = normalize_sql(sql)
+    words = text[_LEADING_COMMENTS.match(text).end():].lstrip("(").split(None, 1)
+    return bool(words) and words[0].lower() in ("select", "with", "values", "table")
+
+
+def limit_sql(sql: str, limit: int) -> str:
+    """Wrap a SELECT so it returns at most ``limit`` rows."""
+    # Line breaks keep a line comment in the query from swallowing the wrapper
+    return f"SELECT * FROM (\n{normalize_sql(sql)}\n) AS dbmesh_limited LIMIT {int(limit)}"
+
+
+class CostGuard:
+    """
+    Thresholds on planner estimates and a cache of recent estimates.
+
+    Args:
+        max_cost: Highest allowed total plan cost; None disables the check
+        max_rows: Highest allowed estimated row count; None disables the check
+        action: What to do with a query over a threshold
+        row_limit: LIMIT injected by the "limit" action
+        cache_size: Estimates kept, least recently used first out
+        cache_ttl: Seconds an estimate is reused before the query is re-planned
+    """
+
+    def __init__(
+        self,
+        *,
+        max_cost: Optional[float] = None,
+        max_rows: Optional[float] = None,
+        action: CostAction = "reject",
+        row_limit: int = 100,
+        cache_size: int = 256,
+        cache_ttl: float = 300.0,
+    ) -> None:
+        self.max_cost = max_cost
+        self.max_rows = max_rows
+        self.action = action
+        self.row_limit = row_limit
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self._estimates: "OrderedDict[str, Tuple[PlanEstimate, float]]" = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_cost is not None or self.max_rows is not None
+
+    def cached(self, fingerprint: str) -> Optional[PlanEstimate]:
+        """A fresh cached estimate for ``fingerprint``, or None."""
+        entry = self._estimates.get(fingerprint)
+        if entry is None:
+            return None
+        estimate, expires = entry
+        if expires <= time.monotonic():
+            del self._estimates[fingerprint]
+            return None
+        self._estimates.move_to_end(fingerprint)
+        return estimate
+
+    def store(self, fingerprint: str, estimate: PlanEstimate) -> None:
+        self._estimates[fingerprint] = (estimate, time.monotonic() + self.cache_ttl)
+        self._estimates.move_to_end(fingerprint)
+        while len(self._estimates) > self.cache_size:
+            self._estimates.popitem(last=False)
+
+    def clear(self) -> None:
+        """Forget cached estimates, e.g. after the schema changed."""
+        self._estimates.clear()
+
+    def violation(self, estimate: PlanEstimate) -> Optional[str]:
+        """Describe which threshold ``estimate`` exceeds, or None if it is within all of them."""
+        if self.max_cost is not None and estimate.cost > self.max_cost:
+            return f"estimated cost {estimate.cost:.0f} exceeds the limit of {self.max_cost:g}"
+        if self.max_rows is not None and estimate.rows > self.max_rows:
+            return f"estimated {int(estimate.rows)} rows exceed the limit of {self.max_rows:g}"
+        return None
+
+    def reject(self, estimate: PlanEstimate, violation: str) -> QueryTooExpensive:
+        """The error reported for a query over a threshold."""
+        if self.action != "narrow":
+            return QueryTooExpensive(f"Query rejected: {violation}", estimate)
+        message = f"Query is too expensive to run: {violation}. Narrow it with selective WHERE conditions, join conditions or a LIMIT."
+        if estimate.hints:
+            message += " Most expensive steps: " + "; ".join(estimate.hints)
+        return QueryTooExpensive(message, estimate)
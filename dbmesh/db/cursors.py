@@ -0,0 +1,220 @@
+"""
+Named server-side cursors kept open between paginated tool calls.
+
+A paginated query declares a named cursor on a pinned pool connection and
+fetches a page at a time in fixed-size chunks, so the rows held in memory never
+exceed one page no matter how large the result is. The cursor is addressed by
+an opaque token returned with each page and is closed once exhausted, when it
+sits idle for too long, or when the caller closes it.
+"""
+
+import secrets
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import anyio
+
+from dbmesh.db.pool import ConnectionPool
+
+
+class CursorNotFoundError(Exception):
+    """Raised when a continuation token is unknown or has expired."""
+
+
+class _OpenCursor:
+    def __init__(self, pool: ConnectionPool, conn: Any, cursor: Any, description: List[Any]) -> None:
+        self.pool = pool
+        self.conn = conn
+        self.cursor = cursor
+        self.description = description
+        self.lock = anyio.Lock()
+        self.expires = 0.0
+
+
+class ServerCursors:
+    """
+    Registry of open server-side cursors of one database.
+
+    Args:
+        pool: Pool the cursors' connections are checked out from
+        run_sync: Runs blocking driver calls off the event loop, with the
+            signature of ``DBConfig.run_sync``
+        idle_timeout: Seconds an unused cursor stays open
+        max_open: Maximum cursors open at once; each pins one connection
+    """
+
+    def __init__(
+        self,
+        pool: ConnectionPool,
+        run_sync: Callable[..., Awaitable[Any]],
+        *,
+        idle_timeout: float = 120.0,
+        max_open: int = 4,
+    ) -> None:
+        self._pool = pool
+        self._run_sync = run_sync
+        self.idle_timeout = idle_timeout
+        self.max_open = max_open
+        self._cursors: Dict[str, _OpenCursor] = {}
+
+    def __len__(self) -> int:
+        return len(self._cursors)
+
+    async def open(
+        self, sql: str, params: Optional[List[Any]] = None, pool: Optional[ConnectionPool] = None
+    ) -> str:
+        """
+        Declare a read-only named cursor for ``sql``.
+
+        Args:
+            sql: Query to declare the cursor for
+            params: Query parameters
+            pool: Pool to pin a connection from instead of the default one,
+                e.g. a read replica's
+
+        Returns:
+            Opaque continuation token identifying the cursor
+        """
+        await self.reap()
+        if len(self._cursors) >= self.max_open:
+            raise Exception(
+                f"Too many open result cursors ({self.max_open}); "
+                "fetch them to the end or close them first"
+            )
+        token = secrets.token_hex(16)
+        pool = pool or self._pool
+        conn = await pool.acquire()
+        try:
+            cursor, description = await self._run_sync(
+                _declare, conn, f"dbmesh_{token}", sql, params, cancel=getattr(conn, "cancel", None)
+            )
+        except anyio.get_cancelled_exc_class():
+            await pool.discard(conn)
+            raise
+        except BaseException:
+            await pool.release(conn)
+            raise
+        entry = self._cursors[token] = _OpenCursor(pool, conn, cursor, description)
+        entry.expires = time.monotonic() + self.idle_timeout
+        return token
+
+    async def fetch(
+        self,
+        token: str,
+        page_size: int,
+        chunk_size: int,
+        on_progress: Optional[Callable[[int, int], Awaitable[None]]] = None,
+    ) -> Tuple[List[Any], List[tuple], bool]:
+        """
+        Fetch the next page of a cursor in chunks.
+
+        Args:
+            token: Token returned by ``open``
+            page_size: Maximum rows to return
+            chunk_size: Rows fetched from the server per round trip
+            on_progress: Awaited with (rows fetched, page size) after each chunk
+
+        Returns:
+            DB-API column description, rows, and whether the cursor is
+            exhausted (and closed)
+        """
+        entry = self._cursors.get(token)
+        if entry is None:
+            raise CursorNotFoundError(
+                f"Unknown or expired result cursor: {token}; "
+                "cursors can only be continued on the session that opened them"
+            )
+        async with entry.lock:
+            if self._cursors.get(token) is not entry:
+                raise CursorNotFoundError(f"Result cursor {token} was closed")
+            rows: List[tuple] = []
+            exhausted = False
+            try:
+                while len(rows) < page_size:
+                    size = min(chunk_size, page_size - len(rows))
+                    chunk = await self._run_sync(
+                        entry.cursor.fetchmany, size, cancel=getattr(entry.conn, "cancel", None)
+                    )
+                    rows.extend(chunk)
+                    if on_progress is not None:
+                        await on_progress(len(rows), page_size)
+                    if len(chunk) < size:
+                        exhausted = True
+                        break
+            except BaseException:
+                # A failed or cancelled FETCH may still be running on the
+                # connection, so it must not go back to the pool
+                await self._drop(token, discard=True)
+                raise
+            if exhausted:
+                await self._drop(token)
+            else:
+                entry.expires = time.monotonic() + self.idle_timeout
+            return entry.description, rows, exhausted
+
+    async def close(self, token: str) -> bool:
+        """Close a cursor, once a fetch running on it is done, and return its connection to the pool."""
+        entry = self._cursors.get(token)
+        if entry is None:
+            return False
+        async with entry.lock:
+            return await self._drop(token)
+
+    async def _drop(self, token: str, discard: bool = False) -> bool:
+        """
+        Close a cursor no fetch is running on, e.g. with its lock held.
+
+        Args:
+            token: Token returned by ``open``
+            discard: Close the connection instead of reusing it, for one that
+                may be in an unknown state
+        """
+        entry = self._cursors.pop(token, None)
+        if entry is None:
+            return False
+        with anyio.CancelScope(shield=True):
+            if discard:
+                await entry.pool.discard(entry.conn)
+                return True
+            try:
+                await self._run_sync(_close, entry.conn, entry.cursor)
+            finally:
+                await entry.pool.release(entry.conn)
+        return True
+
+    async def reap(self) -> int:
+        """Close cursors idle for longer than ``idle_timeout``."""
+        now = time.monotonic()
+        expired = [
+            token for token, entry in self._cursors.items()
+            if entry.expires <= now and not entry.lock.locked()
+        ]
+        for token in expired:
+            await self.close(token)
+        return len(expired)
+
+    async def close_all(self) -> None:
+        """Close every open cursor."""
+        for token in list(self._cursors):
+            await self.close(token)
+
+
+def _declare(conn, name: str, sql: str, params: Optional[List[Any]]) -> Tuple[Any, List[Any]]:
+    try:
+        with conn.cursor() as setup:
+            setup.execute("SET TRANSACTION READ ONLY")
+        cursor = conn.cursor(name=name)
+        cursor.execute(sql, params)
+        # Named cursors only learn their description after the first fetch.
+        cursor.fetchmany(0)
+        return cursor, list(cursor.description or [])
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def _close(conn, cursor) -> None:
+    try:
+        cursor.close()
+    finally:
+        conn.rollback()
@@ -1,4 +1,4 @@
-from dbmesh.db.base import DBConfig
+from dbmesh.db.base import DBConfig, db_tool
 from typing import Dict, Any, List
 from pydantic import Field
 
@@ -14,7 +14,8 @@ class ExampleManager(DBConfig):
         return True
     
     # This are some example tools
-    def add(a: int, b: int) -> int:
+    @db_tool(read_only=True)
+    def add(self, a: int, b: int) -> int:
         """Add two numbers"""
         return a + b
 
@@ -0,0 +1,80 @@
+"""
+Helpers for bulk loading rows with ``COPY ... FROM STDIN``.
+
+Rows are handled as raw CSV records so a batch can be split without parsing
+and re-encoding values, which would lose the difference between NULL
+(unquoted empty) and the empty string (``""``). Rows passed as values are
+encoded the same way.
+"""
+
+import binascii
+import csv
+import json
+from typing import Any, Iterable, Iterator, List, Optional, TextIO
+
+
+def csv_record(values: Iterable[Any]) -> str:
+    """Encode one row as a CSV record for ``COPY ... WITH (FORMAT csv)``."""
+    fields = []
+    for value in values:
+        if value is None:
+            fields.append("")
+            continue
+        if isinstance(value, bool):
+            text = "t" if value else "f"
+        elif isinstance(value, (int, float)):
+            fields.append(repr(value))
+            continue
+        elif isinstance(value, (dict, list)):
+            text = json.dumps(value)
+        elif isinstance(value, (bytes, bytearray)):
+            text = "\\x" + binascii.hexlify(value).decode()
+        else:
+            text = str(value)
+        fields.append('"' + text.replace('"', '""') + '"')
+    return ",".join(fields) + "\n"
+
+
+def csv_records(f: TextIO) -> Iterator[str]:
+    """Split a CSV file into records, keeping newlines inside quoted fields."""
+    record = ""
+    for line in f:
+        record += line
+        # Quotes are doubled inside quoted fields, so an odd count means the
+        # record continues on the next line
+        if record.count('"') % 2 == 0:
+            yield record if record.endswith("\n") else record + "\n"
+            record = ""
+    if record:
+        yield record + "\n"
+
+
+def parse_header(record: str) -> List[str]:
+    """Column names from a CSV header record."""
+    return next(csv.reader([record]))
+
+
+def take(records: Iterator[str], count: int) -> List[str]:
+    """The next ``count`` records, fewer at the end of the input."""
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= count:
+            break
+    return batch
+
+
+def qualified_table(name: str) -> str:
+    """Quote a "table" or "schema.table" name for use in SQL."""
+    parts = name.split(".")
+    if not 1 <= len(parts) <= 2 or not all(parts):
+        raise ValueError(f"Invalid table name: {name}")
+    return ".".join('"' + part.replace('"', '""') + '"' for part in parts)
+
+
+def copy_sql(table: str, columns: Optional[List[str]]) -> str:
+    """The ``COPY ... FROM STDIN`` statement loading CSV records into ``table``."""
+    sql = f"COPY {qualified_table(table)}"
+    if columns:
+        sql += " (" + ", ".join('"' + col.replace('"', '""') + '"' for col in columns) + ")"
+    return sql + " FROM STDIN WITH (FORMAT csv)"
@@ -0,0 +1,210 @@
+"""
+Cached PostgreSQL schema introspection.
+
+The catalog is read once into a ``SchemaCache``. Later refreshes run a single
+fingerprint query over ``pg_class``/``pg_attribute`` and only re-read the tables
+whose OID is new or whose fingerprint changed, so refreshing a database with
+thousands of tables costs one cheap catalog scan instead of a full re-read.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+# Ordinary tables, views, materialized views, partitioned and foreign tables
+# outside the system schemas.
+_USER_RELATIONS = """
+    c.relkind IN ('r', 'v', 'm', 'p', 'f')
+    AND n.nspname NOT IN ('pg_catalog', 'information_schema')
+    AND n.nspname NOT LIKE 'pg_toast%'
+    AND n.nspname NOT LIKE 'pg_temp%'
+"""
+
+FINGERPRINT_SQL = f"""
+SELECT c.oid,
+       md5(
+           n.nspname || '.' || c.relname || ':' || c.relkind::text || ':' ||
+           string_agg(
+               a.attname || ' ' || a.atttypid::text || ' ' || a.atttypmod::text || ' ' || a.attnotnull::text,
+               ',' ORDER BY a.attnum
+           ) || ':' ||
+           coalesce((
+               SELECT array_agg(k ORDER BY k)::text
+               FROM pg_index i, unnest(i.indkey) AS k
+               WHERE i.indrelid = c.oid AND i.indisprimary
+           ), '')
+       )
+FROM pg_class c
+JOIN pg_namespace n ON n.oid = c.relnamespace
+JOIN pg_attribute a ON a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped
+WHERE {_USER_RELATIONS}
+GROUP BY c.oid, c.relname, c.relkind, n.nspname
+"""
+
+COLUMNS_SQL = """
+SELECT c.oid, n.nspname, c.relname, c.relkind,
+       a.attname, format_type(a.atttypid, a.atttypmod), t.typname,
+       NOT a.attnotnull,
+       coalesce(a.attnum = ANY(i.indkey), false)
+FROM pg_class c
+JOIN pg_namespace n ON n.oid = c.relnamespace
+JOIN pg_attribute a ON a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped
+JOIN pg_type t ON t.oid = a.atttypid
+LEFT JOIN pg_index i ON i.indrelid = c.oid AND i.indisprimary
+WHERE c.oid = ANY(%s::oid[])
+ORDER BY c.oid, a.attnum
+"""
+
+
+@dataclass(frozen=True)
+class ColumnInfo:
+    """A column of an introspected table."""
+
+    name: str
+    data_type: str
+    type_name: str
+    nullable: bool = True
+    primary_key: bool = False
+
+
+@dataclass(frozen=True)
+class TableInfo:
+    """An introspected table, view or materialized view."""
+
+    oid: int
+    schema: str
+    name: str
+    kind: str
+    columns: Tuple[ColumnInfo, ...]
+    fingerprint: str = ""
+
+    @property
+    def qualified_name(self) -> str:
+        return f"{self.schema}.{self.name}"
+
+    @property
+    def is_view(self) -> bool:
+        return self.kind in ("v", "m")
+
+
+@dataclass
+class SchemaDiff:
+    """Tables that changed between two refreshes of a ``SchemaCache``."""
+
+    added: List[TableInfo] = field(default_factory=list)
+    changed: List[Tuple[TableInfo, TableInfo]] = field(default_factory=list)
+    removed: List[TableInfo] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+
+class SchemaCache:
+    """
+    In-memory cache of a database's tables keyed by OID.
+
+    The cache belongs to the event loop: ``read_catalog`` runs on a worker
+    thread with the fingerprints returned by ``fingerprints`` and only returns
+    what changed, which ``apply`` then merges. ``tables`` is replaced, never
+    modified in place, so a thread iterating it (e.g. ``dump``) is unaffected.
+    """
+
+    def __init__(self) -> None:
+        self.tables: Dict[int, TableInfo] = {}
+        self.generation = 0
+
+    def fingerprints(self) -> Dict[int, str]:
+        """Fingerprint of every cached table, for ``read_catalog``."""
+        return {oid: table.fingerprint for oid, table in self.tables.items()}
+
+    def dump(self) -> List[list]:
+        """Serialize the cached tables to compact JSON-compatible rows."""
+        return [
+            [
+                table.oid, table.schema, table.name, table.kind, table.fingerprint,
+                [[col.name, col.data_type, col.type_name, col.nullable, col.primary_key] for col in table.columns],
+            ]
+            for table in self.tables.values()
+        ]
+
+    def load(self, rows: List[list]) -> None:
+        """Replace the cached tables with rows produced by ``dump``."""
+        self.tables = {
+            oid: TableInfo(
+                oid=oid,
+                schema=schema,
+                name=name,
+                kind=kind,
+                columns=tuple(ColumnInfo(*col) for col in columns),
+                fingerprint=fingerprint,
+            )
+            for oid, schema, name, kind, fingerprint, columns in rows
+        }
+        self.generation += 1
+
+    def apply(self, fingerprints: Dict[int, str], loaded: Dict[int, TableInfo]) -> SchemaDiff:
+        """Merge freshly loaded tables and drop those missing from ``fingerprints``."""
+        diff = SchemaDiff()
+        tables = dict(self.tables)
+        for oid in [oid for oid in tables if oid not in fingerprints]:
+            diff.removed.append(tables.pop(oid))
+        for oid, table in loaded.items():
+            previous = tables.get(oid)
+            if previous is None:
+                diff.added.append(table)
+            else:
+                diff.changed.append((previous, table))
+            tables[oid] = table
+        if diff:
+            self.tables = tables
+            self.generation += 1
+        return diff
+
+
+def read_catalog(conn, known: Dict[int, str]) -> Tuple[Dict[int, str], Dict[int, TableInfo]]:
+    """
+    Read the live catalog's fingerprints and the tables whose fingerprint
+    differs from ``known``. Blocking; runs in a worker thread.
+
+    Args:
+        conn: Open DB-API connection to the database
+        known: Fingerprint per cached table, from ``SchemaCache.fingerprints``
+
+    Returns:
+        Fingerprint of every live table, and the tables that need reloading
+    """
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(FINGERPRINT_SQL)
+            fingerprints = {oid: fp for oid, fp in cursor.fetchall()}
+            stale = [oid for oid, fp in fingerprints.items() if known.get(oid) != fp]
+            return fingerprints, _load_tables(cursor, stale, fingerprints) if stale else {}
+    finally:
+        conn.rollback()
+
+
+def _load_tables(cursor, oids: List[int], fingerprints: Dict[int, str]) -> Dict[int, TableInfo]:
+    cursor.execute(COLUMNS_SQL, (oids,))
+    rows: Dict[int, List[Any]] = {}
+    for row in cursor.fetchall():
+        rows.setdefault(row[0], []).append(row)
+    tables = {}
+    for oid, columns in rows.items():
+        _, schema, name, kind = columns[0][:4]
+        tables[oid] = TableInfo(
+            oid=oid,
+            schema=schema,
+            name=name,
+            kind=kind,
+            columns=tuple(
+                ColumnInfo(
+                    name=col[4],
+                    data_type=col[5],
+                    type_name=col[6],
+                    nullable=col[7],
+                    primary_key=col[8],
+                )
+                for col in columns
+            ),
+            fingerprint=fingerprints[oid],
+        )
+    return tables
@@ -0,0 +1,242 @@
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict
+
+import anyio
+import anyio.to_thread
+
+
+class PoolTimeoutError(Exception):
+    """Raised when a connection could not be checked out in time."""
+
+
+class PoolClosedError(Exception):
+    """Raised when a connection is requested from a closed pool."""
+
+
+class ConnectionPool:
+    """
+    Async pool of blocking DB-API connections.
+
+    Connections are opened, closed and used from worker threads so the event
+    loop is never blocked. Each caller checks out its own connection, which
+    lets N concurrent tool calls run on N connections.
+
+    Args:
+        connect: Zero-argument callable that opens a new connection.
+        min_size: Connections kept open even when idle.
+        max_size: Upper bound on open connections.
+        acquire_timeout: Seconds to wait for a free connection.
+        max_idle: Seconds an idle connection may live before it is reaped.
+        reap_interval: Minimum seconds between two idle reaps.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        *,
+        min_size: int = 1,
+        max_size: int = 10,
+        acquire_timeout: float = 30.0,
+        max_idle: float = 300.0,
+        reap_interval: float = 60.0,
+    ) -> None:
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(f"Invalid pool size: min={min_size}, max={max_size}")
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self.max_idle = max_idle
+        self.reap_interval = reap_interval
+
+        self._slots = anyio.Semaphore(max_size)
+        self._idle: deque[tuple[Any, float]] = deque()
+        self._size = 0
+        self._waiting = 0
+        self._closed = False
+        self._last_reap = time.monotonic()
+        self._opening = anyio.Lock()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    async def open(self) -> None:
+        """
+        Warm the pool up to ``min_size`` connections.
+
+        Safe to call again to top the pool back up. Cancelling the call returns
+        right away; connections still being opened are closed once they are.
+        """
+        async with self._opening:
+            missing = self.min_size - self._size
+            if missing <= 0 or self._closed:
+                return
+            # Connections the thread finished opening, unless the call was abandoned first
+            lock = threading.Lock()
+            opened: list = []
+            abandoned = False
+
+            def connect() -> list:
+                conns: list = []
+                try:
+                    for _ in range(missing):
+                        conns.append(self._connect())
+                except BaseException:
+                    _close_all(conns)
+                    raise
+                with lock:
+                    if abandoned:
+                        _close_all(conns)
+                    else:
+                        opened.extend(conns)
+                return conns
+
+            try:
+                conns = await anyio.to_thread.run_sync(connect, abandon_on_cancel=True)
+            except anyio.get_cancelled_exc_class():
+                with lock:
+                    abandoned = True
+                    stranded = list(opened)
+                _close_all(stranded)
+                raise
+            if self._closed:
+                _close_all(conns)
+                return
+            now = time.monotonic()
+            for conn in conns:
+                self._idle.append((conn, now))
+            self._size += len(conns)
+
+    async def acquire(self) -> Any:
+        """Check out a connection, opening a new one if none is idle."""
+        if self._closed:
+            raise PoolClosedError("Connection pool is closed")
+        self._waiting += 1
+        try:
+            with anyio.fail_after(self.acquire_timeout):
+                await self._slots.acquire()
+        except TimeoutError:
+            raise PoolTimeoutError(
+                f"Timed out after {self.acquire_timeout}s waiting for a connection"
+            ) from None
+        finally:
+            self._waiting -= 1
+
+        try:
+            while self._idle:
+                conn, _ = self._idle.pop()
+                if not _is_closed(conn):
+                    return conn
+                self._size -= 1
+            self._size += 1
+            try:
+                return await anyio.to_thread.run_sync(self._connect)
+            except BaseException:
+                self._size -= 1
+                raise
+        except BaseException:
+            self._slots.release()
+            raise
+
+    async def release(self, conn: Any, discard: bool = False) -> None:
+        """
+        Return a connection to the pool.
+
+        Args:
+            conn: Connection previously returned by ``acquire``.
+            discard: Drop the connection instead of reusing it. The caller is
+                responsible for closing it in that case.
+        """
+        self._slots.release()
+        if discard or self._closed or _is_closed(conn):
+            self._size -= 1
+            if self._closed and not discard:
+                _close_quietly(conn)
+            return
+        self._idle.append((conn, time.monotonic()))
+        if time.monotonic() - self._last_reap >= self.reap_interval:
+            await self.reap()
+
+    async def discard(self, conn: Any) -> None:
+        """
+        Drop a checked-out connection that may still be in use.
+
+        Used when the caller was cancelled while a worker thread it abandoned
+        may still be running a statement on ``conn``; the connection is closed
+        on a background thread once that statement returns.
+        """
+        await self.release(conn, discard=True)
+        threading.Thread(target=_close_quietly, args=(conn,), daemon=True).start()
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[Any]:
+        """
+        Check out a connection for the duration of the block.
+        The connection is discarded instead of reused if the block is cancelled.
+        """
+        conn = await self.acquire()
+        try:
+            yield conn
+        except anyio.get_cancelled_exc_class():
+            await self.discard(conn)
+            raise
+        except BaseException:
+            await self.release(conn)
+            raise
+        else:
+            await self.release(conn)
+
+    async def reap(self) -> int:
+        """Close idle connections older than ``max_idle`` down to ``min_size``."""
+        self._last_reap = now = time.monotonic()
+        stale = []
+        while (
+            self._idle
+            and self._size > self.min_size
+            and now - self._idle[0][1] >= self.max_idle
+        ):
+            stale.append(self._idle.popleft()[0])
+            self._size -= 1
+        if stale:
+            await anyio.to_thread.run_sync(_close_all, stale)
+        return len(stale)
+
+    def close(self) -> None:
+        """Close idle connections; checked-out ones are closed on release."""
+        self._closed = True
+        idle = [conn for conn, _ in self._idle]
+        self._idle.clear()
+        self._size -= len(idle)
+        _close_all(idle)
+
+    def stats(self) -> Dict[str, int]:
+        """Snapshot of pool occupancy."""
+        idle = len(self._idle)
+        return {
+            "size": self._size,
+            "idle": idle,
+            "in_use": self._size - idle,
+            "waiting": self._waiting,
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+        }
+
+
+def _is_closed(conn: Any) -> bool:
+    return bool(getattr(conn, "closed", False))
+
+
+def _close_quietly(conn: Any) -> None:
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+def _close_all(conns: list) -> None:
+    for conn in conns:
+        _close_quietly(conn)
@@ -1,44 +1,750 @@
-from dbmesh.db.base import DBConfig
-from typing import Dict, Any, List
-from pydantic import Field
+import inspect
+import io
+import json
+import keyword
+import math
+import os
+import re
+import secrets
+import weakref
+from urllib.parse import quote
 
-class PostgresManager(DBConfig):
+import anyio
+from mcp.server.fastmcp import Context
+from mcp.server.fastmcp.utilities.logging import get_logger
+
+from dbmesh.db.base import CatalogChanges, DBConfig, db_tool
+from dbmesh.db.cost_guard import (
+    CostAction,
+    CostGuard,
+    PlanEstimate,
+    QueryTooExpensive,
+    is_select,
+    limit_sql,
+    query_fingerprint,
+)
+from dbmesh.db import export, ingest
+from dbmesh.db.cursors import ServerCursors
+from dbmesh.db.introspection import ColumnInfo, SchemaCache, SchemaDiff, TableInfo, read_catalog
+from dbmesh.db.pool import ConnectionPool
+from dbmesh.db.prepared import PreparedStatements
+from dbmesh.db.replicas import Replica, ReplicaSet, ReplicaStrategy
+from dbmesh.db.results import TabularResult
+from dbmesh.db.sql import count_statements, normalize_sql
+from typing import Dict, Any, List, Optional
+
+from pydantic import BaseModel, Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+logger = get_logger(__name__)
+
+
+class Statement(BaseModel):
+    """One parameterized statement of a batch."""
+
+    sql: str
+    params: Optional[List[Any]] = None
+
+
+class PostgresManager(DBConfig, BaseSettings):
     """PostgreSQL specific configuration."""
-    
+
+    model_config = SettingsConfigDict(
+        env_prefix="POSTGRES_",
+        env_file=".env",
+        case_sensitive=False,
+        extra="ignore",
+    )
+
+    name: str = Field(default="postgres", description="Name used to prefix this database's tools")
     host: str = Field(default="localhost", description="Database host")
-    port: int = Field(default=5432, description="Database port") 
+    port: int = Field(default=5432, description="Database port")
     username: str = Field(default="postgres", description="Database username")
     password: str = Field(default="password", description="Database password")
     database: str = Field(default="dbmesh", description="Database name")
 
-    class Config:
-        env_prefix = "POSTGRES_"
-        env_file = ".env"
-        case_sensitive = False
+    # Connection pool settings
+    pool_min_size: int = Field(default=1, description="Connections kept open when idle")
+    pool_max_size: int = Field(default=10, description="Maximum open connections")
+    pool_acquire_timeout: float = Field(default=30.0, description="Seconds to wait for a free connection")
+    pool_max_idle: float = Field(default=300.0, description="Seconds before an idle connection is closed")
+    max_workers: int = Field(default=10, description="Worker threads available to blocking database calls")
+
+    # Read replicas: read-only tools run on a replica, writes on the primary above
+    replicas: List[str] = Field(default_factory=list, description="Read replicas as host or host:port; each gets its own pool")
+    replica_strategy: ReplicaStrategy = Field(default="least_loaded", description="How reads pick a replica: least_loaded or latency")
+    replica_max_lag: Optional[float] = Field(default=None, description="Seconds of replay lag above which a replica gets no reads")
+
+    # Schema introspection
+    introspect: bool = Field(default=True, description="Generate per-table tools and resources from the catalog")
+    default_row_limit: int = Field(default=100, description="Default LIMIT of generated table tools")
+    prepared_statement_cache_size: int = Field(default=32, description="Statements of generated table tools kept prepared per connection; 0 disables it, e.g. behind a transaction-pooling proxy")
+
+    # Paginated results
+    page_size: int = Field(default=500, description="Default rows per page of paginated queries")
+    max_page_size: int = Field(default=5000, description="Upper bound on rows per page")
+    fetch_chunk_size: int = Field(default=500, description="Rows fetched per round trip while filling a page")
+    cursor_idle_timeout: float = Field(default=120.0, description="Seconds an unused result cursor stays open")
+    max_open_cursors: int = Field(default=4, description="Result cursors open at once; each pins a connection")
+
+    # Exports
+    export_dir: str = Field(default=".dbmesh/exports", description="Directory export files are written to")
+    export_chunk_size: int = Field(default=1 << 20, description="Bytes per chunk when an export is read back")
+    export_ttl: float = Field(default=3600.0, description="Seconds an export file is kept")
+
+    # Bulk loads
+    load_batch_size: int = Field(default=5000, description="Rows sent per COPY batch of bulk loads")
+    max_rejected_rows: int = Field(default=100, description="Rejected rows listed in a bulk load's result")
+
+    # Batches
+    max_batch_size: int = Field(default=50, description="Most statements one batch tool call may run")
+
+    # Timeouts
+    statement_timeout: Optional[float] = Field(default=None, description="Seconds any statement may run before PostgreSQL cancels it")
+    tool_timeouts: Dict[str, float] = Field(default_factory=dict, description="Seconds each named tool may run before it is cancelled")
+    connect_timeout: Optional[float] = Field(default=None, description="Seconds to connect, warm the pool and introspect the schema before the database is marked degraded; DBMESH_DATABASE_CONNECT_TIMEOUT by default")
+
+    # Cost guard (opt-in): queries whose EXPLAIN estimate exceeds a threshold are
+    # rejected, wrapped in a LIMIT or returned to the agent with hints to narrow them
+    max_query_cost: Optional[float] = Field(default=None, description="Highest planner cost a query may have")
+    max_query_rows: Optional[int] = Field(default=None, description="Most rows the planner may estimate a query returns")
+    cost_guard_action: CostAction = Field(default="reject", description="What to do with a query over a threshold: reject, limit or narrow")
+    explain_cache_size: int = Field(default=256, description="Planner estimates cached by query fingerprint")
+    explain_cache_ttl: float = Field(default=300.0, description="Seconds a cached planner estimate is reused")
+
+    # Result encoding
+    result_type_hints: bool = Field(default=True, description="Include column type names in query results")
+
+    # Result caching (opt-in, also requires DBMESH_RESULT_CACHE_MAX_ENTRIES)
+    result_cache_ttl: Optional[float] = Field(default=None, description="Seconds read-only tool results may be served from cache")
 
     def setup_connection(self) -> None:
-        """Initialize and setup the database connection."""
+        """Create the connection pools; connections are opened lazily on checkout."""
+        self._pool = self._create_pool()
+        self._cursors = ServerCursors(
+            self._pool,
+            self.run_sync,
+            idle_timeout=self.cursor_idle_timeout,
+            max_open=self.max_open_cursors,
+        )
+        self._replicas = None
+        if self.replicas:
+            self._replicas = ReplicaSet(
+                [Replica(address, self._create_pool(*_parse_address(address, self.port))) for address in self.replicas],
+                self._pool,
+                strategy=self.replica_strategy,
+                max_lag=self.replica_max_lag,
+            )
+
+    def _create_pool(self, host: Optional[str] = None, port: Optional[int] = None) -> ConnectionPool:
+        return ConnectionPool(
+            lambda: self._connect(host, port),
+            min_size=self.pool_min_size,
+            max_size=self.pool_max_size,
+            acquire_timeout=self.pool_acquire_timeout,
+            max_idle=self.pool_max_idle,
+        )
+
+    def close_connection(self) -> None:
+        """Close the connection pools."""
+        pool = getattr(self, "_pool", None)
+        if pool is not None:
+            pool.close()
+            self._pool = None
+        replicas = getattr(self, "_replicas", None)
+        if replicas is not None:
+            replicas.close()
+            self._replicas = None
+
+    async def asetup_connection(self) -> None:
+        """Create the connection pools and warm them up to their minimum size."""
+        self.setup_connection()
+        await self.pool.open()
+        if self._replicas is not None:
+            await self._replicas.open()
+            await self.check_health()
+
+    async def check_health(self) -> None:
+        """
+        Close result cursors left idle past ``cursor_idle_timeout``, warm the
+        primary pool back up to its minimum size and check the primary answers,
+        then measure the replay lag of every replica and retry unavailable ones.
+        """
+        cursors = getattr(self, "_cursors", None)
+        if cursors is not None:
+            await cursors.reap()
+        await self.pool.open()
+        async with self.pool.connection() as conn:
+            await self.run_sync(_ping, conn, cancel=conn.cancel)
+        replicas = getattr(self, "_replicas", None)
+        if replicas is not None:
+            await replicas.open()
+            await replicas.check(self.run_sync, _replica_lag)
+
+    def _read_connection(self):
+        """Check out a connection for a read-only statement, from a replica if one is usable."""
+        replicas = getattr(self, "_replicas", None)
+        if replicas is None:
+            return self.pool.connection()
+        return replicas.connection()
+
+    async def aclose_connection(self) -> None:
+        """Close open result cursors and the connection pool."""
+        cursors = getattr(self, "_cursors", None)
+        if cursors is not None:
+            await cursors.close_all()
+        self.close_connection()
+
+    @property
+    def pool(self) -> ConnectionPool:
+        """The active connection pool."""
+        pool = getattr(self, "_pool", None)
+        if pool is None:
+            raise Exception("PostgreSQL connection pool is not set up")
+        return pool
+
+    def share_connections(self, workers: int) -> None:
+        """Divide the pool and cursor limits between ``workers`` server processes."""
+        if workers <= 1:
+            return
+        if self.pool_max_size < workers:
+            logger.warning(
+                f"pool_max_size {self.pool_max_size} of {self.name} is below the {workers} workers; "
+                "each worker still opens one connection"
+            )
+        # Every pool, replica pools included, is sized from these
+        self.pool_max_size = max(1, self.pool_max_size // workers)
+        self.pool_min_size = min(self.pool_min_size, self.pool_max_size)
+        self.max_open_cursors = max(1, self.max_open_cursors // workers)
+
+    def connection_settings(self) -> Optional[Dict[str, Any]]:
+        """Settings the pools, result cursors and prepared statements were created with."""
+        # Everything the pools, result cursors and statements prepared on the
+        # connections were created with
+        return self.model_dump(include=_CONNECTION_SETTINGS)
+
+    def adopt_connections(self, previous: "PostgresManager") -> None:
+        """Take over the pools, cursors, prepared statements and schema cache of ``previous``."""
+        for attribute in (
+            "_pool", "_replicas", "_cursors", "_prepared", "_schema_cache", "_schema_lock", "_generation"
+        ):
+            if hasattr(previous, attribute):
+                setattr(self, attribute, getattr(previous, attribute))
+        limiter = getattr(previous, "_limiter", None)
+        if limiter is not None:
+            # In-flight calls keep their threads while the limit follows the new setting
+            limiter.total_tokens = self.max_workers
+            self._limiter = limiter
+
+    def pool_stats(self) -> Optional[Dict[str, int]]:
+        """Usage of the primary connection pool, or None before it is set up."""
+        pool = getattr(self, "_pool", None)
+        return pool.stats() if pool is not None else None
+
+    def _connect(self, host: Optional[str] = None, port: Optional[int] = None):
         import psycopg2
+        params = self.get_connection_params()
+        if host is not None:
+            params.update(host=host, port=port)
         try:
-            self.connection = psycopg2.connect(**self.get_connection_params())
-            self.cursor = self.connection.cursor()
+            return psycopg2.connect(**params)
         except psycopg2.Error as e:
             raise Exception(f"Failed to connect to PostgreSQL database: {e}")
 
-    def close_connection(self) -> None:
-        """Close the database connection."""
-        if hasattr(self, 'cursor') and self.cursor:
-            self.cursor.close()
-        if hasattr(self, 'connection') and self.connection:
-            self.connection.close()
+    @db_tool(read_only=True, sql_argument="sql")
+    async def query(self, sql: str, params: Optional[List[Any]] = None) -> TabularResult:
+        """Run a read-only SQL query and return the rows."""
+        _check_single_statement(sql)
+        async with self._read_connection() as conn:
+            sql = await self._guard_cost(sql, params, conn)
+            description, rows = await self.run_sync(
+                _fetch_rows, conn, sql, params, True, self._timeout_ms(), cancel=conn.cancel
+            )
+        return self._tabular(description, rows)
+
+    async def federated_query(
+        self,
+        sql: str,
+        params: Optional[List[Any]] = None,
+        order_by: Optional[List[str]] = None,
+        descending: bool = False,
+        limit: Optional[int] = None,
+    ) -> TabularResult:
+        """Run a read-only query for a federated call, sorting and limiting it in the database."""
+        if order_by or limit is not None:
+            sql = _top_rows_sql(sql, order_by, descending, limit)
+        return await self.query(sql, params)
+
+    @property
+    def cost_guard(self) -> CostGuard:
+        """Thresholds and cached planner estimates of this database."""
+        guard = getattr(self, "_cost_guard", None)
+        if guard is None:
+            guard = self._cost_guard = CostGuard(
+                max_cost=self.max_query_cost,
+                max_rows=self.max_query_rows,
+                action=self.cost_guard_action,
+                row_limit=self.max_query_rows or self.default_row_limit,
+                cache_size=self.explain_cache_size,
+                cache_ttl=self.explain_cache_ttl,
+            )
+        return guard
+
+    async def _guard_cost(self, sql: str, params: Optional[List[Any]], conn=None) -> str:
+        """
+        Check a read-only query against the cost guard before it runs.
+
+        Returns:
+            The SQL to run: ``sql`` itself, or ``sql`` wrapped in a LIMIT
+
+        Raises:
+            QueryTooExpensive: The query is over a threshold and cannot be limited
+        """
+        guard = self.cost_guard
+        if not guard.enabled or not is_select(sql):
+            return sql
+        estimate = await self._estimate(sql, params, conn)
+        violation = guard.violation(estimate)
+        if violation is None:
+            return sql
+        if guard.action == "limit":
+            # A LIMIT bounds the rows but not always the cost, e.g. of a sort
+            limited = limit_sql(sql, guard.row_limit)
+            limited_estimate = await self._estimate(limited, params, conn)
+            if guard.violation(limited_estimate) is None:
+                return limited
+        raise guard.reject(estimate, violation)
+
+    async def _estimate(self, sql: str, params: Optional[List[Any]], conn=None) -> PlanEstimate:
+        fingerprint = query_fingerprint(sql)
+        estimate = self.cost_guard.cached(fingerprint)
+        if estimate is not None:
+            return estimate
+        if conn is None:
+            async with self._read_connection() as conn:
+                plan = await self.run_sync(_explain, conn, sql, params, self._timeout_ms(), cancel=conn.cancel)
+        else:
+            plan = await self.run_sync(_explain, conn, sql, params, self._timeout_ms(), cancel=conn.cancel)
+        estimate = PlanEstimate.from_plan(plan)
+        self.cost_guard.store(fingerprint, estimate)
+        return estimate
+
+    def _timeout_ms(self) -> Optional[int]:
+        """Statement timeout of the current call: the caller's deadline, if any, capped by ``statement_timeout``."""
+        remaining = _remaining_ms()
+        if remaining is not None and self.statement_timeout:
+            remaining = min(remaining, int(self.statement_timeout * 1000))
+        return remaining
+
+    def _tabular(self, description: List[Any], rows: List[tuple], **extra: Any) -> TabularResult:
+        return TabularResult(
+            columns=[col.name for col in description],
+            rows=rows,
+            types=[_type_name(col.type_code) for col in description] if self.result_type_hints else None,
+            extra=extra,
+        )
+
+    @db_tool(sql_argument="sql")
+    async def execute(self, sql: str, params: Optional[List[Any]] = None) -> Dict[str, Any]:
+        """Run a SQL statement that modifies data and commit it."""
+        async with self.pool.connection() as conn:
+            return await self.run_sync(_execute, conn, sql, params, self._timeout_ms(), cancel=conn.cancel)
+
+    @db_tool(read_only=True, sql_argument="statements")
+    async def query_batch(self, statements: List[Statement], transaction: bool = False) -> List[Any]:
+        """
+        Run several read-only SQL queries on one connection and return their rows in order.
+        With transaction, all queries see the same snapshot and the first error fails the batch;
+        otherwise an error is reported in place of that query's rows.
+        """
+        batch = self._check_batch(statements)
+        for index, (sql, _) in enumerate(batch):
+            _check_single_statement(sql, f"Statement {index}: ")
+        async with self._read_connection() as conn:
+            for index, (sql, params) in enumerate(batch):
+                try:
+                    batch[index] = (await self._guard_cost(sql, params, conn), params)
+                except QueryTooExpensive as e:
+                    if transaction:
+                        raise ValueError(f"Statement {index} failed: {e}") from e
+                    batch[index] = e
+            results = await self.run_sync(
+                _run_batch, conn, batch, True, transaction, self._timeout_ms(), cancel=conn.cancel
+            )
+        return [
+            self._tabular(*result) if isinstance(result, tuple) else {"error": str(result).strip()}
+            for result in results
+        ]
+
+    @db_tool()
+    async def execute_batch(self, statements: List[Statement], transaction: bool = True) -> List[Any]:
+        """
+        Run several SQL statements that modify data on one connection.
+        With transaction, they are committed together and the first error rolls all of them back;
+        otherwise each is committed on its own and an error is reported in place of its row count.
+        """
+        batch = self._check_batch(statements)
+        async with self.pool.connection() as conn:
+            results = await self.run_sync(
+                _run_batch, conn, batch, False, transaction, self._timeout_ms(), cancel=conn.cancel
+            )
+        return [
+            {"error": str(result).strip()} if isinstance(result, Exception) else {"rowcount": result}
+            for result in results
+        ]
+
+    def _check_batch(self, statements: List[Statement]) -> List[Any]:
+        if not statements:
+            raise ValueError("At least one statement is required")
+        if len(statements) > self.max_batch_size:
+            raise ValueError(f"A batch may contain at most {self.max_batch_size} statements")
+        statements = [Statement.model_validate(stmt) for stmt in statements]
+        return [(stmt.sql, stmt.params) for stmt in statements]
+
+    @db_tool(read_only=True, sql_argument="sql", stateful=True)
+    async def query_page(
+        self,
+        sql: Optional[str] = None,
+        params: Optional[List[Any]] = None,
+        page_size: Optional[int] = None,
+        cursor: Optional[str] = None,
+        ctx: Context = None,
+    ) -> TabularResult:
+        """
+        Run a read-only SQL query and return its rows one page at a time.
+        Pass the returned next_cursor back (without sql) to fetch the following page.
+        """
+        if page_size is not None and page_size < 1:
+            raise ValueError("page_size must be at least 1")
+        page_size = min(page_size or self.page_size, self.max_page_size)
+        if cursor is None:
+            if not sql:
+                raise ValueError("Either sql or cursor is required")
+            _check_single_statement(sql)
+            sql = await self._guard_cost(sql, params)
+            replica = self._replicas.choose() if self._replicas is not None else None
+            cursor = await self._cursors.open(sql, params, pool=replica.pool if replica else None)
+
+        async def on_progress(fetched: int, total: int) -> None:
+            await _report_progress(ctx, fetched, total)
+
+        description, rows, exhausted = await self._cursors.fetch(
+            cursor, page_size, self.fetch_chunk_size, on_progress
+        )
+        return self._tabular(description, rows, next_cursor=None if exhausted else cursor)
+
+    @db_tool(read_only=True, stateful=True)
+    async def export(
+        self, sql: str, params: Optional[List[Any]] = None, format: export.ExportFormat = "csv"
+    ) -> Dict[str, Any]:
+        """
+        Export the full result of a read-only SQL query to a csv, parquet or arrow file.
+        The file is read back in chunks through the returned resource URI template.
+        """
+        if format not in export.EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {format}")
+        export.require_pyarrow(format)
+        _check_single_statement(sql)
+        extension, mime_type = export.EXPORT_FORMATS[format]
+        export_id = f"{secrets.token_hex(16)}.{extension}"
+        path = self._export_path(export_id)
+        await self.run_sync(_prepare_export_dir, os.path.dirname(path), self.export_ttl)
+        async with self._read_connection() as conn:
+            rows = await self.run_sync(
+                _copy_export, conn, sql, params, path, format, self._timeout_ms(), cancel=conn.cancel
+            )
+        size = os.path.getsize(path)
+        return {
+            "export_id": export_id,
+            "format": format,
+            "mime_type": mime_type,
+            "rows": rows,
+            "bytes": size,
+            "chunks": max(1, -(-size // self.export_chunk_size)),
+            "uri_template": f"postgres://{self.name}/exports/{export_id}/{{chunk}}",
+            "expires_in": self.export_ttl,
+        }
+
+    def _export_path(self, export_id: str) -> str:
+        if not export.EXPORT_ID.fullmatch(export_id):
+            raise ValueError(f"Unknown export: {export_id}")
+        return os.path.join(self.export_dir, self.name, export_id)
+
+    async def read_export(self, export_id: str, chunk: int) -> bytes:
+        """Read one chunk of an export file."""
+        path = self._export_path(export_id)
+        try:
+            return await self.run_sync(export.read_chunk, path, chunk, self.export_chunk_size)
+        except FileNotFoundError:
+            raise ValueError(f"Unknown or expired export: {export_id}") from None
+
+    @db_tool()
+    async def load(
+        self,
+        table: str,
+        columns: Optional[List[str]] = None,
+        rows: Optional[List[List[Any]]] = None,
+        source: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        ctx: Context = None,
+    ) -> Dict[str, Any]:
+        """
+        Bulk load rows into a table with COPY, either from rows (lists of values in column order)
+        or from source, the URI of a csv export. Each batch is committed on its own; rows the
+        database rejects are skipped and reported instead of failing the load.
+        """
+        if (rows is None) == (source is None):
+            raise ValueError("Exactly one of rows or source is required")
+        batch_size = max(1, batch_size or self.load_batch_size)
+        total = None
+        f = None
+        if rows is not None:
+            records = (ingest.csv_record(row) for row in rows)
+            total = len(rows)
+        else:
+            f = await self.run_sync(_open_staged, self._staged_path(source))
+            records = ingest.csv_records(f)
+            header = await self.run_sync(next, records, None)
+            if header is None:
+                raise ValueError(f"{source} is empty")
+            columns = columns or ingest.parse_header(header)
+
+        copy_sql = ingest.copy_sql(table, columns)
+        loaded = 0
+        read = 0
+        batches = 0
+        rejected: List[Dict[str, Any]] = []
+        rejected_count = 0
+        try:
+            async with self.pool.connection() as conn:
+                while True:
+                    # One batch at a time: the next one is read only after this one is committed
+                    count, batch_loaded, batch_rejected = await self.run_sync(
+                        _load_batch, conn, copy_sql, records, batch_size, self._timeout_ms(), cancel=conn.cancel
+                    )
+                    if not count:
+                        break
+                    batches += 1
+                    loaded += batch_loaded
+                    rejected_count += len(batch_rejected)
+                    for index, error in batch_rejected[: max(0, self.max_rejected_rows - len(rejected))]:
+                        rejected.append({"row": read + index, "error": error})
+                    read += count
+                    await _report_progress(ctx, read, total)
+        finally:
+            if f is not None:
+                f.close()
+        return {
+            "table": table,
+            "loaded": loaded,
+            "rejected": rejected_count,
+            "rejected_rows": rejected,
+            "batches": batches,
+        }
+
+    def _staged_path(self, source: str) -> str:
+        """Local path of an export named by its resource URI."""
+        match = re.match(r"postgres://([A-Za-z0-9_\-]+)/exports/([^/]+)", source)
+        if not match or not export.EXPORT_ID.fullmatch(match.group(2)):
+            raise ValueError(f"Not an export URI: {source}")
+        if not match.group(2).endswith(".csv"):
+            raise ValueError("Only csv exports can be loaded")
+        path = os.path.join(self.export_dir, match.group(1), match.group(2))
+        if not os.path.exists(path):
+            raise ValueError(f"Unknown or expired export: {source}")
+        return path
+
+    @db_tool(read_only=True, stateful=True)
+    async def close_cursor(self, cursor: str) -> bool:
+        """Close a paginated query's cursor before it is fully read."""
+        return await self._cursors.close(cursor)
+
+    async def query_table(self, table: TableInfo, arguments: Dict[str, Any]) -> TabularResult:
+        """Select rows of an introspected table filtered by column equality."""
+        sql, params = _select_sql(table, arguments)
+        if not self.prepared_statement_cache_size:
+            return await self.query(sql, params)
+        async with self._read_connection() as conn:
+            guarded = await self._guard_cost(sql, params, conn)
+            if guarded != sql:
+                # Rewritten by the cost guard; not worth preparing
+                description, rows = await self.run_sync(
+                    _fetch_rows, conn, guarded, params, True, self._timeout_ms(), cancel=conn.cancel
+                )
+            else:
+                description, rows = await self.run_sync(
+                    _fetch_prepared,
+                    conn,
+                    self._prepared_statements(conn),
+                    _select_sql(table, arguments, numbered=True)[0],
+                    params,
+                    self._schema_generation,
+                    self._timeout_ms(),
+                    cancel=conn.cancel,
+                )
+        return self._tabular(description, rows)
+
+    def _prepared_statements(self, conn) -> PreparedStatements:
+        cache = getattr(self, "_prepared", None)
+        if cache is None:
+            # Entries go away with their connection
+            cache = self._prepared = weakref.WeakKeyDictionary()
+        statements = cache.get(conn)
+        if statements is None:
+            statements = cache[conn] = PreparedStatements(self.prepared_statement_cache_size)
+        return statements
+
+    @property
+    def _schema_generation(self) -> int:
+        return getattr(self, "_generation", 0)
+
+    @property
+    def schema_cache(self) -> SchemaCache:
+        """Introspected tables of this database."""
+        cache = getattr(self, "_schema_cache", None)
+        if cache is None:
+            cache = self._schema_cache = SchemaCache()
+        return cache
+
+    async def refresh_schema(self) -> Optional[CatalogChanges]:
+        """Re-read only the catalog entries that changed since the last refresh."""
+        if not self.introspect:
+            return None
+        lock = getattr(self, "_schema_lock", None)
+        if lock is None:
+            lock = self._schema_lock = anyio.Lock()
+        # Periodic refreshes, health checks and reloads may overlap; the cache
+        # is only read and replaced on the event loop, one refresh at a time
+        async with lock:
+            cache = self.schema_cache
+            async with self.pool.connection() as conn:
+                fingerprints, loaded = await self.run_sync(read_catalog, conn, cache.fingerprints())
+            changes = self._catalog_changes(cache.apply(fingerprints, loaded))
+            if changes:
+                # Plans of queries against changed tables may differ now, and
+                # prepared statements of changed tables may no longer be valid
+                self.cost_guard.clear()
+                self._generation = self._schema_generation + 1
+        return changes
+
+    def snapshot_key(self) -> str:
+        """Identify this database in the on-disk schema snapshot."""
+        return f"postgres:{self.name}:{self.username}@{self.host}:{self.port}/{self.database}"
+
+    def dump_schema_snapshot(self) -> Optional[Any]:
+        """Serialize the cached schema for the on-disk snapshot."""
+        return self.schema_cache.dump() if self.introspect else None
+
+    def load_schema_snapshot(self, data: Any) -> None:
+        """Restore the cached schema from the on-disk snapshot."""
+        if self.introspect:
+            self.schema_cache.load(data)
+
+    def _catalog_changes(self, diff: SchemaDiff) -> CatalogChanges:
+        changes = CatalogChanges()
+        for table in diff.removed + [old for old, _ in diff.changed]:
+            changes.removed_tools.append(self.table_tool_name(table))
+            changes.removed_resources.append(self.table_resource_uri(table))
+        for table in diff.added + [new for _, new in diff.changed]:
+            changes.tools.append(self._table_tool(table))
+            changes.resources.append(self._table_resource(table))
+        return changes
+
+    def table_tool_name(self, table: TableInfo) -> str:
+        """
+        Name of the generated query tool for ``table``. Built-in tools never
+        start with ``{name}_table_``, so tables such as "page" cannot shadow them.
+        """
+        base = table.name if table.schema == "public" else f"{table.schema}_{table.name}"
+        return re.sub(r"[^A-Za-z0-9_]", "_", f"{self.name}_table_{base}")
+
+    def table_resource_uri(self, table: TableInfo) -> str:
+        """URI of the generated resource describing ``table``."""
+        return f"postgres://{self.name}/{quote(table.schema, safe='')}/{quote(table.name, safe='')}"
+
+    def _table_tool(self, table: TableInfo) -> tuple:
+        name = self.table_tool_name(table)
+        filters = [col for col in table.columns if _is_param_name(col.name)]
+
+        async def query_table(**arguments: Any) -> TabularResult:
+            return await self.query_table(table, arguments)
+
+        parameters = [
+            inspect.Parameter(
+                col.name,
+                inspect.Parameter.KEYWORD_ONLY,
+                default=None,
+                annotation=Optional[_python_type(col)],
+            )
+            for col in filters
+        ]
+        parameters += [
+            inspect.Parameter("limit", inspect.Parameter.KEYWORD_ONLY, default=self.default_row_limit, annotation=int),
+            inspect.Parameter("order_by", inspect.Parameter.KEYWORD_ONLY, default=None, annotation=Optional[str]),
+        ]
+        query_table.__signature__ = inspect.Signature(parameters)
+        query_table.__name__ = name
+        db_tool(read_only=True, tables=(table.name,))(query_table)
 
-    def get_tools(self) -> List[Dict[str, Any]]:
+        kind = "view" if table.is_view else "table"
+        columns = ", ".join(f"{col.name} ({col.data_type})" for col in table.columns)
+        description = (
+            f"Query rows of the {kind} {table.qualified_name} in the {self.database} PostgreSQL database. "
+            f"Any column argument filters by equality; order_by takes a column name. Columns: {columns}"
+        )
+        return (query_table, name, description)
+
+    def _table_resource(self, table: TableInfo) -> Dict[str, Any]:
+        definition = {
+            "schema": table.schema,
+            "name": table.name,
+            "kind": "view" if table.is_view else "table",
+            "columns": [
+                {
+                    "name": col.name,
+                    "type": col.data_type,
+                    "nullable": col.nullable,
+                    "primary_key": col.primary_key,
+                }
+                for col in table.columns
+            ],
+        }
+        return {
+            "uri": self.table_resource_uri(table),
+            "name": f"{self.name}.{table.qualified_name}",
+            "description": f"Column definitions of {table.qualified_name} in the {self.database} PostgreSQL database",
+            "mime_type": "application/json",
+            "fn": lambda: definition,
+        }
+
+    def get_tools(self) -> List[tuple]:
         """Get list of available PostgreSQL tools/operations."""
-        return []
+        return [
+            (self.query, f"{self.name}_query", f"Run a read-only SQL query against the {self.database} PostgreSQL database"),
+            (self.execute, f"{self.name}_execute", f"Run a SQL statement that modifies data in the {self.database} PostgreSQL database"),
+            (self.query_batch, f"{self.name}_query_batch", f"Run several read-only SQL queries against the {self.database} PostgreSQL database in one call; results are returned in order"),
+            (self.execute_batch, f"{self.name}_execute_batch", f"Run several SQL statements that modify data in the {self.database} PostgreSQL database in one call, in one transaction by default"),
+            (self.query_page, f"{self.name}_query_page", f"Run a read-only SQL query against the {self.database} PostgreSQL database and page through large results; pass next_cursor back to continue"),
+            (self.export, f"{self.name}_export", f"Export the full result of a read-only SQL query against the {self.database} PostgreSQL database to a csv, parquet or arrow file, read back in chunks as a resource"),
+            (self.load, f"{self.name}_load", f"Bulk load rows or a csv export into a table of the {self.database} PostgreSQL database with COPY, in batches; rejected rows are reported, not fatal"),
+            (self.close_cursor, f"{self.name}_close_cursor", f"Close an unfinished paginated query on the {self.database} PostgreSQL database"),
+        ] + [self._table_tool(table) for table in self.schema_cache.tables.values()]
 
     def get_resources(self) -> List[Dict[str, Any]]:
         """Get list of available PostgreSQL resources."""
-        return []
+        return [self._table_resource(table) for table in self.schema_cache.tables.values()]
+
+    def get_resource_templates(self) -> List[Dict[str, Any]]:
+        """Get the template serving chunks of export files."""
+        return [
+            {
+                "uri_template": f"postgres://{self.name}/exports/{{export_id}}/{{chunk}}",
+                "name": f"{self.name}_export",
+                "description": f"Chunks of files written by {self.name}_export, starting at chunk 0",
+                "mime_type": "application/octet-stream",
+                "fn": self.read_export,
+            }
+        ]
 
     def get_prompts(self) -> List[Dict[str, Any]]:
         """Get list of available PostgreSQL prompts/templates."""
@@ -50,10 +756,419 @@ class PostgresManager(DBConfig):
 
     def get_connection_params(self) -> Dict[str, Any]:
         """Get PostgreSQL connection parameters."""
-        return {
+        params = {
             "host": self.host,
             "port": self.port,
             "user": self.username,
             "password": self.password,
             "database": self.database
-        }
\ No newline at end of file
+        }
+        if self.connect_timeout:
+            # libpq takes whole seconds and treats anything below 2 as 2
+            params["connect_timeout"] = max(2, math.ceil(self.connect_timeout))
+        if self.statement_timeout:
+            params["options"] = f"-c statement_timeout={int(self.statement_timeout * 1000)}"
+        return params
+
+
+_PYTHON_TYPES = {
+    "int2": int, "int4": int, "int8": int, "oid": int,
+    "float4": float, "float8": float, "numeric": float,
+    "bool": bool,
+}
+
+_RESERVED_PARAMS = {"limit", "order_by"}
+
+_CONNECTION_SETTINGS = {
+    "host", "port", "username", "password", "database", "connect_timeout", "statement_timeout",
+    "pool_min_size", "pool_max_size", "pool_acquire_timeout", "pool_max_idle",
+    "replicas", "replica_strategy", "replica_max_lag",
+    "cursor_idle_timeout", "max_open_cursors", "prepared_statement_cache_size",
+}
+
+
+def _parse_address(address: str, default_port: int) -> tuple:
+    """Split "host" or "host:port" of a replica."""
+    host, sep, port = address.rpartition(":")
+    if not sep or not port.isdigit():
+        return address, default_port
+    return host, int(port)
+
+
+def _python_type(column: ColumnInfo) -> type:
+    return _PYTHON_TYPES.get(column.type_name, str)
+
+
+def _is_param_name(name: str) -> bool:
+    return (
+        name.isidentifier()
+        and not keyword.iskeyword(name)
+        and not name.startswith("_")
+        and name not in _RESERVED_PARAMS
+    )
+
+
+def _quote_ident(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _check_single_statement(sql: str, prefix: str = "") -> None:
+    """
+    Reject text holding several statements. The driver sends it as one simple
+    query, so a later statement could COMMIT the read-only transaction and write.
+    """
+    if count_statements(sql) > 1:
+        raise ValueError(f"{prefix}Only one SQL statement may be run at a time")
+
+
+def _top_rows_sql(sql: str, order_by: Optional[List[str]], descending: bool, limit: Optional[int]) -> str:
+    """Wrap a federated query so the shard sorts and limits its rows itself."""
+    # Line breaks keep a trailing line comment from swallowing the wrapper
+    wrapped = f"SELECT * FROM (\n{normalize_sql(sql)}\n) q"
+    if order_by:
+        direction = " DESC" if descending else ""
+        wrapped += " ORDER BY " + ", ".join(_quote_ident(col) + direction for col in order_by)
+    if limit is not None:
+        wrapped += f" LIMIT {int(limit)}"
+    return wrapped
+
+
+def _select_sql(table: TableInfo, arguments: Dict[str, Any], numbered: bool = False) -> tuple:
+    """
+    Build the SELECT issued by a generated table tool.
+
+    Placeholders are ``%s`` for the driver, or ``$1``, ``$2``... with
+    ``numbered`` for preparing the statement on the server.
+    """
+    columns = {col.name for col in table.columns}
+    sql = f"SELECT * FROM {_quote_ident(table.schema)}.{_quote_ident(table.name)}"
+    params: List[Any] = []
+    filters = []
+
+    def placeholder() -> str:
+        return f"${len(params)}" if numbered else "%s"
+
+    for name, value in sorted(arguments.items()):
+        if name in _RESERVED_PARAMS or value is None:
+            continue
+        params.append(value)
+        filters.append(f"{_quote_ident(name)} = {placeholder()}")
+    if filters:
+        sql += " WHERE " + " AND ".join(filters)
+    order_by = arguments.get("order_by")
+    if order_by:
+        if order_by not in columns:
+            raise ValueError(f"Unknown column for order_by: {order_by}")
+        sql += f" ORDER BY {_quote_ident(order_by)}"
+    params.append(arguments.get("limit", 100))
+    sql += f" LIMIT {placeholder()}"
+    return sql, params
+
+
+async def _report_progress(ctx: Optional[Context], progress: float, total: Optional[float]) -> None:
+    """Report progress to the client when the tool runs inside an MCP request."""
+    if ctx is None:
+        return
+    try:
+        await ctx.report_progress(progress, total)
+    except ValueError:
+        # Called outside of a request, e.g. directly from Python
+        pass
+
+
+# Names of common PostgreSQL type OIDs for result type hints
+_TYPE_NAMES = {
+    16: "bool", 17: "bytea", 20: "int8", 21: "int2", 23: "int4", 25: "text",
+    26: "oid", 114: "json", 700: "float4", 701: "float8", 1042: "bpchar",
+    1043: "varchar", 1082: "date", 1083: "time", 1114: "timestamp",
+    1184: "timestamptz", 1186: "interval", 1700: "numeric", 2950: "uuid",
+    3802: "jsonb",
+}
+
+
+def _type_name(type_code: int) -> str:
+    return _TYPE_NAMES.get(type_code, str(type_code))
+
+
+def _remaining_ms() -> Optional[int]:
+    """Milliseconds left until the calling task's deadline, or None without one."""
+    deadline = anyio.current_effective_deadline()
+    if deadline == math.inf:
+        return None
+    return max(1, math.ceil((deadline - anyio.current_time()) * 1000))
+
+
+def _set_local_timeout(cursor, timeout_ms: Optional[int]) -> None:
+    # Lets PostgreSQL stop the statement itself at the caller's deadline.
+    if timeout_ms is not None:
+        cursor.execute("SELECT set_config('statement_timeout', %s, true)", (str(timeout_ms),))
+
+
+def _fetch_rows(
+    conn, sql: str, params: Optional[List[Any]], read_only: bool, timeout_ms: Optional[int] = None
+) -> tuple:
+    """Execute ``sql`` on ``conn`` and return its description and rows. Runs in a worker thread."""
+    try:
+        with conn.cursor() as cursor:
+            if read_only:
+                cursor.execute("SET TRANSACTION READ ONLY")
+            _set_local_timeout(cursor, timeout_ms)
+            cursor.execute(sql, params)
+            if cursor.description is None:
+                description, rows = [], []
+            else:
+                description, rows = list(cursor.description), cursor.fetchall()
+        conn.rollback()
+        return description, rows
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def _explain(conn, sql: str, params: Optional[List[Any]], timeout_ms: Optional[int] = None) -> Dict[str, Any]:
+    """Return the top plan node of ``sql`` without running it. Runs in a worker thread."""
+    try:
+        with conn.cursor() as cursor:
+            _set_local_timeout(cursor, timeout_ms)
+            cursor.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+            plan = cursor.fetchone()[0]
+        conn.rollback()
+    except Exception:
+        conn.rollback()
+        raise
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+def _run_batch(
+    conn,
+    statements: List[Any],
+    read_only: bool,
+    transaction: bool,
+    timeout_ms: Optional[int] = None,
+) -> List[Any]:
+    """
+    Run a batch of statements on ``conn``. Runs in a worker thread.
+
+    ``statements`` holds (sql, params) pairs, or an exception to report as
+    that statement's result. Returns per statement its (description, rows)
+    when ``read_only``, else its row count, or the exception it raised.
+    Without ``transaction`` each statement runs in its own transaction.
+    """
+    import psycopg2
+
+    results: List[Any] = []
+    try:
+        with conn.cursor() as cursor:
+            for index, statement in enumerate(statements):
+                if isinstance(statement, Exception):
+                    results.append(statement)
+                    continue
+                if not transaction or index == 0:
+                    if read_only:
+                        # One snapshot for every query of a transactional batch
+                        isolation = "ISOLATION LEVEL REPEATABLE READ " if transaction else ""
+                        cursor.execute(f"SET TRANSACTION {isolation}READ ONLY")
+                    _set_local_timeout(cursor, timeout_ms)
+                sql, params = statement
+                try:
+                    cursor.execute(sql, params)
+                except psycopg2.OperationalError:
+                    # Cancelled, timed out or disconnected: stop the whole batch
+                    raise
+                except Exception as e:
+                    if transaction:
+                        outcome = "" if read_only else ", the batch was rolled back"
+                        raise ValueError(f"Statement {index} failed{outcome}: {e}") from e
+                    conn.rollback()
+                    results.append(e)
+                    continue
+                if not read_only:
+                    results.append(cursor.rowcount)
+                elif cursor.description is None:
+                    results.append(([], []))
+                else:
+                    results.append((list(cursor.description), cursor.fetchall()))
+                if not transaction and read_only:
+                    conn.rollback()
+                elif not transaction:
+                    conn.commit()
+        if read_only:
+            conn.rollback()
+        else:
+            conn.commit()
+        return results
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def _fetch_prepared(
+    conn,
+    statements: PreparedStatements,
+    sql: str,
+    params: Optional[List[Any]],
+    generation: int,
+    timeout_ms: Optional[int] = None,
+) -> tuple:
+    """Run a read-only statement as a prepared statement of ``conn``. Runs in a worker thread."""
+    import psycopg2.errors
+
+    try:
+        try:
+            return _execute_prepared(conn, statements, sql, params, generation, timeout_ms)
+        except psycopg2.errors.FeatureNotSupported:
+            # "cached plan must not change result type": the table was altered
+            # since the statement was prepared and before a schema refresh
+            # noticed. DEALLOCATE is not transactional, so prepare it afresh.
+            conn.rollback()
+            with conn.cursor() as cursor:
+                statements.discard(cursor, sql)
+            conn.rollback()
+            return _execute_prepared(conn, statements, sql, params, generation, timeout_ms)
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def _execute_prepared(conn, statements, sql, params, generation, timeout_ms) -> tuple:
+    with conn.cursor() as cursor:
+        cursor.execute("SET TRANSACTION READ ONLY")
+        _set_local_timeout(cursor, timeout_ms)
+        statements.execute(cursor, sql, params, generation)
+        description, rows = list(cursor.description), cursor.fetchall()
+    conn.rollback()
+    return description, rows
+
+
+_REPLICA_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+
+def _ping(conn) -> None:
+    """Check a connection answers. Runs in a worker thread."""
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        conn.rollback()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def _replica_lag(conn) -> float:
+    """Seconds a replica's replay is behind its primary; 0 when caught up. Runs in a worker thread."""
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(_REPLICA_LAG_SQL)
+            lag = cursor.fetchone()[0]
+        conn.rollback()
+    except Exception:
+        conn.rollback()
+        raise
+    return float(lag)
+
+
+def _prepare_export_dir(directory: str, ttl: float) -> None:
+    os.makedirs(directory, exist_ok=True)
+    export.remove_expired(directory, ttl)
+
+
+def _copy_export(
+    conn, sql: str, params: Optional[List[Any]], path: str, fmt: str, timeout_ms: Optional[int] = None
+) -> int:
+    """Export the result of ``sql`` to ``path``. Runs in a worker thread."""
+    # Written under a temporary name so readers never see a partial file
+    csv_path = path + ".csv.part" if fmt != "csv" else path + ".part"
+    try:
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SET TRANSACTION READ ONLY")
+                _set_local_timeout(cursor, timeout_ms)
+                # Timestamps with time zone in a form pyarrow parses
+                cursor.execute("SET LOCAL TimeZone = 'UTC'")
+                query = normalize_sql(cursor.mogrify(sql, params).decode() if params else sql)
+                if fmt != "csv":
+                    cursor.execute(f"SELECT * FROM (\n{query}\n) AS dbmesh_export LIMIT 0")
+                    description = list(cursor.description)
+                rows = export.copy_csv(cursor, query, csv_path)
+            conn.rollback()
+        except Exception:
+            conn.rollback()
+            raise
+        if fmt == "csv":
+            os.replace(csv_path, path)
+            return rows
+        columns = [col.name for col in description]
+        types = export.arrow_types([_type_name(col.type_code) for col in description])
+        export.csv_to_arrow(csv_path, path + ".part", fmt, columns, types)
+        os.replace(path + ".part", path)
+        return rows
+    finally:
+        for leftover in (csv_path, path + ".part"):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+
+
+def _open_staged(path: str):
+    return open(path, newline="", encoding="utf-8")
+
+
+def _load_batch(
+    conn, copy_sql: str, records, batch_size: int, timeout_ms: Optional[int] = None
+) -> tuple:
+    """
+    Load the next ``batch_size`` CSV records with COPY. Runs in a worker thread.
+
+    Returns:
+        Records read, records loaded, and (index in batch, error) per rejected record
+    """
+    import psycopg2
+
+    batch = ingest.take(records, batch_size)
+    rejected: List[tuple] = []
+
+    def copy(start: int, end: int) -> int:
+        try:
+            with conn.cursor() as cursor:
+                _set_local_timeout(cursor, timeout_ms)
+                cursor.copy_expert(copy_sql, io.StringIO("".join(batch[start:end])))
+            conn.commit()
+            return end - start
+        except psycopg2.OperationalError:
+            # Cancelled, timed out or disconnected: stop the load
+            conn.rollback()
+            raise
+        except Exception as e:
+            conn.rollback()
+            if end - start == 1:
+                rejected.append((start, str(e).strip()))
+                return 0
+            # Split the failed range to commit every row the database accepts
+            middle = (start + end) // 2
+            return copy(start, middle) + copy(middle, end)
+
+    loaded = copy(0, len(batch)) if batch else 0
+    return len(batch), loaded, rejected
+
+
+def _execute(
+    conn, sql: str, params: Optional[List[Any]], timeout_ms: Optional[int] = None
+) -> Dict[str, Any]:
+    """Execute a modifying statement on ``conn`` and commit. Runs in a worker thread."""
+    try:
+        with conn.cursor() as cursor:
+            _set_local_timeout(cursor, timeout_ms)
+            cursor.execute(sql, params)
+            rowcount = cursor.rowcount
+        conn.commit()
+        return {"rowcount": rowcount}
+    except Exception:
+        conn.rollback()
+        raise
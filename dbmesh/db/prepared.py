@@ -0,0 +1,83 @@
+"""
+Server-side prepared statements kept per pooled connection.
+
+Generated table tools run the same few statement shapes over and over with
+different parameters. Preparing each shape once per connection lets PostgreSQL
+skip parsing and, after a few executions, planning. Prepared statements live in
+the database session, so each connection keeps its own bounded LRU of them; a
+schema change bumps a generation number that makes every connection drop its
+statements before the next use. A table altered between two schema refreshes
+makes PostgreSQL refuse the old plan; the caller then discards that one
+statement and prepares it again.
+"""
+
+from collections import OrderedDict
+from typing import Any, List, Optional
+
+
+class PreparedStatements:
+    """
+    Prepared statements of one connection, keyed by statement text.
+
+    Not thread-safe; it is only used by whoever has the connection checked out.
+
+    Args:
+        max_size: Statements kept prepared; the least recently used is deallocated first
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self.generation = 0
+        self._names: "OrderedDict[str, str]" = OrderedDict()
+        self._counter = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def execute(self, cursor, sql: str, params: Optional[List[Any]], generation: int) -> None:
+        """
+        Execute ``sql``, written with ``$1``-style placeholders, as a prepared statement.
+
+        Args:
+            cursor: Cursor of the connection owning these statements
+            sql: Statement text; also the cache key
+            params: Values for the placeholders
+            generation: Current schema generation; statements prepared under
+                an older one are deallocated first
+        """
+        name = self._prepare(cursor, sql, generation)
+        if params:
+            cursor.execute(f"EXECUTE {name}({', '.join(['%s'] * len(params))})", params)
+        else:
+            cursor.execute(f"EXECUTE {name}")
+
+    def discard(self, cursor, sql: str) -> None:
+        """Deallocate the statement prepared for ``sql``, if any, so the next use prepares it again."""
+        name = self._names.pop(sql, None)
+        if name is not None:
+            cursor.execute(f"DEALLOCATE {name}")
+
+    def _prepare(self, cursor, sql: str, generation: int) -> str:
+        if generation != self.generation:
+            if self._names:
+                cursor.execute("DEALLOCATE ALL")
+                self._names.clear()
+            self.generation = generation
+        name = self._names.get(sql)
+        if name is not None:
+            self._names.move_to_end(sql)
+            self.hits += 1
+            return name
+        self.misses += 1
+        self._counter += 1
+        name = f"dbmesh_{self._counter}"
+        # PREPARE and DEALLOCATE are not undone by a rollback, so the cache
+        # stays in step with the session even if the statement later fails.
+        cursor.execute(f"PREPARE {name} AS {sql}")
+        self._names[sql] = name
+        while len(self._names) > self.max_size:
+            _, evicted = self._names.popitem(last=False)
+            cursor.execute(f"DEALLOCATE {evicted}")
+        return name
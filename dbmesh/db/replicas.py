@@ -0,0 +1,173 @@
+"""
+Routing of read-only work across read replicas.
+
+Each replica has its own connection pool. A read picks the replica with the
+fewest calls in flight (``least_loaded``) or the lowest recent response time
+weighted by calls in flight (``latency``). Replicas that fail to connect, or
+whose replay lag exceeds the configured bound, are skipped until a health
+check finds them usable again. Reads fall back to the primary when no replica
+is usable.
+"""
+
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Literal, Optional
+
+import anyio
+from mcp.server.fastmcp.utilities.logging import get_logger
+
+from dbmesh.db.pool import ConnectionPool, PoolClosedError, PoolTimeoutError
+
+logger = get_logger(__name__)
+
+ReplicaStrategy = Literal["least_loaded", "latency"]
+
+# Weight of the newest sample in the response time moving average
+_LATENCY_ALPHA = 0.2
+
+
+class Replica:
+    """
+    One read replica and what is known about its health.
+
+    Attributes:
+        address: host:port of the replica
+        pool: Connection pool of the replica
+        in_flight: Reads currently holding one of its connections
+        latency: Moving average of read durations in seconds
+        lag: Replay lag in seconds at the last health check
+        healthy: Whether the last connection attempt succeeded
+    """
+
+    def __init__(self, address: str, pool: ConnectionPool) -> None:
+        self.address = address
+        self.pool = pool
+        self.in_flight = 0
+        self.latency = 0.0
+        self.lag: Optional[float] = None
+        self.healthy = True
+
+    def observe(self, seconds: float) -> None:
+        if self.latency:
+            self.latency += _LATENCY_ALPHA * (seconds - self.latency)
+        else:
+            self.latency = seconds
+
+    def mark_down(self, error: BaseException) -> None:
+        if self.healthy:
+            logger.warning(f"Replica {self.address} is unavailable: {error}")
+        self.healthy = False
+
+
+class ReplicaSet:
+    """
+    Read replicas of one database.
+
+    Args:
+        replicas: Replicas to route reads to
+        primary: Pool reads fall back to when no replica is usable
+        strategy: How to pick among usable replicas
+        max_lag: Seconds of replay lag above which a replica is skipped; None
+            routes to replicas regardless of lag
+    """
+
+    def __init__(
+        self,
+        replicas: List[Replica],
+        primary: ConnectionPool,
+        *,
+        strategy: ReplicaStrategy = "least_loaded",
+        max_lag: Optional[float] = None,
+    ) -> None:
+        self.replicas = replicas
+        self.primary = primary
+        self.strategy = strategy
+        self.max_lag = max_lag
+        self._next = 0
+
+    def usable(self, replica: Replica) -> bool:
+        if not replica.healthy:
+            return False
+        if self.max_lag is None:
+            return True
+        # Until the first lag check, a bounded replica is not trusted
+        return replica.lag is not None and replica.lag <= self.max_lag
+
+    def choose(self) -> Optional[Replica]:
+        """The replica the next read should go to, or None for the primary."""
+        candidates = [replica for replica in self.replicas if self.usable(replica)]
+        if not candidates:
+            return None
+        # Rotate the starting point so ties spread across replicas
+        self._next = (self._next + 1) % len(candidates)
+        candidates = candidates[self._next:] + candidates[:self._next]
+        if self.strategy == "latency":
+            return min(candidates, key=lambda r: (r.latency or 0.0) * (r.in_flight + 1))
+        return min(candidates, key=lambda r: r.in_flight)
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[Any]:
+        """Check out a connection for a read from a usable replica, else the primary."""
+        replica = self.choose()
+        if replica is None:
+            async with self.primary.connection() as conn:
+                yield conn
+            return
+        try:
+            conn = await replica.pool.acquire()
+        except (PoolTimeoutError, PoolClosedError):
+            raise
+        except Exception as e:
+            replica.mark_down(e)
+            async with self.primary.connection() as conn:
+                yield conn
+            return
+        replica.in_flight += 1
+        start = time.perf_counter()
+        try:
+            yield conn
+        except anyio.get_cancelled_exc_class():
+            await replica.pool.discard(conn)
+            raise
+        except BaseException:
+            await replica.pool.release(conn)
+            raise
+        else:
+            await replica.pool.release(conn)
+            replica.observe(time.perf_counter() - start)
+        finally:
+            replica.in_flight -= 1
+
+    async def check(self, run_sync: Callable[..., Awaitable[Any]], measure_lag: Callable[[Any], float]) -> None:
+        """
+        Probe every replica's connectivity and replay lag.
+
+        Args:
+            run_sync: Runs blocking driver calls off the event loop
+            measure_lag: Returns the replay lag of a connection in seconds
+        """
+        async with anyio.create_task_group() as tg:
+            for replica in self.replicas:
+                tg.start_soon(self._check, replica, run_sync, measure_lag)
+
+    async def _check(self, replica: Replica, run_sync, measure_lag) -> None:
+        try:
+            async with replica.pool.connection() as conn:
+                replica.lag = await run_sync(measure_lag, conn, cancel=getattr(conn, "cancel", None))
+        except Exception as e:
+            replica.mark_down(e)
+            return
+        if not replica.healthy:
+            logger.info(f"Replica {replica.address} is available again")
+        replica.healthy = True
+
+    async def open(self) -> None:
+        for replica in self.replicas:
+            try:
+                await replica.pool.open()
+            except Exception as e:
+                replica.mark_down(e)
+
+    def close(self) -> None:
+        for replica in self.replicas:
+            replica.pool.close()
@@ -0,0 +1,42 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+import pydantic_core
+
+
+@dataclass
+class TabularResult:
+    """
+    Columnar query result.
+
+    Serialized as the column names once plus one array per row instead of one
+    JSON object per row, which keeps wide result sets compact. The server's
+    content converter encodes it straight to JSON bytes in a single pass.
+
+    Attributes:
+        columns: Column names in row order
+        rows: Row values, one sequence per row
+        types: Optional database type name per column
+        extra: Additional top-level fields, e.g. a continuation token
+    """
+
+    columns: List[str]
+    rows: Sequence[Sequence[Any]]
+    types: Optional[List[str]] = None
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def to_json(self) -> bytes:
+        """Encode the result as compact JSON bytes."""
+        payload: Dict[str, Any] = {"columns": self.columns}
+        if self.types is not None:
+            payload["types"] = self.types
+        payload["rows"] = self.rows
+        payload.update(self.extra)
+        return pydantic_core.to_json(payload, bytes_mode="base64", fallback=str)
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Rows as one dict per row, for callers that want named access."""
+        return [dict(zip(self.columns, row)) for row in self.rows]
@@ -0,0 +1,159 @@
+"""
+Lexical helpers for SQL text sent to PostgreSQL.
+
+Nothing here parses SQL. The text is split into comments, literals, quoted
+identifiers and dollar-quoted bodies, which is enough to count statements, to
+normalize whitespace for cache keys and plan fingerprints, and to make a
+best-effort guess at the tables a statement touches.
+"""
+
+import re
+from typing import FrozenSet, Iterator, Set, Tuple
+
+_SPACE = re.compile(r"\s+")
+_PART = r'(?:"(?:[^"]|"")+"|[A-Za-z_][\w$]*)'
+_WORD = re.compile(rf"{_PART}(?:\.{_PART})*|[^\s\w]")
+_IDENT = re.compile(rf"{_PART}(?:\.{_PART})*")
+# What whitespace and semicolons inside must be left alone in: line comments,
+# the start of a (nestable) block comment, escape and plain string literals, quoted
+# identifiers and the opening tag of a dollar-quoted body. Unterminated ones
+# run to the end of the text, which PostgreSQL rejects as a whole anyway.
+_LEXEME = re.compile(
+    r"""--[^\n]*|/\*|(?<![\w$])[Ee]'(?:[^'\\]|\\.|'')*'?|'(?:[^']|'')*'?|"(?:[^"]|"")*"?"""
+    r"""|(?<![\w$])\$(?:[A-Za-z_]\w*)?\$|;""",
+    re.S,
+)
+_COMMENT_MARK = re.compile(r"/\*|\*/")
+# Keywords followed by a table name
+_TABLE_KEYWORDS = {"from", "join", "into", "update", "table", "truncate"}
+# Words that may sit between such a keyword and the table name
+_TABLE_PREFIXES = {"only", "if", "exists", "not", "lateral"}
+# Words that end a table reference; anything else after a table is an alias
+_ALIAS_STOP = {
+    "where", "group", "order", "limit", "offset", "on", "using", "set", "values",
+    "select", "returning", "having", "window", "union", "except", "intersect",
+    "for", "inner", "left", "right", "full", "cross", "natural", "outer", "default",
+}
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    Collapse whitespace outside of literals and comments and drop trailing
+    semicolons and comments. A line comment keeps the line break ending it.
+    """
+    pieces = list(_lex(sql))
+    while pieces and (pieces[-1][1] in (";", "") or _is_comment(*pieces[-1]) or not pieces[-1][1].strip()):
+        pieces.pop()
+    parts = []
+    after_comment = False
+    for lexeme, text in pieces:
+        if not lexeme:
+            text = _SPACE.sub(" ", text.lstrip() if after_comment or not parts else text)
+        parts.append(text + "\n" if lexeme and text.startswith("--") else text)
+        after_comment = lexeme and text.startswith("--")
+    return "".join(parts).rstrip()
+
+
+def count_statements(sql: str) -> int:
+    """
+    Number of statements in ``sql``: semicolons outside of literals, quoted
+    identifiers and comments separate them, and empty ones are not counted.
+    """
+    count = 0
+    pending = False
+    for lexeme, text in _lex(sql):
+        if lexeme and text == ";":
+            count += pending
+            pending = False
+        elif text.strip() and not _is_comment(lexeme, text):
+            pending = True
+    return count + pending
+
+
+def _lex(sql: str) -> Iterator[Tuple[bool, str]]:
+    """
+    Split ``sql`` into (lexeme, text) pieces: runs of plain SQL, and comments,
+    literals, quoted identifiers, dollar-quoted bodies and semicolons whole.
+    """
+    pos = 0
+    while pos < len(sql):
+        match = _LEXEME.search(sql, pos)
+        if match is None:
+            yield False, sql[pos:]
+            return
+        if match.start() > pos:
+            yield False, sql[pos:match.start()]
+        token = match.group()
+        end = match.end()
+        if token == "/*":
+            end = _comment_end(sql, end)
+        elif token.startswith("$"):
+            close = sql.find(token, end)
+            end = len(sql) if close < 0 else close + len(token)
+        yield True, sql[match.start():end]
+        pos = end
+
+
+def _is_comment(lexeme: bool, text: str) -> bool:
+    return lexeme and text.startswith(("--", "/*"))
+
+
+def _comment_end(sql: str, pos: int) -> int:
+    depth = 1
+    while depth:
+        match = _COMMENT_MARK.search(sql, pos)
+        if match is None:
+            return len(sql)
+        depth += 1 if match.group() == "/*" else -1
+        pos = match.end()
+    return pos
+
+
+def referenced_tables(sql: str) -> FrozenSet[str]:
+    """
+    Best-effort list of tables named in ``sql``.
+
+    Names are unqualified and lower-cased unless quoted; names of common table
+    expressions are left out. Callers treat an empty result as "any table", for
+    reads and writes alike, so missed names only cost a wider invalidation,
+    never a stale read.
+    """
+    tables: Set[str] = set()
+    state = None
+    # Comments drop out and literals are emptied, so neither can name a table
+    code = "".join(
+        (" " if _is_comment(lexeme, text) else "''" if text[0] in "'Ee$" else text) if lexeme else text
+        for lexeme, text in _lex(sql)
+    )
+    tokens = _WORD.findall(code)
+    # "name AS (", "name AS MATERIALIZED (" and "name AS NOT MATERIALIZED (" define a CTE
+    ctes = {
+        _table_name(token)
+        for token, after, then in zip(tokens, tokens[1:], tokens[2:])
+        if after.lower() == "as" and then.lower() in ("(", "materialized", "not") and _IDENT.fullmatch(token)
+    }
+    for token in tokens:
+        lower = token.lower()
+        if lower in _TABLE_KEYWORDS:
+            state = "table"
+        elif state == "table":
+            if lower in _TABLE_PREFIXES:
+                continue
+            if _IDENT.fullmatch(token):
+                tables.add(_table_name(token))
+                state = "alias"
+            else:
+                state = None
+        elif state == "alias":
+            if token == ",":
+                state = "table"
+            elif lower in _ALIAS_STOP or not _IDENT.fullmatch(token):
+                state = None
+    return frozenset(tables - ctes)
+
+
+def _table_name(identifier: str) -> str:
+    last = re.findall(_PART, identifier)[-1]
+    if last.startswith('"'):
+        return last[1:-1].replace('""', '"')
+    return last.lower()
@@ -1,12 +1,18 @@
 from mcp.server.fastmcp import FastMCP
 import inspect
 import json
+import random
 import re
+import secrets
+import time
 from collections.abc import AsyncIterator, Callable, Iterable, Sequence
 from contextlib import (
     AbstractAsyncContextManager,
+    AsyncExitStack,
     asynccontextmanager,
+    nullcontext,
 )
+from contextvars import ContextVar
 from itertools import chain
 from typing import Any, Generic, Literal
 
@@ -18,11 +24,17 @@ from pydantic.networks import AnyUrl
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from starlette.applications import Starlette
 from starlette.requests import Request
+from starlette.responses import PlainTextResponse
 from starlette.routing import Mount, Route
 
-from mcp.server.fastmcp.exceptions import ResourceError
+from mcp.server.fastmcp.exceptions import ResourceError, ToolError
 from mcp.server.fastmcp.prompts import Prompt, PromptManager
-from mcp.server.fastmcp.resources import FunctionResource, Resource, ResourceManager
+from mcp.server.fastmcp.resources import (
+    FunctionResource,
+    Resource,
+    ResourceManager,
+    ResourceTemplate,
+)
 from mcp.server.fastmcp.tools import ToolManager
 from mcp.server.fastmcp.utilities.logging import configure_logging, get_logger
 from mcp.server.fastmcp.utilities.types import Image
@@ -39,6 +51,8 @@ from mcp.types import (
     EmbeddedResource,
     GetPromptResult,
     ImageContent,
+    JSONRPCError,
+    JSONRPCResponse,
     TextContent,
 )
 from mcp.types import Prompt as MCPPrompt
@@ -46,10 +60,24 @@ from mcp.types import PromptArgument as MCPPromptArgument
 from mcp.types import Resource as MCPResource
 from mcp.types import ResourceTemplate as MCPResourceTemplate
 from mcp.types import Tool as MCPTool
+from dbmesh.core.admission import AdmissionController, AdmissionRejected
+from dbmesh.core.cache import ResultCache, cache_key
 from dbmesh.core.config import DBManager
+from dbmesh.core.metrics import ServerMetrics, database_timer
+from dbmesh.core.singleflight import SingleFlight
+from dbmesh.core.streamable_http import StatelessHTTPTransport, StatelessSession
+from dbmesh.core.workers import MessageRouter
+from dbmesh.core.workers import serve as serve_workers
+from dbmesh.core.tracing import Trace, TraceWriter, activate, current_trace, span, trace_requested
+from dbmesh.db.base import ToolAccess
+from dbmesh.db.results import TabularResult
+from dbmesh.db.sql import referenced_tables
 
 logger = get_logger(__name__)
 
+# Admission control key of the SSE session the current request arrived on
+_sse_session_key: ContextVar[str | None] = ContextVar("dbmesh_sse_session_key", default=None)
+
 def _convert_to_content(
     result: Any,
 ) -> Sequence[TextContent | ImageContent | EmbeddedResource]:
@@ -63,6 +91,10 @@ def _convert_to_content(
     if isinstance(result, Image):
         return [result.to_image_content()]
 
+    if isinstance(result, TabularResult):
+        # Encoded in one pass; column names are written once, not per row.
+        return [TextContent(type="text", text=result.to_json().decode())]
+
     if isinstance(result, list | tuple):
         return list(chain.from_iterable(_convert_to_content(item) for item in result))  # type: ignore[reportUnknownVariableType]
 
@@ -75,6 +107,25 @@ def _convert_to_content(
     return [TextContent(type="text", text=result)]
 
 
+def _tool_tables(access: ToolAccess, arguments: dict[str, Any]) -> frozenset[str]:
+    """Tables a tool call reads or writes, including those named in its SQL."""
+    sql = arguments.get(access.sql_argument) if access.sql_argument else None
+    if isinstance(sql, str):
+        return access.tables | referenced_tables(sql)
+    if isinstance(sql, list):
+        # A batch of statements, as strings or objects with a "sql" field
+        tables = set(access.tables)
+        for statement in sql:
+            text = statement.get("sql") if isinstance(statement, dict) else statement
+            found = referenced_tables(text) if isinstance(text, str) else frozenset()
+            if not found:
+                # One statement on unknown tables makes the whole batch's unknown
+                return frozenset()
+            tables |= found
+        return frozenset(tables)
+    return access.tables
+
+
 class Context(BaseModel, Generic[ServerSessionT, LifespanContextT]):
     """Context object providing access to MCP capabilities.
 
@@ -207,6 +258,21 @@ class Context(BaseModel, Generic[ServerSessionT, LifespanContextT]):
         """Get the unique ID for this request."""
         return str(self.request_context.request_id)
 
+    @property
+    def trace(self) -> Trace | None:
+        """The timing trace of this request, or None when it isn't traced."""
+        return current_trace()
+
+    def span(self, name: str, **attributes: Any):
+        """Time a block of the tool as a span of the request's trace.
+
+        A no-op when the request isn't traced::
+
+            with ctx.span("render"):
+                ...
+        """
+        return span(name, **attributes)
+
     @property
     def session(self):
         """Access to the underlying session for advanced usage."""
@@ -258,6 +324,20 @@ class DBMeshMCPServer:
             warn_on_duplicate_prompts=self.settings.warn_on_duplicate_prompts
         )
         self.dependencies = self.settings.dependencies
+        self._app_lifespans: list[Callable[[], AbstractAsyncContextManager[Any]]] = []
+        self._worker_initializers: list[Callable[[int, int], None]] = []
+        self._tool_access: dict[str, ToolAccess] = {}
+        self._result_cache = (
+            ResultCache(self.settings.result_cache_max_entries)
+            if self.settings.result_cache_max_entries > 0
+            else None
+        )
+        self._single_flight = SingleFlight()
+        self._resource_database: dict[str, str] = {}
+        self._template_database: list[tuple[ResourceTemplate, str]] = []
+        self._metrics = ServerMetrics()
+        self._trace_writer = TraceWriter(self.settings.trace_path)
+        self._admission = self._create_admission_controller()
 
         # Set up MCP protocol handlers
         self._setup_handlers()
@@ -273,9 +353,45 @@ class DBMeshMCPServer:
     def instructions(self) -> str | None:
         return self._mcp_server.instructions
 
-    def run(self) -> None:
+    def run(self, transport: Literal["sse"] = "sse") -> None:
         # for now i just intend to use sse    
-        anyio.run(self.run_sse_async)
+        if self.settings.workers > 1:
+            serve_workers(self, self.settings.workers)
+        else:
+            anyio.run(self.run_sse_async)
+
+    def add_worker_initializer(self, initializer: Callable[[int, int], None]) -> None:
+        """Register a callable run in each worker process before it starts serving.
+
+        Args:
+            initializer: Called with the worker's index and the number of workers
+        """
+        self._worker_initializers.append(initializer)
+
+    def init_worker(self, index: int, workers: int) -> None:
+        """Prepare this process to serve as worker ``index`` of ``workers``."""
+        for initializer in self._worker_initializers:
+            initializer(index, workers)
+
+    def add_lifespan(
+        self, lifespan: Callable[[], AbstractAsyncContextManager[Any]]
+    ) -> None:
+        """Register a context manager entered once for the lifetime of the app.
+
+        Unlike ``Settings.lifespan``, which wraps every MCP session, these are
+        entered when the HTTP app starts and exited when it shuts down.
+
+        Args:
+            lifespan: Zero-argument callable returning an async context manager
+        """
+        self._app_lifespans.append(lifespan)
+
+    @asynccontextmanager
+    async def _app_lifespan(self, app: Starlette) -> AsyncIterator[None]:
+        async with AsyncExitStack() as stack:
+            for lifespan in self._app_lifespans:
+                await stack.enter_async_context(lifespan())
+            yield
 
     def _setup_handlers(self) -> None:
         """Set up core MCP protocol handlers."""
@@ -288,8 +404,9 @@ class DBMeshMCPServer:
         self._mcp_server.list_resource_templates()(self.list_resource_templates)
 
     async def list_tools(self) -> list[MCPTool]:
-        """List all available tools."""
+        """List all available tools; stateless requests only see stateless ones."""
         tools = self._tool_manager.list_tools()
+        stateless = self._is_stateless_request()
         return [
             MCPTool(
                 name=info.name,
@@ -297,8 +414,20 @@ class DBMeshMCPServer:
                 inputSchema=info.parameters,
             )
             for info in tools
+            if not (stateless and self._is_stateful(info.name))
         ]
 
+    def _is_stateless_request(self) -> bool:
+        """Whether the current request came over stateless HTTP, with no session to keep state for."""
+        try:
+            return isinstance(self._mcp_server.request_context.session, StatelessSession)
+        except LookupError:
+            return False
+
+    def _is_stateful(self, name: str) -> bool:
+        access = self._tool_access.get(name)
+        return access is not None and access.stateful
+
     def get_context(self) -> Context[ServerSession, object]:
         """
         Returns a Context object. Note that the context will only be valid
@@ -310,15 +439,202 @@ class DBMeshMCPServer:
             request_context = None
         return Context(request_context=request_context, fastmcp=self)
 
+    def _create_admission_controller(self) -> AdmissionController | None:
+        settings = self.settings
+        if not (
+            settings.max_concurrent_calls
+            or settings.max_concurrent_calls_per_client
+            or settings.client_rate_limit
+        ):
+            return None
+        admission = AdmissionController(
+            max_concurrent=settings.max_concurrent_calls,
+            max_per_client=settings.max_concurrent_calls_per_client,
+            rate=settings.client_rate_limit,
+            burst=settings.client_rate_burst,
+            max_queue=settings.admission_queue_size,
+            queue_timeout=settings.admission_queue_timeout,
+            weights=settings.client_weights,
+        )
+        self._metrics.add_collector(lambda: self._metrics.admission_queued.set(admission.queued))
+        return admission
+
+    def _admission_key(self) -> str:
+        """Admission control key of the caller: its client id, else its session or address."""
+        try:
+            request_context = self._mcp_server.request_context
+        except LookupError:
+            return ""
+        client_id = getattr(request_context.meta, "client_id", None) if request_context.meta else None
+        if client_id:
+            return str(client_id)
+        # Stateless HTTP requests have no session to tell callers apart
+        client_key = getattr(request_context.session, "client_key", None)
+        return client_key or _sse_session_key.get() or f"session:{id(request_context.session)}"
+
+    def _client_label(self) -> str:
+        """Metrics label of the calling client: its id, else its reported name."""
+        try:
+            request_context = self._mcp_server.request_context
+        except LookupError:
+            return ""
+        client_id = getattr(request_context.meta, "client_id", None) if request_context.meta else None
+        if client_id:
+            return str(client_id)
+        params = getattr(request_context.session, "client_params", None)
+        return params.clientInfo.name if params is not None else "unknown"
+
+    def _start_trace(self, kind: str, name: str, **attributes: Any) -> Trace | None:
+        """Start a trace if this request is sampled or the client asked for one."""
+        settings = self.settings
+        sampled = settings.trace_sample_rate > 0 and random.random() < settings.trace_sample_rate
+        if not sampled and settings.trace_client_requests:
+            try:
+                sampled = trace_requested(self._mcp_server.request_context.meta)
+            except LookupError:
+                pass
+        return Trace(kind, name, **attributes) if sampled else None
+
+    async def _finish_trace(self, trace: Trace, status: str) -> None:
+        """Write ``trace`` now, or once an SSE session has handed off the response."""
+        trace.finish(status=status)
+        try:
+            request_context = self._mcp_server.request_context
+        except LookupError:
+            request_context = None
+        if request_context is not None:
+            trace.attributes["request_id"] = request_context.request_id
+            stream = getattr(request_context.session, "_write_stream", None)
+            if isinstance(stream, _TracedWriteStream):
+                stream.pending[request_context.request_id] = trace
+                return
+        with anyio.CancelScope(shield=True):
+            await self._trace_writer.write(trace)
+
     async def call_tool(
         self, name: str, arguments: dict[str, Any]
     ) -> Sequence[TextContent | ImageContent | EmbeddedResource]:
         """Call a tool by name with arguments."""
-        context = self.get_context()
-        result = await self._tool_manager.call_tool(name, arguments, context=context)
-        converted_result = _convert_to_content(result)
+        access = self._tool_access.get(name)
+        if access is not None and access.stateful and self._is_stateless_request():
+            # Cursors and exports live in the process that created them, which a
+            # later stateless request is not guaranteed to reach
+            raise ToolError(f"Tool {name} keeps server-side state and is only available over SSE")
+        database = access.database if access is not None else ""
+        client = self._client_label()
+        metrics = self._metrics
+        trace = self._start_trace("tool", name, database=database, client=client)
+        status = "error"
+        start = time.perf_counter()
+        with database_timer() as db_time, activate(trace):
+            try:
+                async with self._admit():
+                    result = await self._call_tool_with_timeout(name, arguments, access)
+                status = "ok"
+                return result
+            except AdmissionRejected as e:
+                status = "rejected"
+                metrics.admission_rejections.inc(client=client, reason=e.reason)
+                raise
+            except TimeoutError:
+                status = "timeout"
+                raise
+            finally:
+                metrics.tool_calls.inc(tool=name, database=database, client=client, status=status)
+                metrics.tool_seconds.observe(
+                    time.perf_counter() - start, tool=name, database=database, client=client
+                )
+                if db_time.seconds:
+                    metrics.database_seconds.observe(
+                        db_time.seconds, database=database, tool=name, client=client
+                    )
+                if trace is not None:
+                    await self._finish_trace(trace, status)
+
+    def _admit(self) -> AbstractAsyncContextManager[None]:
+        """Wait for the caller's turn under admission control, if enabled."""
+        if self._admission is None:
+            return nullcontext()
+        return self._admission.admit(self._admission_key())
+
+    async def _call_tool_with_timeout(
+        self, name: str, arguments: dict[str, Any], access: ToolAccess | None
+    ) -> Sequence[TextContent | ImageContent | EmbeddedResource]:
+        if access is None or not access.timeout:
+            return await self._call_tool(name, arguments, access)
+        # Cancelling the call also cancels its running statement.
+        try:
+            with anyio.fail_after(access.timeout):
+                return await self._call_tool(name, arguments, access)
+        except TimeoutError:
+            raise TimeoutError(f"Tool {name} timed out after {access.timeout}s") from None
+
+    async def _call_tool(
+        self, name: str, arguments: dict[str, Any], access: ToolAccess | None
+    ) -> Sequence[TextContent | ImageContent | EmbeddedResource]:
+        # Only stateless reads may be served from the cache or shared.
+        shareable = access is not None and access.read_only and not access.stateful
+        cache = self._result_cache
+        cacheable = cache is not None and shareable and bool(access.cache_ttl)
+        if shareable and (cacheable or self.settings.coalesce_tool_calls):
+            key = cache_key(name, arguments, access.sql_argument)
+        if cacheable:
+            with span("cache"):
+                cached = cache.get(key)
+            if cached is not None:
+                return cached
+            generation = cache.generation(access.database)
+
+        try:
+            if shareable and self.settings.coalesce_tool_calls:
+                # Identical concurrent reads share one execution and conversion.
+                converted_result = await self._single_flight.do(
+                    key, lambda: self._run_tool(name, arguments)
+                )
+            else:
+                converted_result = await self._run_tool(name, arguments)
+        finally:
+            if cache is not None and access is not None and not access.read_only:
+                # Writes drop results of the tables they touch, or of the whole
+                # database when the tables can't be determined. A write that
+                # failed or was cancelled may have committed part of its work.
+                tables = _tool_tables(access, arguments)
+                cache.invalidate(access.database, tables or None)
+
+        if cacheable:
+            cache.put(
+                key,
+                converted_result,
+                database=access.database,
+                tables=_tool_tables(access, arguments),
+                ttl=access.cache_ttl,
+                generation=generation,
+            )
         return converted_result
 
+    async def _run_tool(
+        self, name: str, arguments: dict[str, Any]
+    ) -> Sequence[TextContent | ImageContent | EmbeddedResource]:
+        context = self.get_context()
+        # Argument validation and the tool itself; database calls nest inside.
+        with span("tool"):
+            result = await self._tool_manager.call_tool(name, arguments, context=context)
+        start = time.perf_counter()
+        with span("convert"):
+            content = _convert_to_content(result)
+        self._metrics.conversion_seconds.observe(time.perf_counter() - start, tool=name)
+        return content
+
+    @property
+    def result_cache(self) -> ResultCache | None:
+        """The tool result cache, or None when caching is disabled."""
+        return self._result_cache
+
+    @property
+    def metrics(self) -> ServerMetrics:
+        """Request metrics served on ``Settings.metrics_path``."""
+        return self._metrics
+
     async def list_resources(self) -> list[MCPResource]:
         """List all available resources."""
 
@@ -347,32 +663,133 @@ class DBMeshMCPServer:
     async def read_resource(self, uri: AnyUrl | str) -> Iterable[ReadResourceContents]:
         """Read a resource by URI."""
 
-        resource = await self._resource_manager.get_resource(uri)
-        if not resource:
-            raise ResourceError(f"Unknown resource: {uri}")
+        database = self._resource_database.get(str(uri)) or self._template_database_of(str(uri))
+        client = self._client_label()
+        trace = self._start_trace("resource", str(uri), database=database, client=client)
+        status = "error"
+        start = time.perf_counter()
+        with database_timer() as db_time, activate(trace):
+            try:
+                resource = await self._resource_manager.get_resource(uri)
+                if not resource:
+                    raise ResourceError(f"Unknown resource: {uri}")
+
+                try:
+                    with span("read"):
+                        content = await resource.read()
+                except Exception as e:
+                    logger.error(f"Error reading resource {uri}: {e}")
+                    raise ResourceError(str(e))
+                status = "ok"
+                return [ReadResourceContents(content=content, mime_type=resource.mime_type)]
+            finally:
+                self._metrics.resource_reads.inc(database=database, client=client, status=status)
+                self._metrics.resource_seconds.observe(
+                    time.perf_counter() - start, database=database, client=client
+                )
+                if db_time.seconds:
+                    self._metrics.database_seconds.observe(
+                        db_time.seconds, database=database, tool="", client=client
+                    )
+                if trace is not None:
+                    await self._finish_trace(trace, status)
 
-        try:
-            content = await resource.read()
-            return [ReadResourceContents(content=content, mime_type=resource.mime_type)]
-        except Exception as e:
-            logger.error(f"Error reading resource {uri}: {e}")
-            raise ResourceError(str(e))
+    def _template_database_of(self, uri: str) -> str:
+        for template, database in self._template_database:
+            if template.matches(uri) is not None:
+                return database
+        return ""
 
     def add_tool(
         self,
         fn: AnyFunction,
         name: str | None = None,
         description: str | None = None,
+        access: ToolAccess | None = None,
     ) -> None:
-        self._tool_manager.add_tool(fn, name=name, description=description)
+        """Add a tool to the server.
 
-    def add_resource(self, resource: Resource) -> None:
+        Args:
+            fn: Tool callable
+            name: Optional tool name, defaults to the function name
+            description: Optional description, defaults to the docstring
+            access: How the tool touches its database, used by the result cache
+        """
+        tool = self._tool_manager.add_tool(fn, name=name, description=description)
+        if access is not None:
+            self._tool_access[tool.name] = access
+
+    def remove_tool(self, name: str) -> None:
+        """Remove a tool from the server.
+
+        Args:
+            name: Name of the tool to remove
+        """
+        self._tool_manager._tools.pop(name, None)  # type: ignore[reportPrivateUsage]
+        self._tool_access.pop(name, None)
+
+    def add_resource(self, resource: Resource, database: str | None = None) -> None:
         """Add a resource to the server.
 
         Args:
             resource: A Resource instance to add
+            database: Database the resource reads from, used to label metrics
         """
         self._resource_manager.add_resource(resource)
+        if database is not None:
+            self._resource_database[str(resource.uri)] = database
+
+    def add_resource_template(
+        self,
+        fn: AnyFunction,
+        uri_template: str,
+        name: str | None = None,
+        description: str | None = None,
+        mime_type: str | None = None,
+        database: str | None = None,
+    ) -> None:
+        """Add a resource template to the server.
+
+        Args:
+            fn: Function called with the parameters matched from the URI
+            uri_template: URI with {parameter} placeholders, each matching one path segment
+            name: Optional template name, defaults to the function name
+            description: Optional description, defaults to the docstring
+            mime_type: MIME type of the produced content
+            database: Database the resources read from, used to label metrics
+        """
+        template = self._resource_manager.add_template(
+            fn, uri_template, name=name, description=description, mime_type=mime_type
+        )
+        if database is not None:
+            self._template_database.append((template, database))
+
+    def remove_resource(self, uri: AnyUrl | str) -> None:
+        """Remove a resource from the server.
+
+        Args:
+            uri: URI of the resource to remove
+        """
+        self._resource_manager._resources.pop(str(uri), None)  # type: ignore[reportPrivateUsage]
+        self._resource_database.pop(str(uri), None)
+
+    def remove_database(self, database: str) -> None:
+        """Remove every tool, resource and resource template of a database and its cached results.
+
+        Args:
+            database: Database the entries were registered for
+        """
+        for name in [name for name, access in self._tool_access.items() if access.database == database]:
+            self.remove_tool(name)
+        for uri in [uri for uri, owner in self._resource_database.items() if owner == database]:
+            self.remove_resource(uri)
+        templates = self._resource_manager._templates  # type: ignore[reportPrivateUsage]
+        for template, owner in self._template_database:
+            if owner == database:
+                templates.pop(template.uri_template, None)
+        self._template_database = [entry for entry in self._template_database if entry[1] != database]
+        if self._result_cache is not None:
+            self._result_cache.invalidate(database)
 
     def add_prompt(self, prompt: Prompt) -> None:
         """Add a prompt to the server.
@@ -395,28 +812,80 @@ class DBMeshMCPServer:
         server = uvicorn.Server(config)
         await server.serve()
 
-    def sse_app(self) -> Starlette:
-        """Return an instance of the SSE server app."""
-        sse = SseServerTransport(self.settings.message_path)
+    def sse_app(self, worker: int | None = None, worker_socket_dir: str | None = None) -> Starlette:
+        """Return an instance of the SSE server app.
+
+        Args:
+            worker: Index of the worker process serving the app, when there are several
+            worker_socket_dir: Directory of the workers' Unix sockets, used to
+                forward messages to the worker owning their session
+        """
+        message_path = self.settings.message_path
+        if worker is not None:
+            message_path = f"{message_path}{worker}/"
+        sse = SseServerTransport(message_path)
+        handle_message = sse.handle_post_message
+        if worker is not None and worker_socket_dir is not None:
+            handle_message = MessageRouter(
+                worker, self.settings.message_path, sse.handle_post_message, worker_socket_dir
+            )
 
         async def handle_sse(request: Request) -> None:
-            async with sse.connect_sse(
-                request.scope,
-                request.receive,
-                request._send,  # type: ignore[reportPrivateUsage]
-            ) as streams:
-                await self._mcp_server.run(
-                    streams[0],
-                    streams[1],
-                    self._mcp_server.create_initialization_options(),
-                )
+            self._metrics.sse_sessions.inc()
+            # Unlike id() of the session, never reused by a later session
+            session_key = f"session:{secrets.token_hex(8)}"
+            token = _sse_session_key.set(session_key)
+            try:
+                async with sse.connect_sse(
+                    request.scope,
+                    request.receive,
+                    request._send,  # type: ignore[reportPrivateUsage]
+                ) as streams:
+                    write_stream = streams[1]
+                    if self.settings.trace_sample_rate > 0 or self.settings.trace_client_requests:
+                        write_stream = _TracedWriteStream(write_stream, self._trace_writer)
+                    await self._mcp_server.run(
+                        streams[0],
+                        write_stream,
+                        self._mcp_server.create_initialization_options(),
+                    )
+            finally:
+                _sse_session_key.reset(token)
+                if self._admission is not None:
+                    self._admission.forget(session_key)
+                self._metrics.sse_sessions.dec()
+
+        async def handle_metrics(request: Request) -> PlainTextResponse:
+            return PlainTextResponse(
+                self._metrics.render(), media_type="text/plain; version=0.0.4"
+            )
+
+        routes = [
+            Route(self.settings.sse_path, endpoint=handle_sse),
+            Mount(self.settings.message_path, app=handle_message),
+        ]
+        if self.settings.metrics_path:
+            routes.append(Route(self.settings.metrics_path, endpoint=handle_metrics))
+        lifespan = self._app_lifespan
+        if self.settings.streamable_http_path:
+            http = StatelessHTTPTransport(
+                self._mcp_server,
+                self._mcp_server.create_initialization_options(),
+                client_header=self.settings.http_client_header,
+            )
+            routes.append(
+                Route(self.settings.streamable_http_path, endpoint=http, methods=["GET", "POST", "DELETE"])
+            )
+
+            @asynccontextmanager
+            async def lifespan(app: Starlette) -> AsyncIterator[None]:
+                async with self._app_lifespan(app), http.lifespan():
+                    yield
 
         return Starlette(
             debug=self.settings.debug,
-            routes=[
-                Route(self.settings.sse_path, endpoint=handle_sse),
-                Mount(self.settings.message_path, app=sse.handle_post_message),
-            ],
+            lifespan=lifespan,
+            routes=routes,
         )
 
     async def list_prompts(self) -> list[MCPPrompt]:
@@ -451,6 +920,45 @@ class DBMeshMCPServer:
             raise ValueError(str(e))
 
 
+class _TracedWriteStream:
+    """Write stream of an SSE session that times the hand-off of traced responses.
+
+    Traces of requests on the session are parked in ``pending`` until their
+    response is handed to the SSE writer, so the wait for the writer is part of
+    the trace.
+    """
+
+    def __init__(self, stream: Any, writer: TraceWriter) -> None:
+        self._stream = stream
+        self._writer = writer
+        self.pending: dict[Any, Trace] = {}
+
+    async def send(self, message: Any) -> None:
+        trace = None
+        if self.pending and isinstance(message.root, JSONRPCResponse | JSONRPCError):
+            trace = self.pending.pop(message.root.id, None)
+        if trace is None:
+            await self._stream.send(message)
+            return
+        try:
+            with trace.span("write"):
+                await self._stream.send(message)
+        finally:
+            trace.finish()
+            with anyio.CancelScope(shield=True):
+                await self._writer.write(trace)
+
+    async def __aenter__(self) -> "_TracedWriteStream":
+        await self._stream.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> Any:
+        return await self._stream.__aexit__(*exc_info)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._stream, name)
+
+
 class Settings(BaseSettings, Generic[LifespanResultT]):
     model_config = SettingsConfigDict(
         env_prefix="DBMESH_",
@@ -467,10 +975,59 @@ class Settings(BaseSettings, Generic[LifespanResultT]):
     port: int = 8000
     sse_path: str = "/sse"
     message_path: str = "/messages/"
+    # stateless streamable HTTP endpoint served next to SSE; each POST is a
+    # self-contained call any worker or replica can answer. Tools keeping
+    # server-side state (paginated queries, exports) are only served over SSE.
+    # None disables it
+    streamable_http_path: str | None = "/mcp"
+    # header a trusted proxy or load balancer sets to the caller's address,
+    # e.g. X-Forwarded-For, used to tell apart stateless HTTP callers without a
+    # client id; by default the peer address is used
+    http_client_header: str | None = None
     # by default warn on duplicates
     warn_on_duplicate_resources: bool = True
     warn_on_duplicate_tools: bool = True
     warn_on_duplicate_prompts: bool = True
+    # opt-in tool result cache; 0 disables it, TTLs are set per database
+    result_cache_max_entries: int = 0
+    # share one execution between identical concurrent read-only tool calls
+    coalesce_tool_calls: bool = True
+    # Prometheus-style metrics route; None disables it
+    metrics_path: str | None = "/metrics"
+    # admission control of tool calls, keyed by client id or session; all
+    # limits default to 0 (off) and weights are relative to 1 per client id
+    max_concurrent_calls: int = 0
+    max_concurrent_calls_per_client: int = 0
+    client_rate_limit: float = 0.0
+    client_rate_burst: int = 10
+    admission_queue_size: int = 100
+    admission_queue_timeout: float = 10.0
+    client_weights: dict[str, float] = Field(default_factory=dict)
+    # federated_query fan-out: databases queried at once (0 for all) and seconds
+    # each may run before the result is returned without it (0 waits)
+    fan_out_max_concurrency: int = 8
+    fan_out_shard_timeout: float = 30.0
+    # seconds between checks of config_path for changes, which are applied per
+    # database without a restart; 0 disables reloading
+    config_reload_interval: float = 5.0
+    # seconds each database may take to connect, warm its pool and introspect
+    # its schema at startup; slower or failing ones are marked degraded and
+    # retried in the background. A database's own connect_timeout takes precedence
+    database_connect_timeout: float = 30.0
+    # worker processes serving the SSE app; above 1, messages are routed to the
+    # worker holding their session and each database's connections are split
+    # between the workers. Cursors of paginated queries stay in one worker, so
+    # they can only be continued on the session that opened them
+    workers: int = 1
+    # request tracing: fraction of requests traced, whether clients may ask for
+    # a trace via _meta.dbmesh_trace, and where traces are appended
+    trace_sample_rate: float = 0.0
+    trace_client_requests: bool = False
+    trace_path: str = ".dbmesh/traces.jsonl"
+    # YAML file listing the databases to serve; without it the example backend is served
+    config_path: str | None = "config.yaml"
+    # schema snapshot used for fast cold starts; None disables it
+    schema_snapshot_path: str | None = ".dbmesh/schema.snapshot"
     dependencies: list[str] = Field(
         default_factory=list,
         description="List of dependencies to install in the server environment",
@@ -492,6 +1049,6 @@ def lifespan_wrapper(
     return wrap
 
 
-db_mesh_server = FastMCP("DBMesh")
-DBManager(db_mesh_server)
+db_mesh_server = DBMeshMCPServer("DBMesh")
+db_manager = DBManager(db_mesh_server)
 
@@ -0,0 +1,52 @@
+import unittest
+
+import anyio
+
+from dbmesh.benchmarks.run_benchmarks import format_report, percentile, run_benchmarks, summarize
+
+
+class TestSummaries(unittest.TestCase):
+    """Test cases for latency summaries."""
+
+    def test_percentile_is_nearest_rank(self):
+        """Percentiles pick an observed sample."""
+        samples = [float(i) for i in range(1, 101)]
+        self.assertEqual(percentile(samples, 50), 50.0)
+        self.assertEqual(percentile(samples, 99), 99.0)
+        self.assertEqual(percentile([], 99), 0.0)
+
+    def test_summarize(self):
+        """Latencies are reported in milliseconds with throughput."""
+        summary = summarize([0.001, 0.002, 0.003, 0.004], elapsed=2.0, errors=1)
+        self.assertEqual(summary["calls"], 4)
+        self.assertEqual(summary["errors"], 1)
+        self.assertEqual(summary["calls_per_sec"], 2.0)
+        self.assertEqual(summary["p50_ms"], 2.0)
+        self.assertEqual(summary["p99_ms"], 4.0)
+
+
+class TestRunBenchmarks(unittest.TestCase):
+    """Test cases for running the benchmark scenarios."""
+
+    def test_memory_run_covers_every_scenario(self):
+        """A short in-memory run exercises tools and resources without errors."""
+        report = anyio.run(lambda: run_benchmarks(transport="memory", clients=2, calls=3, rows=5, tables=2))
+        self.assertEqual(
+            set(report["results"]),
+            {"list_tools", "call_tool:add", "call_tool:fake_query", "read_resource"},
+        )
+        for summary in report["results"].values():
+            self.assertEqual(summary["calls"], 6)
+            self.assertEqual(summary["errors"], 0)
+
+    def test_report_compares_against_baseline(self):
+        """Changes against an earlier run are shown per scenario."""
+        summary = {"calls": 1, "errors": 0, "calls_per_sec": 200.0, "p50_ms": 1.0,
+                   "p95_ms": 2.0, "p99_ms": 3.0, "max_rss_mb": 50.0}
+        report = {"commit": "new", "params": {}, "results": {"list_tools": summary}}
+        baseline = {"commit": "old", "results": {"list_tools": {**summary, "calls_per_sec": 100.0}}}
+        self.assertIn("+100.0%", format_report(report, baseline))
+
+
+if __name__ == "__main__":
+    unittest.main()
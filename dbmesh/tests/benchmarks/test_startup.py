@@ -0,0 +1,28 @@
+import unittest
+
+from dbmesh.benchmarks.startup import format_report, parse_importtime, run_startup_benchmark
+
+
+class TestStartupBenchmark(unittest.TestCase):
+    """Test cases for the startup benchmark."""
+
+    def test_parse_importtime(self):
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |   _io\n"
+            "import time:      4000 |       4120 | dbmesh.server\n"
+        )
+        self.assertEqual(parse_importtime(output), {"_io": 120, "dbmesh.server": 4000})
+
+    def test_only_configured_backends_are_imported(self):
+        report = run_startup_benchmark(runs=1, top=3)
+        summary = report["results"]["startup"]
+        self.assertEqual(summary["databases"], ["ExampleManager"])
+        self.assertIn("dbmesh.db.example", summary["backends"])
+        self.assertNotIn("dbmesh.db.postgres", summary["backends"])
+        self.assertEqual(len(summary["slowest_modules_ms"]), 3)
+        self.assertIn("import dbmesh.server", format_report(report, report))
+
+
+if __name__ == "__main__":
+    unittest.main()
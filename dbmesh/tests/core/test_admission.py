@@ -0,0 +1,163 @@
+import unittest
+
+import anyio
+
+from dbmesh.core.admission import AdmissionController, AdmissionRejected
+
+
+class TestAdmissionController(unittest.TestCase):
+    """Test cases for the AdmissionController class."""
+
+    def test_rate_limit_rejects_after_burst(self):
+        """A client may start ``burst`` calls at once, then is rejected."""
+        admission = AdmissionController(rate=1.0, burst=2)
+
+        async def main():
+            for _ in range(2):
+                async with admission.admit("a"):
+                    pass
+            with self.assertRaises(AdmissionRejected) as cm:
+                async with admission.admit("a"):
+                    pass
+            self.assertEqual(cm.exception.reason, "rate")
+            # Other clients have their own bucket
+            async with admission.admit("b"):
+                pass
+
+        anyio.run(main)
+
+    def test_per_client_cap_queues_calls(self):
+        """Calls over a client's cap wait for its running calls to finish."""
+        admission = AdmissionController(max_per_client=1)
+        running = []
+        peak = []
+
+        async def call():
+            async with admission.admit("a"):
+                running.append(1)
+                peak.append(len(running))
+                await anyio.sleep(0.01)
+                running.pop()
+
+        async def main():
+            async with anyio.create_task_group() as tg:
+                for _ in range(4):
+                    tg.start_soon(call)
+
+        anyio.run(main)
+        self.assertEqual(max(peak), 1)
+        self.assertEqual(admission.running, 0)
+        self.assertEqual(admission.queued, 0)
+        self.assertEqual(admission._clients, {})
+
+    def _serve(self, admission, clients):
+        """Queue calls from ``clients`` behind a running call; return the order they ran."""
+        order = []
+
+        async def call(client):
+            async with admission.admit(client):
+                order.append(client)
+
+        async def main():
+            async with anyio.create_task_group() as tg:
+                async with admission.admit("blocker"):
+                    for client in clients:
+                        tg.start_soon(call, client)
+                    await anyio.sleep(0.01)
+                    self.assertEqual(admission.queued, len(clients))
+
+        anyio.run(main)
+        return order
+
+    def test_queued_calls_are_served_fairly(self):
+        """A client with a backlog does not hold up other clients."""
+        admission = AdmissionController(max_concurrent=1)
+        order = self._serve(admission, ["noisy"] * 4 + ["quiet"])
+        self.assertLessEqual(order.index("quiet"), 1)
+
+    def test_weights_share_slots(self):
+        """A client with twice the weight is served twice as often."""
+        admission = AdmissionController(max_concurrent=1, weights={"heavy": 2.0})
+        order = self._serve(admission, ["light"] * 3 + ["heavy"] * 3)
+        self.assertEqual(order[:4].count("heavy"), 3)
+
+    def test_full_queue_rejects_immediately(self):
+        """Calls beyond the queue bound are rejected without waiting."""
+        admission = AdmissionController(max_concurrent=1, max_queue=1)
+        errors = []
+
+        async def call():
+            try:
+                async with admission.admit("a"):
+                    await anyio.sleep(0.05)
+            except AdmissionRejected as e:
+                errors.append(e.reason)
+
+        async def main():
+            async with anyio.create_task_group() as tg:
+                for _ in range(3):
+                    tg.start_soon(call)
+
+        anyio.run(main)
+        self.assertEqual(errors, ["queue_full"])
+
+    def test_queue_timeout(self):
+        """Calls waiting longer than the queue timeout are rejected."""
+        admission = AdmissionController(max_concurrent=1, queue_timeout=0.02)
+        errors = []
+
+        async def call():
+            try:
+                async with admission.admit("a"):
+                    await anyio.sleep(0.2)
+            except AdmissionRejected as e:
+                errors.append(e.reason)
+
+        async def main():
+            async with anyio.create_task_group() as tg:
+                tg.start_soon(call)
+                await anyio.sleep(0)
+                tg.start_soon(call)
+
+        anyio.run(main)
+        self.assertEqual(errors, ["queue_timeout"])
+        self.assertEqual(admission.queued, 0)
+
+    def test_cancelled_waiter_leaves_the_queue(self):
+        """Cancelling a queued call frees its place without leaking a slot."""
+        admission = AdmissionController(max_concurrent=1)
+
+        async def main():
+            async with admission.admit("a"):
+                with anyio.move_on_after(0.02):
+                    async with admission.admit("b"):
+                        pass
+                self.assertEqual(admission.queued, 0)
+            self.assertEqual(admission.running, 0)
+            async with admission.admit("b"):
+                pass
+
+        anyio.run(main)
+        self.assertEqual(admission._clients, {})
+
+    def test_idle_clients_are_forgotten(self):
+        """Clients with a partly drained bucket are dropped once it would have refilled."""
+        admission = AdmissionController(rate=100.0, burst=2)
+
+        async def main():
+            for key in ("a", "b"):
+                async with admission.admit(key):
+                    pass
+            self.assertEqual(set(admission._clients), {"a", "b"})
+            admission.forget("b")
+            self.assertEqual(set(admission._clients), {"a"})
+            await anyio.sleep(0.05)
+            async with admission.admit("c"):
+                pass
+            self.assertEqual(set(admission._clients), {"c"})
+
+        anyio.run(main)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import time
+import unittest
+
+from dbmesh.core.cache import ResultCache, cache_key
+
+
+class TestResultCache(unittest.TestCase):
+    """Test cases for the ResultCache class."""
+
+    def setUp(self):
+        """Create a small cache."""
+        self.cache = ResultCache(max_entries=2)
+
+    def test_hit_and_miss_counters(self):
+        """Lookups are counted as hits or misses."""
+        self.assertIsNone(self.cache.get("k"))
+        self.cache.put("k", [1], database="db", tables=["t"], ttl=60)
+        self.assertEqual(self.cache.get("k"), [1])
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+
+    def test_lru_eviction(self):
+        """The least recently used entry is evicted first."""
+        for key in ("a", "b"):
+            self.cache.put(key, key, database="db", tables=[], ttl=60)
+        self.cache.get("a")
+        self.cache.put("c", "c", database="db", tables=[], ttl=60)
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(self.cache.get("a"), "a")
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+    def test_ttl_expiry(self):
+        """Entries expire after their TTL."""
+        self.cache.put("k", 1, database="db", tables=[], ttl=0.01)
+        time.sleep(0.02)
+        self.assertIsNone(self.cache.get("k"))
+        self.assertEqual(len(self.cache), 0)
+
+    def test_invalidate_by_table(self):
+        """A write to a table drops only results depending on it."""
+        self.cache.put("users", 1, database="db", tables=["users"], ttl=60)
+        self.cache.put("orders", 2, database="db", tables=["orders"], ttl=60)
+        self.assertEqual(self.cache.invalidate("db", ["users"]), 1)
+        self.assertIsNone(self.cache.get("users"))
+        self.assertEqual(self.cache.get("orders"), 2)
+        self.assertEqual(self.cache.invalidate("db"), 1)
+
+    def test_put_after_invalidation_is_dropped(self):
+        """A read that raced with a write is not cached."""
+        generation = self.cache.generation("db")
+        self.cache.invalidate("db", ["users"])
+        self.cache.put("k", 1, database="db", tables=["users"], ttl=60, generation=generation)
+        self.assertIsNone(self.cache.get("k"))
+
+
+class TestCacheKeys(unittest.TestCase):
+    """Test cases for cache keys and invalidation of unknown tables."""
+
+    def test_key_ignores_argument_order_and_sql_whitespace(self):
+        """Equivalent calls share a key."""
+        a = cache_key("q", {"sql": "SELECT  *\nFROM t;", "params": [1]}, "sql")
+        b = cache_key("q", {"params": [1], "sql": "SELECT * FROM t"}, "sql")
+        self.assertEqual(a, b)
+
+    def test_key_keeps_comments_apart_from_code(self):
+        """A line comment never swallows the code on the lines after it."""
+        a = cache_key("q", {"sql": "SELECT * FROM orders -- recent\nWHERE id > 5"}, "sql")
+        b = cache_key("q", {"sql": "SELECT * FROM orders -- recent WHERE id > 5"}, "sql")
+        self.assertNotEqual(a, b)
+
+    def test_results_on_unknown_tables_depend_on_the_database(self):
+        """A write to any table drops results whose tables are unknown."""
+        cache = ResultCache(8)
+        cache.put("any", 1, database="db", tables=(), ttl=60)
+        cache.put("users", 2, database="db", tables=("users",), ttl=60)
+        cache.put("other", 3, database="other", tables=(), ttl=60)
+        self.assertEqual(cache.invalidate("db", {"orders"}), 1)
+        self.assertIsNone(cache.get("any"))
+        self.assertEqual((cache.get("users"), cache.get("other")), (2, 3))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+import json
+import unittest
+
+import anyio
+
+from dbmesh.core.config import DBManager
+from dbmesh.core.federation import ShardOutcome, fan_out, merge
+from dbmesh.db.example import ExampleManager
+from dbmesh.db.results import TabularResult
+from dbmesh.server import DBMeshMCPServer
+
+
+def shard(rows, delay=0.0, error=None, columns=("id", "total")):
+    async def query():
+        await anyio.sleep(delay)
+        if error:
+            raise RuntimeError(error)
+        return TabularResult(columns=list(columns), rows=rows, types=["int4", "int4"])
+
+    return query
+
+
+class TestFanOut(unittest.TestCase):
+    """Test cases for running shards concurrently."""
+
+    def test_slow_and_failing_shards_are_reported(self):
+        results, outcomes = anyio.run(
+            lambda: fan_out(
+                {"a": shard([(1, 10)]), "b": shard([], delay=5), "c": shard([], error="down ")},
+                max_concurrency=0,
+                timeout=0.1,
+            )
+        )
+        self.assertEqual(list(results), ["a"])
+        self.assertEqual((outcomes["a"].status, outcomes["a"].rows), ("ok", 1))
+        self.assertEqual(outcomes["b"].status, "timeout")
+        self.assertLess(outcomes["b"].seconds, 1)
+        self.assertEqual((outcomes["c"].status, outcomes["c"].error), ("error", "down"))
+
+    def test_concurrency_is_capped(self):
+        running = peak = 0
+        done = []
+
+        async def query():
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await anyio.sleep(0.01)
+            running -= 1
+            return TabularResult(columns=["n"], rows=[])
+
+        async def on_done(finished, total):
+            done.append((finished, total))
+
+        anyio.run(lambda: fan_out({str(i): query for i in range(6)}, max_concurrency=2, timeout=None, on_done=on_done))
+        self.assertEqual(peak, 2)
+        self.assertEqual(done[-1], (6, 6))
+
+
+class TestMerge(unittest.TestCase):
+    """Test cases for merging shard results."""
+
+    def setUp(self):
+        self.results = {
+            "a": TabularResult(columns=["id", "total"], rows=[(1, 30), (2, None), (3, 5)], types=["int4", "int4"]),
+            "b": TabularResult(columns=["id", "total"], rows=[(7, 20), (8, 40)], types=["int4", "int4"]),
+        }
+        self.outcomes = {name: ShardOutcome("ok", 0.0, rows=len(r)) for name, r in self.results.items()}
+
+    def test_rows_are_tagged_with_their_shard(self):
+        result = merge(self.results, self.outcomes)
+        self.assertEqual(result.columns, ["_shard", "id", "total"])
+        self.assertEqual(result.types, ["text", "int4", "int4"])
+        self.assertEqual([row[0] for row in result.rows], ["a", "a", "a", "b", "b"])
+        self.assertFalse(result.extra["partial"])
+
+    def test_top_n_merge(self):
+        result = merge(self.results, self.outcomes, order_by=["total"], descending=True, limit=3)
+        # NULLs come first descending, as in PostgreSQL
+        self.assertEqual(result.rows, [("a", 2, None), ("b", 8, 40), ("a", 1, 30)])
+        result = merge(self.results, self.outcomes, order_by=["total"], limit=2)
+        self.assertEqual(result.rows, [("a", 3, 5), ("b", 7, 20)])
+        result = merge(self.results, self.outcomes, order_by=["total"])
+        self.assertEqual(result.rows[-1], ("a", 2, None))
+
+    def test_mismatched_and_missing_shards_make_the_result_partial(self):
+        self.results["c"] = TabularResult(columns=["other"], rows=[(1,)])
+        self.outcomes["c"] = ShardOutcome("ok", 0.0, rows=1)
+        self.outcomes["d"] = ShardOutcome("timeout", 1.0, error="Timed out after 1.0s")
+        result = merge(self.results, self.outcomes)
+        self.assertEqual(len(result.rows), 5)
+        self.assertEqual(result.extra["shards"]["c"]["status"], "error")
+        self.assertEqual(result.extra["shards"]["d"]["status"], "timeout")
+        self.assertTrue(result.extra["partial"])
+
+    def test_invalid_order_by(self):
+        with self.assertRaisesRegex(ValueError, "Unknown order_by columns: nope"):
+            merge(self.results, self.outcomes, order_by=["nope"])
+        self.results["b"].rows = [(7, "x")]
+        with self.assertRaisesRegex(ValueError, "Cannot order by total"):
+            merge(self.results, self.outcomes, order_by=["total"])
+
+
+class ShardManager(ExampleManager):
+    def __init__(self, name, rows, delay=0.0):
+        self.name, self.rows, self.delay = name, rows, delay
+        self.calls = []
+
+    async def federated_query(self, sql, params=None, order_by=None, descending=False, limit=None):
+        self.calls.append((order_by, descending, limit))
+        await anyio.sleep(self.delay)
+        return TabularResult(columns=["n"], rows=self.rows[:limit])
+
+
+class TestFederatedQueryTool(unittest.TestCase):
+    """Test cases for the federated_query tool of DBManager."""
+
+    def test_tool_merges_shards(self):
+        server = DBMeshMCPServer("test", schema_snapshot_path=None, fan_out_shard_timeout=0.2)
+        manager = DBManager(server)
+        self.assertNotIn("federated_query", server._tool_manager._tools)
+        manager.VALID_DBS = [ShardManager("one", [(1,), (3,)]), ShardManager("two", [(2,)]), ShardManager("slow", [(0,)], 5)]
+        manager.add_federated_tools()
+
+        content = anyio.run(
+            server.call_tool, "federated_query", {"sql": "SELECT n", "order_by": ["n"], "limit": 2}
+        )
+        payload = json.loads(content[0].text)
+        self.assertEqual(payload["rows"], [["one", 1], ["two", 2]])
+        self.assertTrue(payload["partial"])
+        self.assertEqual(payload["shards"]["slow"]["status"], "timeout")
+        # Every shard is asked for its own top rows only
+        self.assertEqual(manager.VALID_DBS[0].calls, [(["n"], False, 2)])
+
+        with self.assertRaisesRegex(Exception, "Unknown databases: nope"):
+            anyio.run(server.call_tool, "federated_query", {"sql": "SELECT n", "databases": ["nope"]})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import os
+import tempfile
+import time
+import unittest
+
+import anyio
+
+from dbmesh.core.config import DBManager
+from dbmesh.db.example import ExampleManager
+from dbmesh.server import DBMeshMCPServer
+
+
+class FakeDatabase(ExampleManager):
+    """Database whose bring-up and health check take ``delay`` seconds and raise ``error``."""
+
+    def __init__(self, name, delay=0.0, error=None, connect_timeout=None):
+        self.name = name
+        self.delay = delay
+        self.error = error
+        self.connect_timeout = connect_timeout
+        self.setups = 0
+        self.closes = 0
+        self.checks = 0
+        self.refreshes = 0
+        self.refresh_delay = 0.0
+
+    async def asetup_connection(self):
+        self.setups += 1
+        await anyio.sleep(self.delay)
+        if self.error:
+            raise self.error
+
+    async def aclose_connection(self):
+        self.closes += 1
+
+    async def check_health(self):
+        self.checks += 1
+        await anyio.sleep(self.delay)
+        if self.error:
+            raise self.error
+
+    async def refresh_schema(self):
+        self.refreshes += 1
+        await anyio.sleep(self.refresh_delay)
+        return None
+
+
+class TestDatabaseHealth(unittest.TestCase):
+    """Test cases for concurrent bring-up and health checking of databases."""
+
+    def setUp(self):
+        self.server = DBMeshMCPServer("test", schema_snapshot_path=os.path.join(tempfile.mkdtemp(), "s"))
+        self.manager = DBManager(self.server)
+
+    def state(self, name):
+        return self.manager.status[name].state
+
+    def test_databases_are_brought_up_concurrently(self):
+        self.manager.VALID_DBS = [FakeDatabase(f"db{i}", delay=0.2) for i in range(5)]
+        start = time.perf_counter()
+        anyio.run(self.manager.connect_all)
+        self.assertLess(time.perf_counter() - start, 0.6)
+        self.assertEqual({name: s["state"] for name, s in self.manager.health().items()}, {f"db{i}": "healthy" for i in range(5)})
+        # Introspection is left to the background refresh
+        self.assertTrue(all(db.refreshes == 0 for db in self.manager.VALID_DBS))
+
+    def test_schemas_are_revalidated_after_startup(self):
+        db = FakeDatabase("db")
+        db.refresh_delay = 10
+        self.manager.VALID_DBS = [db]
+
+        async def main():
+            start = time.perf_counter()
+            async with self.manager.lifespan():
+                started = time.perf_counter() - start
+                refreshes = db.refreshes
+                await anyio.sleep(0.05)
+                return started, refreshes, db.refreshes
+
+        started, before, after = anyio.run(main)
+        self.assertLess(started, 1.0)
+        self.assertEqual((before, after), (0, 1))
+
+    def test_unreachable_databases_are_degraded_without_blocking_startup(self):
+        slow = FakeDatabase("slow", delay=10, connect_timeout=0.1)
+        broken = FakeDatabase("broken", error=ConnectionError("connection refused"))
+        ok = FakeDatabase("ok")
+        self.manager.VALID_DBS = [slow, broken, ok]
+        start = time.perf_counter()
+        anyio.run(self.manager.connect_all)
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertEqual((self.state("slow"), self.state("broken"), self.state("ok")), ("degraded", "degraded", "healthy"))
+        self.assertEqual(self.manager.status["slow"].error, "timed out after 0.1s")
+        self.assertEqual(self.manager.status["broken"].error, "connection refused")
+        # Half-open connections of failed databases are closed
+        self.assertEqual((slow.closes, broken.closes, ok.closes), (1, 1, 0))
+        self.assertEqual(self.server.metrics.database_up.value(database="broken"), 0)
+        self.assertEqual(self.server.metrics.database_up.value(database="ok"), 1)
+
+    def test_degraded_databases_are_brought_up_again(self):
+        db = FakeDatabase("db", error=ConnectionError("down"))
+        self.manager.VALID_DBS = [db]
+        anyio.run(self.manager.connect_all)
+        anyio.run(self.manager.check_health)
+        self.assertEqual((self.state("db"), self.manager.status["db"].failures, db.setups), ("degraded", 2, 2))
+        db.error = None
+        anyio.run(self.manager.check_health)
+        self.assertEqual((self.state("db"), self.manager.status["db"].failures, db.setups), ("healthy", 0, 3))
+        self.assertEqual(db.checks, 0)
+
+    def test_failing_health_checks_degrade_connected_databases(self):
+        db = FakeDatabase("db")
+        self.manager.VALID_DBS = [db]
+        anyio.run(self.manager.connect_all)
+        anyio.run(self.manager.refresh_schemas)
+        db.error = ConnectionError("server closed the connection")
+        anyio.run(self.manager.check_health)
+        self.assertEqual(self.state("db"), "degraded")
+        # Schema refreshes skip the database while it is degraded
+        anyio.run(self.manager.refresh_schemas)
+        self.assertEqual(db.refreshes, 1)
+        db.error = None
+        anyio.run(self.manager.check_health)
+        self.assertEqual(self.state("db"), "healthy")
+        # The connections were kept; only the health check ran again
+        self.assertEqual((db.setups, db.checks, db.closes), (1, 2, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+
+from dbmesh.core.metrics import MetricsRegistry, ServerMetrics, database_timer, timed
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    """Test cases for rendering metrics in the Prometheus text format."""
+
+    def test_counter_renders_labels(self):
+        """Counters render one sample per label set with escaped values."""
+        registry = MetricsRegistry()
+        calls = registry.counter("calls_total", "Calls", ("tool",))
+        calls.inc(tool="query")
+        calls.inc(2, tool='say "hi"')
+        text = registry.render()
+        self.assertIn("# TYPE calls_total counter", text)
+        self.assertIn('calls_total{tool="query"} 1', text)
+        self.assertIn('calls_total{tool="say \\"hi\\""} 2', text)
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Each bucket counts every observation at or below its bound."""
+        registry = MetricsRegistry()
+        latency = registry.histogram("latency_seconds", "Latency", ("tool",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 2.0):
+            latency.observe(value, tool="q")
+        lines = registry.render().splitlines()
+        self.assertIn('latency_seconds_bucket{tool="q",le="0.1"} 2', lines)
+        self.assertIn('latency_seconds_bucket{tool="q",le="1"} 3', lines)
+        self.assertIn('latency_seconds_bucket{tool="q",le="+Inf"} 4', lines)
+        self.assertIn('latency_seconds_sum{tool="q"} 2.65', lines)
+        self.assertIn('latency_seconds_count{tool="q"} 4', lines)
+
+    def test_collectors_run_before_rendering(self):
+        """Pool gauges are refreshed from collectors on every render."""
+        metrics = ServerMetrics()
+        metrics.add_collector(
+            lambda: metrics.observe_pool("db", {"in_use": 3, "idle": 1, "waiting": 0, "max_size": 4})
+        )
+        text = metrics.render()
+        self.assertIn('dbmesh_pool_saturation{database="db"} 0.75', text)
+        self.assertIn('dbmesh_pool_connections{database="db",state="in_use"} 3', text)
+
+
+class TestDatabaseTimer(unittest.TestCase):
+    """Test cases for attributing blocking time to a request."""
+
+    def test_timed_calls_accumulate(self):
+        """Wrapped calls add their run time to the active timer."""
+        with database_timer() as timer:
+            self.assertEqual(timed(lambda x: x + 1)(1), 2)
+        self.assertGreater(timer.seconds, 0)
+
+    def test_untimed_calls_are_not_wrapped(self):
+        """Outside a timed request the callable is returned as-is."""
+        fn = lambda: None  # noqa: E731
+        self.assertIs(timed(fn), fn)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import os
+import tempfile
+import unittest
+from importlib.metadata import EntryPoint
+from unittest.mock import patch
+
+from dbmesh.core.config import DBManager
+from dbmesh.core.registry import DEFAULT_DATABASES, BackendRegistry, load_database_config
+from dbmesh.db.example import ExampleManager
+from dbmesh.server import DBMeshMCPServer
+
+
+class TestBackendRegistry(unittest.TestCase):
+    """Test cases for resolving database backends lazily."""
+
+    def test_backends_are_imported_on_load(self):
+        registry = BackendRegistry({"missing": "dbmesh_missing_driver:Manager"}, entry_point_group=None)
+        self.assertEqual(registry.names(), ["missing"])
+        with self.assertRaisesRegex(ValueError, "Cannot load database backend dbmesh_missing_driver:Manager"):
+            registry.load("missing")
+        with self.assertRaisesRegex(ValueError, "Unknown database type: mysql; available: missing"):
+            registry.load("mysql")
+
+    def test_entry_points_are_discovered(self):
+        found = [EntryPoint("custom", "dbmesh.db.example:ExampleManager", "dbmesh.backends")]
+        with patch("dbmesh.core.registry.entry_points", return_value=found) as discover:
+            registry = BackendRegistry()
+            self.assertIs(registry.load("example"), ExampleManager)
+            discover.assert_not_called()
+            self.assertIs(registry.load("custom"), ExampleManager)
+            self.assertEqual(registry.names(), ["custom", "example", "postgres"])
+        discover.assert_called_once_with(group="dbmesh.backends")
+
+    def test_types_may_name_a_class(self):
+        registry = BackendRegistry({}, entry_point_group=None)
+        self.assertIs(registry.load("dbmesh.db.example:ExampleManager"), ExampleManager)
+        with self.assertRaisesRegex(ValueError, "does not refer to a DBConfig subclass"):
+            registry.load("dbmesh.db.results:TabularResult")
+
+    def test_databases_default_their_name_to_their_key(self):
+        registry = BackendRegistry()
+        db = registry.create("shard1", {"type": "postgres", "host": "db1"})
+        self.assertEqual((db.name, db.host), ("shard1", "db1"))
+        self.assertEqual(registry.create("main", {"type": "postgres", "name": "other"}).name, "other")
+        self.assertIsInstance(registry.create("example", {}), ExampleManager)
+
+
+class TestDatabaseConfig(unittest.TestCase):
+    """Test cases for reading the databases of a configuration file."""
+
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "config.yaml")
+
+    def write(self, text):
+        with open(self.path, "w") as f:
+            f.write(text)
+
+    def test_missing_file_serves_the_defaults(self):
+        self.assertEqual(load_database_config(self.path), DEFAULT_DATABASES)
+        self.assertEqual(load_database_config(None), DEFAULT_DATABASES)
+
+    def test_manager_creates_configured_databases(self):
+        self.write("databases:\n  eu:\n    type: postgres\n    port: 5433\n  us:\n    type: postgres\n")
+        server = DBMeshMCPServer("test", config_path=self.path, schema_snapshot_path=None)
+        manager = DBManager(server)
+        self.assertEqual([(db.name, db.port) for db in manager.VALID_DBS], [("eu", 5433), ("us", 5432)])
+
+    def test_invalid_file(self):
+        self.write("databases:\n  - postgres\n")
+        with self.assertRaisesRegex(ValueError, "must map names to settings"):
+            load_database_config(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+import os
+import tempfile
+import unittest
+
+import anyio
+import yaml
+
+from dbmesh.core.config import DBManager
+from dbmesh.core.registry import BackendRegistry
+from dbmesh.db.base import db_tool
+from dbmesh.db.example import ExampleManager
+from dbmesh.server import DBMeshMCPServer
+
+
+class FakeBackend(ExampleManager):
+    """Backend with one tool per database whose connections depend on ``host`` only."""
+
+    def __init__(self, name, host="localhost", label=""):
+        self.name = name
+        self.host = host
+        self.label = label
+        self.connection = None
+        self.setups = 0
+        self.closed = False
+
+    @db_tool(read_only=True)
+    def describe(self) -> str:
+        return f"{self.name} {self.label}"
+
+    def get_tools(self):
+        return [(self.describe, f"{self.name}_describe", "Describe the database")]
+
+    def get_resource_templates(self):
+        return [{"fn": self.describe, "uri_template": f"fake://{self.name}/{{item}}", "name": f"{self.name}_item"}]
+
+    async def asetup_connection(self):
+        self.setups += 1
+        self.connection = object()
+
+    async def aclose_connection(self):
+        self.closed = True
+
+    def connection_settings(self):
+        return {"host": self.host}
+
+    def adopt_connections(self, previous):
+        self.connection = previous.connection
+
+
+class TestConfigReload(unittest.TestCase):
+    """Test cases for applying configuration changes to a running DBManager."""
+
+    def setUp(self):
+        self.config_path = os.path.join(tempfile.mkdtemp(), "config.yaml")
+        self.write(a={"type": "fake", "name": "a"}, b={"type": "fake", "name": "b"})
+        self.server = DBMeshMCPServer("test", config_path=self.config_path, schema_snapshot_path=None)
+        self.manager = DBManager(self.server, registry=BackendRegistry({"fake": FakeBackend}, entry_point_group=None))
+        anyio.run(self.manager.connect_all)
+
+    def write(self, **databases):
+        with open(self.config_path, "w") as f:
+            yaml.safe_dump({"databases": databases}, f)
+
+    def tools(self):
+        return sorted(tool.name for tool in self.server._tool_manager.list_tools())
+
+    def templates(self):
+        return sorted(template.name for template in self.server._resource_manager.list_templates())
+
+    def test_databases_are_added_and_removed(self):
+        a, b = self.manager.VALID_DBS
+        self.write(b={"type": "fake", "name": "b"}, c={"type": "fake", "name": "c"})
+        self.assertTrue(anyio.run(self.manager.reload))
+        c = self.manager.VALID_DBS[1]
+        self.assertEqual(self.manager.VALID_DBS, [b, c])
+        self.assertEqual(self.tools(), ["b_describe", "c_describe"])
+        self.assertEqual(self.templates(), ["b_item", "c_item"])
+        self.assertTrue(a.closed)
+        self.assertNotIn("a", self.manager.status)
+        # Untouched databases keep their instance and connections
+        self.assertEqual((b.setups, b.closed, c.setups), (1, False, 1))
+        self.assertEqual(self.manager.status["c"].state, "healthy")
+
+    def test_changed_settings_keep_the_connections(self):
+        a, b = self.manager.VALID_DBS
+        self.write(a={"type": "fake", "name": "a", "label": "new"}, b={"type": "fake", "name": "b"})
+        self.assertTrue(anyio.run(self.manager.reload))
+        new_a = self.manager.VALID_DBS[0]
+        self.assertIsNot(new_a, a)
+        self.assertIs(new_a.connection, a.connection)
+        self.assertEqual((new_a.setups, a.closed), (0, False))
+        self.assertIs(self.manager.VALID_DBS[1], b)
+        result = anyio.run(self.server.call_tool, "a_describe", {})
+        self.assertEqual(result[0].text, "a new")
+
+    def test_changed_connection_settings_reconnect(self):
+        a, _ = self.manager.VALID_DBS
+        self.write(a={"type": "fake", "name": "a", "host": "elsewhere"}, b={"type": "fake", "name": "b"})
+        self.assertTrue(anyio.run(self.manager.reload))
+        new_a = self.manager.VALID_DBS[0]
+        self.assertEqual((new_a.setups, a.closed), (1, True))
+        self.assertIsNot(new_a.connection, a.connection)
+        self.assertEqual(self.tools(), ["a_describe", "b_describe"])
+
+    def test_renamed_database_replaces_its_tools(self):
+        self.write(a={"type": "fake", "name": "z"}, b={"type": "fake", "name": "b"})
+        self.assertTrue(anyio.run(self.manager.reload))
+        self.assertEqual(self.tools(), ["b_describe", "z_describe"])
+        self.assertEqual(sorted(self.manager.status), ["b", "z"])
+
+    def test_invalid_configuration_changes_nothing(self):
+        databases = list(self.manager.VALID_DBS)
+        self.write(a={"type": "fake", "name": "a"}, b={"type": "missing"}, c={"type": "fake", "name": "c"})
+        self.assertFalse(anyio.run(self.manager.reload))
+        self.assertEqual(self.manager.VALID_DBS, databases)
+        self.assertEqual(self.tools(), ["a_describe", "b_describe"])
+
+    def test_unchanged_configuration_is_not_reloaded(self):
+        self.write(a={"type": "fake", "name": "a"}, b={"type": "fake", "name": "b"})
+        self.assertFalse(anyio.run(self.manager.reload))
+
+    def test_managers_overriding_setup_can_watch_the_file(self):
+        class StaticManager(DBManager):
+            def setup(self):
+                self.VALID_DBS.append(FakeBackend("static"))
+
+        server = DBMeshMCPServer(
+            "test", config_path=self.config_path, schema_snapshot_path=None, config_reload_interval=0.01
+        )
+        manager = StaticManager(server, registry=BackendRegistry({"fake": FakeBackend}, entry_point_group=None))
+
+        async def main():
+            async with manager.lifespan():
+                await anyio.sleep(0.1)
+
+        anyio.run(main)
+        # The file differs from the empty configuration the manager started with
+        self.assertEqual(sorted(manager.status), ["a", "b", "static"])
+
+
+if __name__ == "__main__":
+    unittest.main()
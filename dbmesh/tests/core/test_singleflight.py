@@ -0,0 +1,86 @@
+import unittest
+
+import anyio
+
+from dbmesh.core.singleflight import SingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Test cases for the SingleFlight class."""
+
+    def setUp(self):
+        self.flight = SingleFlight()
+        self.runs = 0
+
+    async def slow(self, value="result"):
+        self.runs += 1
+        await anyio.sleep(0.05)
+        return value
+
+    def test_concurrent_calls_share_one_execution(self):
+        """Concurrent callers with the same key get the same result from one run."""
+        results = []
+
+        async def caller():
+            results.append(await self.flight.do("k", self.slow))
+
+        async def main():
+            async with anyio.create_task_group() as tg:
+                for _ in range(5):
+                    tg.start_soon(caller)
+
+        anyio.run(main)
+        self.assertEqual(self.runs, 1)
+        self.assertEqual(results, ["result"] * 5)
+        self.assertEqual(self.flight.shared, 4)
+        self.assertEqual(len(self.flight), 0)
+
+    def test_errors_are_shared(self):
+        """Waiting callers see the executing caller's error."""
+        errors = []
+
+        async def failing():
+            await anyio.sleep(0.05)
+            raise ValueError("boom")
+
+        async def caller():
+            try:
+                await self.flight.do("k", failing)
+            except ValueError as e:
+                errors.append(e)
+
+        async def main():
+            async with anyio.create_task_group() as tg:
+                tg.start_soon(caller)
+                tg.start_soon(caller)
+
+        anyio.run(main)
+        self.assertEqual(len(errors), 2)
+
+    def test_cancelled_leader_hands_over(self):
+        """A waiting caller re-executes when the executing caller is cancelled."""
+        results = []
+
+        async def main():
+            leader = anyio.CancelScope()
+            async with anyio.create_task_group() as tg:
+                tg.start_soon(self._run_in, leader)
+                await anyio.sleep(0.01)
+
+                async def follower():
+                    results.append(await self.flight.do("k", self.slow))
+
+                tg.start_soon(follower)
+                await anyio.sleep(0.01)
+                leader.cancel()
+
+        anyio.run(main)
+        self.assertEqual(results, ["result"])
+        self.assertEqual(self.runs, 2)
+
+    async def _run_in(self, scope):
+        with scope:
+            await self.flight.do("k", self.slow)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from dbmesh.core.snapshot import load_snapshot, save_snapshot
+from dbmesh.db.introspection import ColumnInfo, SchemaCache, TableInfo
+
+
+class TestSchemaSnapshot(unittest.TestCase):
+    """Test cases for the on-disk schema snapshot."""
+
+    def setUp(self):
+        """Create a temporary directory for snapshot files."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "nested", "schema.snapshot")
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.temp_dir)
+
+    def test_round_trip_schema_cache(self):
+        """A dumped SchemaCache is restored identically from disk."""
+        cache = SchemaCache()
+        table = TableInfo(
+            oid=42,
+            schema="public",
+            name="users",
+            kind="r",
+            columns=(ColumnInfo("id", "integer", "int4", False, True),),
+            fingerprint="abc",
+        )
+        cache.apply({42: "abc"}, {42: table})
+        save_snapshot(self.path, {"db": cache.dump()})
+
+        restored = SchemaCache()
+        restored.load(load_snapshot(self.path)["db"])
+        self.assertEqual(restored.tables, {42: table})
+        # Revalidating against an identical catalog re-reads nothing
+        self.assertFalse(restored.apply({42: "abc"}, {}))
+
+    def test_missing_file_is_empty(self):
+        """A missing snapshot falls back to live introspection."""
+        self.assertEqual(load_snapshot(self.path), {})
+
+    def test_unknown_version_is_ignored(self):
+        """Snapshots from another format version are not loaded."""
+        save_snapshot(self.path, {"db": []})
+        with open(self.path, "r+b") as f:
+            f.write(b"DBMESH-SNAPSHOT 9")
+        self.assertEqual(load_snapshot(self.path), {})
+
+    def test_corrupt_payload_is_ignored(self):
+        """A truncated snapshot is not loaded."""
+        save_snapshot(self.path, {"db": [[1, "public", "t", "r", "x", []]]})
+        with open(self.path, "r+b") as f:
+            f.truncate(30)
+        self.assertEqual(load_snapshot(self.path), {})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import json
+import os
+import tempfile
+import unittest
+
+import anyio
+
+from dbmesh.core.tracing import Trace, TraceWriter, activate, current_trace, span, trace_requested
+
+
+class TestTrace(unittest.TestCase):
+    """Test cases for request traces and spans."""
+
+    def test_span_without_trace_is_noop(self):
+        """Untraced code paths share one no-op context manager."""
+        self.assertIsNone(current_trace())
+        self.assertIs(span("tool"), span("convert"))
+        with span("tool"):
+            pass
+
+    def test_spans_are_recorded_on_active_trace(self):
+        """Spans inside an activated trace are recorded with their attributes."""
+        trace = Trace("tool", "query", database="db")
+        with activate(trace):
+            with span("tool"):
+                with span("database", call="fetch"):
+                    pass
+            self.assertIs(current_trace(), trace)
+        self.assertIsNone(current_trace())
+        trace.finish(status="ok")
+        record = trace.to_dict()
+        self.assertEqual(record["database"], "db")
+        self.assertEqual(record["status"], "ok")
+        self.assertEqual([s["name"] for s in record["spans"]], ["tool", "database"])
+        self.assertEqual(record["spans"][1]["call"], "fetch")
+
+    def test_trace_requested_from_meta(self):
+        """Clients ask for a trace with the dbmesh_trace meta key."""
+        class Meta:
+            dbmesh_trace = True
+
+        self.assertTrue(trace_requested(Meta()))
+        self.assertFalse(trace_requested(None))
+        self.assertFalse(trace_requested(object()))
+
+    def test_writer_appends_json_lines(self):
+        """Finished traces are appended one per line."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "traces", "traces.jsonl")
+            writer = TraceWriter(path)
+            for name in ("a", "b"):
+                trace = Trace("tool", name)
+                trace.finish()
+                anyio.run(writer.write, trace)
+            with open(path) as f:
+                names = [json.loads(line)["name"] for line in f]
+        self.assertEqual(names, ["a", "b"])
+
+    def test_write_errors_are_logged_not_raised(self):
+        """A trace file that cannot be written does not fail the traced request."""
+        with tempfile.TemporaryDirectory() as tmp:
+            writer = TraceWriter(tmp)  # a directory cannot be opened for appending
+            trace = Trace("tool", "a")
+            trace.finish()
+            with self.assertLogs("dbmesh.core.tracing", "WARNING"):
+                anyio.run(writer.write, trace)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import os
+import socket
+import tempfile
+import unittest
+
+import anyio
+import httpx
+import uvicorn
+from starlette.responses import Response
+
+from dbmesh.core.config import DBManager
+from dbmesh.core.workers import MessageRouter, message_worker, worker_socket_path
+from dbmesh.db.postgres import PostgresManager
+from dbmesh.server import DBMeshMCPServer
+
+
+def handler(worker):
+    async def handle(scope, receive, send):
+        response = Response(f"worker {worker} {scope['query_string'].decode()}", status_code=202)
+        await response(scope, receive, send)
+
+    return handle
+
+
+async def post(app, path):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.post(path, content=b"{}")
+
+
+class TestMessageRouting(unittest.TestCase):
+    """Test cases for routing session messages between worker processes."""
+
+    def setUp(self):
+        self.socket_dir = tempfile.mkdtemp()
+
+    def test_message_worker(self):
+        self.assertEqual(message_worker("/messages/3/", "/messages/"), 3)
+        self.assertIsNone(message_worker("/messages/", "/messages/"))
+        self.assertIsNone(message_worker("/messages/x/", "/messages/"))
+
+    def test_own_sessions_are_handled_locally(self):
+        router = MessageRouter(0, "/messages/", handler(0), self.socket_dir)
+        response = anyio.run(post, router, "/messages/0/?session_id=abc")
+        self.assertEqual((response.status_code, response.text), (202, "worker 0 session_id=abc"))
+        self.assertEqual(router.forwarded, 0)
+
+    def test_other_sessions_are_forwarded_to_their_worker(self):
+        router = MessageRouter(0, "/messages/", handler(0), self.socket_dir)
+        owner = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        owner.bind(worker_socket_path(self.socket_dir, 1))
+        owner.listen()
+        server = uvicorn.Server(uvicorn.Config(handler(1), log_level="warning", lifespan="off"))
+
+        async def main():
+            async with anyio.create_task_group() as tg:
+                tg.start_soon(server.serve, [owner])
+                while not server.started:
+                    await anyio.sleep(0.01)
+                response = await post(router, "/messages/1/?session_id=abc")
+                server.should_exit = True
+            return response
+
+        response = anyio.run(main)
+        self.assertEqual((response.status_code, response.text), (202, "worker 1 session_id=abc"))
+        self.assertEqual(router.forwarded, 1)
+
+    def test_sessions_of_missing_workers_are_not_found(self):
+        router = MessageRouter(0, "/messages/", handler(0), self.socket_dir)
+        self.assertEqual(anyio.run(post, router, "/messages/5/?session_id=abc").status_code, 404)
+        self.assertEqual(anyio.run(post, router, "/messages/?session_id=abc").status_code, 404)
+
+    def test_worker_app_advertises_its_message_path(self):
+        server = DBMeshMCPServer("test")
+        app = server.sse_app(worker=2, worker_socket_dir=self.socket_dir)
+        mount = app.routes[1]
+        self.assertEqual(mount.path, "/messages")
+        self.assertIsInstance(mount.app, MessageRouter)
+        self.assertEqual(mount.app.index, 2)
+
+
+class TestWorkerInit(unittest.TestCase):
+    """Test cases for preparing worker processes."""
+
+    def test_connections_are_split_between_workers(self):
+        server = DBMeshMCPServer("test", schema_snapshot_path=os.path.join(tempfile.mkdtemp(), "s"))
+        manager = DBManager(server)
+        db = PostgresManager(pool_min_size=4, pool_max_size=10, max_open_cursors=4)
+        manager.VALID_DBS = [db]
+        server.init_worker(0, 4)
+        self.assertEqual((db.pool_min_size, db.pool_max_size, db.max_open_cursors), (2, 2, 1))
+        self.assertIsNotNone(manager.snapshot_path)
+        server.init_worker(1, 4)
+        self.assertIsNone(manager.snapshot_path)
+
+
+if __name__ == "__main__":
+    unittest.main()
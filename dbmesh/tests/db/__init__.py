@@ -0,0 +1 @@
+# DB backend tests
@@ -0,0 +1,92 @@
+import inspect
+import threading
+import time
+import unittest
+
+import anyio
+
+from dbmesh.db.example import ExampleManager
+
+
+class SlowManager(ExampleManager):
+    """Example backend with a blocking tool and a single worker thread."""
+
+    max_workers = 1
+
+    def slow(self, delay: float) -> str:
+        """Block the calling thread for ``delay`` seconds."""
+        time.sleep(delay)
+        return threading.current_thread().name
+
+
+class TestDBConfigAsyncAdapter(unittest.TestCase):
+    """Test cases for the async hooks on DBConfig."""
+
+    def test_sync_tool_is_wrapped_with_same_signature(self):
+        """Synchronous tools become coroutine functions with the same parameters."""
+        manager = ExampleManager()
+        tool = manager.as_async_tool(manager.add)
+        self.assertTrue(inspect.iscoroutinefunction(tool))
+        self.assertEqual(list(inspect.signature(tool).parameters), ["a", "b"])
+        self.assertEqual(anyio.run(tool, 2, 3), 5)
+
+    def test_async_tool_is_unchanged(self):
+        """Coroutine tools are registered as-is."""
+        async def tool() -> None:
+            return None
+
+        self.assertIs(ExampleManager().as_async_tool(tool), tool)
+
+    def test_blocking_tool_does_not_block_event_loop(self):
+        """The event loop keeps running while a blocking tool executes."""
+        manager = SlowManager()
+        tool = manager.as_async_tool(manager.slow)
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.monotonic())
+                await anyio.sleep(0.02)
+
+        async def main():
+            async with anyio.create_task_group() as tg:
+                tg.start_soon(tool, 0.2)
+                tg.start_soon(ticker)
+
+        anyio.run(main)
+        self.assertEqual(len(ticks), 5)
+        self.assertLess(ticks[-1] - ticks[0], 0.2)
+
+    def test_executor_is_bounded_per_database(self):
+        """Calls beyond max_workers wait for a free worker."""
+        manager = SlowManager()
+        tool = manager.as_async_tool(manager.slow)
+
+        async def main():
+            start = time.monotonic()
+            async with anyio.create_task_group() as tg:
+                for _ in range(2):
+                    tg.start_soon(tool, 0.1)
+            return time.monotonic() - start
+
+        self.assertGreaterEqual(anyio.run(main), 0.2)
+
+    def test_cancellation_interrupts_blocking_call(self):
+        """Cancelling the caller returns at once and invokes the cancel hook."""
+        manager = SlowManager()
+        interrupted = threading.Event()
+
+        def blocking():
+            interrupted.wait(5)
+
+        async def main():
+            start = time.monotonic()
+            with anyio.move_on_after(0.05):
+                await manager.run_sync(blocking, cancel=interrupted.set)
+            return time.monotonic() - start
+
+        self.assertLess(anyio.run(main), 1)
+        self.assertTrue(interrupted.is_set())
+
+if __name__ == "__main__":
+    unittest.main()
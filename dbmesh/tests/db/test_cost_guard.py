@@ -0,0 +1,101 @@
+import unittest
+
+from dbmesh.db.cost_guard import CostGuard, PlanEstimate, is_select, limit_sql, query_fingerprint
+
+PLAN = {
+    "Node Type": "Nested Loop",
+    "Total Cost": 250000.0,
+    "Plan Rows": 1000000,
+    "Plans": [
+        {"Node Type": "Seq Scan", "Relation Name": "orders", "Total Cost": 2000.0, "Plan Rows": 1000},
+        {
+            "Node Type": "Materialize",
+            "Total Cost": 30.0,
+            "Plan Rows": 1000,
+            "Plans": [{"Node Type": "Seq Scan", "Relation Name": "users", "Total Cost": 25.0, "Plan Rows": 1000}],
+        },
+    ],
+}
+
+
+class TestPlanEstimate(unittest.TestCase):
+    """Test cases for reading EXPLAIN output."""
+
+    def test_from_plan(self):
+        estimate = PlanEstimate.from_plan(PLAN, max_hints=2)
+        self.assertEqual(estimate.cost, 250000.0)
+        self.assertEqual(estimate.rows, 1000000)
+        self.assertEqual(
+            estimate.hints,
+            ["Nested Loop (~1000000 rows, cost 250000)", "Seq Scan on orders (~1000 rows, cost 2000)"],
+        )
+
+
+class TestSqlHelpers(unittest.TestCase):
+    """Test cases for fingerprinting and rewriting queries."""
+
+    def test_fingerprint_ignores_whitespace(self):
+        self.assertEqual(
+            query_fingerprint("SELECT *\n  FROM t WHERE a = %s;"), query_fingerprint("SELECT * FROM t WHERE a = %s")
+        )
+        self.assertNotEqual(query_fingerprint("SELECT * FROM t"), query_fingerprint("SELECT * FROM u"))
+        self.assertNotEqual(
+            query_fingerprint("SELECT * FROM t -- all\nWHERE a = 1"), query_fingerprint("SELECT * FROM t -- all WHERE a = 1")
+        )
+
+    def test_is_select(self):
+        self.assertTrue(is_select("  select 1"))
+        self.assertTrue(is_select("WITH x AS (SELECT 1) SELECT * FROM x"))
+        self.assertTrue(is_select("(SELECT 1) UNION (SELECT 2)"))
+        self.assertFalse(is_select("SHOW search_path"))
+        self.assertFalse(is_select(""))
+        self.assertTrue(is_select("-- top rows\n/* by a */ SELECT 1"))
+
+    def test_limit_sql(self):
+        self.assertEqual(
+            limit_sql("SELECT * FROM t ORDER BY a;", 10),
+            "SELECT * FROM (\nSELECT * FROM t ORDER BY a\n) AS dbmesh_limited LIMIT 10",
+        )
+        self.assertEqual(
+            limit_sql("SELECT * FROM t -- all\nWHERE a = 1 -- one;", 10),
+            "SELECT * FROM (\nSELECT * FROM t -- all\nWHERE a = 1\n) AS dbmesh_limited LIMIT 10",
+        )
+
+
+class TestCostGuard(unittest.TestCase):
+    """Test cases for the CostGuard class."""
+
+    def test_disabled_without_thresholds(self):
+        self.assertFalse(CostGuard().enabled)
+        self.assertTrue(CostGuard(max_rows=10).enabled)
+
+    def test_violation(self):
+        guard = CostGuard(max_cost=1000, max_rows=100)
+        self.assertIsNone(guard.violation(PlanEstimate(cost=10, rows=5)))
+        self.assertIn("cost 5000", guard.violation(PlanEstimate(cost=5000, rows=5)))
+        self.assertIn("500 rows", guard.violation(PlanEstimate(cost=10, rows=500)))
+
+    def test_narrow_action_includes_hints(self):
+        estimate = PlanEstimate.from_plan(PLAN)
+        rejected = CostGuard(max_cost=1000).reject(estimate, "too costly")
+        self.assertNotIn("Seq Scan", str(rejected))
+        narrow = CostGuard(max_cost=1000, action="narrow").reject(estimate, "too costly")
+        self.assertIn("Seq Scan on orders", str(narrow))
+        self.assertIs(narrow.estimate, estimate)
+
+    def test_cache_is_bounded_lru_with_ttl(self):
+        guard = CostGuard(max_cost=1, cache_size=2)
+        for key in ("a", "b"):
+            guard.store(key, PlanEstimate(cost=1, rows=1))
+        guard.cached("a")
+        guard.store("c", PlanEstimate(cost=1, rows=1))
+        self.assertIsNotNone(guard.cached("a"))
+        self.assertIsNone(guard.cached("b"))
+
+        expired = CostGuard(max_cost=1, cache_ttl=0)
+        expired.store("a", PlanEstimate(cost=1, rows=1))
+        self.assertIsNone(expired.cached("a"))
+
+
+if __name__ == "__main__":
+    unittest.main()
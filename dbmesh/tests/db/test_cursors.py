@@ -0,0 +1,172 @@
+import unittest
+from collections import namedtuple
+
+import anyio
+import anyio.to_thread
+
+from dbmesh.db.cursors import CursorNotFoundError, ServerCursors
+from dbmesh.db.pool import ConnectionPool
+
+Column = namedtuple("Column", "name type_code")
+
+
+class FakeCursor:
+    """Cursor over a fixed range of integers."""
+
+    def __init__(self, conn, name=None):
+        self.conn = conn
+        self.name = name
+        self.description = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.remaining = list(range(params[0])) if self.name else []
+
+    def fetchmany(self, size):
+        if self.conn.broken:
+            raise RuntimeError("connection lost")
+        self.description = [Column("n", 23)]
+        chunk, self.remaining = self.remaining[:size], self.remaining[size:]
+        return [(n,) for n in chunk]
+
+    def close(self):
+        self.conn.cursors_closed += 1
+
+
+class FakeConnection:
+    closed = 0
+
+    def __init__(self):
+        self.cursors_closed = 0
+        self.named = []
+        self.broken = False
+
+    def cursor(self, name=None):
+        cursor = FakeCursor(self, name)
+        if name:
+            self.named.append(cursor)
+        return cursor
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = 1
+
+
+async def run_sync(fn, *args, cancel=None):
+    return await anyio.to_thread.run_sync(fn, *args)
+
+
+class TestServerCursors(unittest.TestCase):
+    """Test cases for paginated server-side cursors."""
+
+    def setUp(self):
+        self.pool = ConnectionPool(FakeConnection, min_size=0, max_size=2)
+        self.cursors = ServerCursors(self.pool, run_sync, max_open=1)
+
+    def test_pages_are_fetched_in_chunks_until_exhausted(self):
+        """Pages are filled chunk by chunk and the cursor closes at the end."""
+        progress = []
+
+        async def on_progress(done, total):
+            progress.append(done)
+
+        async def main():
+            token = await self.cursors.open("SELECT", [7])
+            first = await self.cursors.fetch(token, 4, 2, on_progress)
+            second = await self.cursors.fetch(token, 4, 2, on_progress)
+            return token, first, second
+
+        token, first, second = anyio.run(main)
+        self.assertEqual(first, ([("n", 23)], [(0,), (1,), (2,), (3,)], False))
+        self.assertEqual(second, ([("n", 23)], [(4,), (5,), (6,)], True))
+        self.assertEqual(progress, [2, 4, 2, 3])
+        self.assertEqual(len(self.cursors), 0)
+        self.assertEqual(self.pool.stats()["in_use"], 0)
+        with self.assertRaises(CursorNotFoundError):
+            anyio.run(self.cursors.fetch, token, 4, 2)
+
+    def test_open_cursors_are_bounded(self):
+        """Each open cursor pins a connection, so their number is capped."""
+        async def main():
+            await self.cursors.open("SELECT", [10])
+            with self.assertRaises(Exception):
+                await self.cursors.open("SELECT", [10])
+            await self.cursors.close_all()
+
+        anyio.run(main)
+        self.assertEqual(self.pool.stats()["in_use"], 0)
+
+    def test_idle_cursors_are_reaped(self):
+        """Cursors left unread past the idle timeout are closed."""
+        self.cursors.idle_timeout = 0
+
+        async def main():
+            await self.cursors.open("SELECT", [10])
+            return await self.cursors.reap()
+
+        self.assertEqual(anyio.run(main), 1)
+        self.assertEqual(self.pool.stats()["in_use"], 0)
+
+    def test_close_waits_for_a_running_fetch(self):
+        """A cursor closed mid-fetch keeps its connection until the fetch is done."""
+        events = []
+
+        async def main():
+            token = await self.cursors.open("SELECT", [10])
+            resume = anyio.Event()
+
+            async def on_progress(done, total):
+                events.append("fetching")
+                await resume.wait()
+
+            async def close():
+                await self.cursors.close(token)
+                events.append(("closed", self.pool.stats()["in_use"]))
+
+            async with anyio.create_task_group() as tg:
+                tg.start_soon(self.cursors.fetch, token, 2, 2, on_progress)
+                await anyio.sleep(0.01)
+                tg.start_soon(close)
+                await anyio.sleep(0.01)
+                events.append(("in use", self.pool.stats()["in_use"]))
+                resume.set()
+            with self.assertRaises(CursorNotFoundError):
+                await self.cursors.fetch(token, 2, 2)
+
+        anyio.run(main)
+        self.assertEqual(events, ["fetching", ("in use", 1), ("closed", 0)])
+
+    def test_failed_or_cancelled_fetch_discards_the_connection(self):
+        """A connection left mid-FETCH is closed rather than reused."""
+        async def stall(done, total):
+            await anyio.sleep_forever()
+
+        async def main():
+            token = await self.cursors.open("SELECT", [10])
+            conn = self.cursors._cursors[token].conn
+            with anyio.move_on_after(0.05):
+                await self.cursors.fetch(token, 4, 2, stall)
+            cancelled = conn
+
+            token = await self.cursors.open("SELECT", [10])
+            conn = self.cursors._cursors[token].conn
+            conn.broken = True
+            with self.assertRaisesRegex(RuntimeError, "connection lost"):
+                await self.cursors.fetch(token, 4, 2)
+            return cancelled, conn
+
+        cancelled, failed = anyio.run(main)
+        self.assertEqual(len(self.cursors), 0)
+        self.assertEqual(self.pool.stats()["size"], 0)
+        self.assertNotEqual(cancelled, failed)
+        self.assertEqual(cancelled.cursors_closed, 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import tempfile
+import time
+import unittest
+
+from dbmesh.db import export
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+class TestExportFiles(unittest.TestCase):
+    """Test cases for export file handling."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def write(self, name, data):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_copy_keeps_the_query_on_its_own_lines(self):
+        class Cursor:
+            rowcount = 0
+
+            def copy_expert(self, sql, f):
+                self.sql = sql
+
+        cursor = Cursor()
+        export.copy_csv(cursor, "SELECT * FROM t -- all", os.path.join(self.tmp.name, "out.csv"))
+        self.assertEqual(cursor.sql, "COPY (\nSELECT * FROM t -- all\n) TO STDOUT WITH (FORMAT csv, HEADER)")
+
+    def test_read_chunk(self):
+        path = self.write("a.csv", b"0123456789")
+        self.assertEqual(export.read_chunk(path, 0, 4), b"0123")
+        self.assertEqual(export.read_chunk(path, 2, 4), b"89")
+        self.assertEqual(export.read_chunk(path, 3, 4), b"")
+        with self.assertRaises(ValueError):
+            export.read_chunk(path, -1, 4)
+
+    def test_remove_expired(self):
+        old = self.write("old.csv", b"x")
+        new = self.write("new.csv", b"x")
+        os.utime(old, (time.time() - 100, time.time() - 100))
+        self.assertEqual(export.remove_expired(self.tmp.name, 50), 1)
+        self.assertFalse(os.path.exists(old))
+        self.assertTrue(os.path.exists(new))
+
+    def test_export_ids_cannot_escape_the_directory(self):
+        self.assertTrue(export.EXPORT_ID.fullmatch("0" * 32 + ".parquet"))
+        self.assertFalse(export.EXPORT_ID.fullmatch("../../etc/passwd"))
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_csv_to_parquet_keeps_types_and_nulls(self):
+        import pyarrow.parquet
+
+        csv_path = self.write("a.csv", b'id,name,active\n1,"",t\n2,,f\n')
+        path = os.path.join(self.tmp.name, "a.parquet")
+        types = export.arrow_types(["int4", "text", "bool"])
+        self.assertEqual(export.csv_to_arrow(csv_path, path, "parquet", ["id", "name", "active"], types), 2)
+        table = pyarrow.parquet.read_table(path)
+        self.assertEqual(
+            table.to_pylist(),
+            [{"id": 1, "name": "", "active": True}, {"id": 2, "name": None, "active": False}],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+import io
+import unittest
+
+from dbmesh.db import ingest
+
+
+class TestCsvRecords(unittest.TestCase):
+    """Test cases for encoding and splitting CSV records."""
+
+    def test_csv_record_keeps_null_and_empty_string_apart(self):
+        self.assertEqual(
+            ingest.csv_record([1, None, "", 'a "b"', True, 1.5, {"k": 1}, b"\x01"]),
+            '1,,"","a ""b""","t",1.5,"{""k"": 1}","\\x01"\n',
+        )
+
+    def test_records_span_quoted_newlines(self):
+        f = io.StringIO('id,note\n1,"two\nlines"\n2,""\n3,x')
+        self.assertEqual(list(ingest.csv_records(f)), ["id,note\n", '1,"two\nlines"\n', '2,""\n', "3,x\n"])
+
+    def test_take(self):
+        records = iter(["a", "b", "c"])
+        self.assertEqual(ingest.take(records, 2), ["a", "b"])
+        self.assertEqual(ingest.take(records, 2), ["c"])
+        self.assertEqual(ingest.take(records, 2), [])
+
+    def test_copy_sql_quotes_identifiers(self):
+        self.assertEqual(
+            ingest.copy_sql("sales.orders", ["id", 'we"ird']),
+            'COPY "sales"."orders" ("id", "we""ird") FROM STDIN WITH (FORMAT csv)',
+        )
+        with self.assertRaises(ValueError):
+            ingest.copy_sql("a.b.c", None)
+
+
+if __name__ == "__main__":
+    unittest.main()
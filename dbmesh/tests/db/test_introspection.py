@@ -0,0 +1,144 @@
+import inspect
+import unittest
+
+from mcp.server.fastmcp.tools import Tool
+
+from dbmesh.db.introspection import ColumnInfo, SchemaCache, TableInfo, read_catalog
+from dbmesh.db.postgres import PostgresManager, _select_sql
+
+
+def make_table(oid=1, name="users", fingerprint="a", columns=None):
+    return TableInfo(
+        oid=oid,
+        schema="public",
+        name=name,
+        kind="r",
+        columns=columns or (
+            ColumnInfo("id", "integer", "int4", nullable=False, primary_key=True),
+            ColumnInfo("email", "text", "text"),
+        ),
+        fingerprint=fingerprint,
+    )
+
+
+class TestSchemaCache(unittest.TestCase):
+    """Test cases for incremental SchemaCache updates."""
+
+    def test_apply_reports_added_changed_and_removed(self):
+        """Only tables whose fingerprint changed are reported."""
+        cache = SchemaCache()
+        users, orders = make_table(1, "users"), make_table(2, "orders")
+        diff = cache.apply({1: "a", 2: "a"}, {1: users, 2: orders})
+        self.assertEqual(diff.added, [users, orders])
+        self.assertEqual(cache.generation, 1)
+
+        renamed = make_table(1, "people", fingerprint="b")
+        diff = cache.apply({1: "b", 3: "a"}, {1: renamed, 3: make_table(3, "items")})
+        self.assertEqual(diff.changed, [(users, renamed)])
+        self.assertEqual([t.name for t in diff.added], ["items"])
+        self.assertEqual(diff.removed, [orders])
+        self.assertEqual(set(cache.tables), {1, 3})
+
+    def test_unchanged_catalog_is_a_no_op(self):
+        """A refresh with identical fingerprints changes nothing."""
+        cache = SchemaCache()
+        cache.apply({1: "a"}, {1: make_table()})
+        self.assertFalse(cache.apply({1: "a"}, {}))
+        self.assertEqual(cache.generation, 1)
+
+    def test_apply_replaces_tables_instead_of_mutating_them(self):
+        """A thread iterating the tables never sees them change under it."""
+        cache = SchemaCache()
+        cache.apply({1: "a", 2: "a"}, {1: make_table(1), 2: make_table(2, "orders")})
+        tables = cache.tables
+        cache.apply({1: "b"}, {1: make_table(1, fingerprint="b")})
+        self.assertEqual(set(tables), {1, 2})
+        self.assertEqual(tables[1].fingerprint, "a")
+        self.assertEqual(cache.fingerprints(), {1: "b"})
+
+    def test_read_catalog_loads_only_stale_tables(self):
+        """Tables whose fingerprint is known are not re-read."""
+        class Cursor:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def execute(self, sql, params=None):
+                self.params = params
+
+            def fetchall(self):
+                if self.params is None:
+                    return [(1, "a"), (2, "b")]
+                return [(2, "public", "orders", "r", "id", "integer", "int4", False, True)]
+
+        class Connection:
+            rolled_back = False
+
+            def cursor(self):
+                return Cursor()
+
+            def rollback(self):
+                self.rolled_back = True
+
+        conn = Connection()
+        fingerprints, loaded = read_catalog(conn, {1: "a", 2: "a"})
+        self.assertEqual(fingerprints, {1: "a", 2: "b"})
+        self.assertEqual([table.name for table in loaded.values()], ["orders"])
+        self.assertTrue(conn.rolled_back)
+
+
+class TestGeneratedTableTools(unittest.TestCase):
+    """Test cases for tools generated from introspected tables."""
+
+    def setUp(self):
+        self.manager = PostgresManager(name="main")
+        self.table = make_table()
+
+    def test_tool_signature_is_typed_by_column(self):
+        """Generated tools expose one optional, typed filter per column."""
+        fn, name, _ = self.manager._table_tool(self.table)
+        self.assertEqual(name, "main_table_users")
+        tool = Tool.from_function(fn, name=name)
+        properties = tool.parameters["properties"]
+        self.assertEqual(list(properties), ["id", "email", "limit", "order_by"])
+        self.assertIn({"type": "integer"}, properties["id"]["anyOf"])
+        self.assertEqual(tool.parameters.get("required", []), [])
+        self.assertTrue(inspect.iscoroutinefunction(fn))
+
+    def test_catalog_changes_replace_changed_tables(self):
+        """A changed table removes its old tool and resource and adds new ones."""
+        cache = self.manager.schema_cache
+        cache.apply({1: "a"}, {1: self.table})
+        diff = cache.apply({1: "b"}, {1: make_table(1, "people", fingerprint="b")})
+        changes = self.manager._catalog_changes(diff)
+        self.assertEqual(changes.removed_tools, ["main_table_users"])
+        self.assertEqual(changes.removed_resources, ["postgres://main/public/users"])
+        self.assertEqual([name for _, name, _ in changes.tools], ["main_table_people"])
+
+    def test_tool_names_never_clash_with_built_in_tools(self):
+        """Tables named like a built-in tool get their own tool."""
+        built_in = {name for _, name, _ in self.manager.get_tools()}
+        for table in ("page", "batch", "execute_batch", "close_cursor", "load"):
+            _, name, _ = self.manager._table_tool(make_table(name=table))
+            self.assertNotIn(name, built_in)
+        self.assertEqual(self.manager.table_tool_name(make_table(name="page")), "main_table_page")
+
+    def test_select_sql_quotes_identifiers_and_parameterizes_values(self):
+        """Filters become parameters and identifiers are quoted."""
+        sql, params = _select_sql(self.table, {"email": "a@b.c", "id": None, "limit": 5, "order_by": "id"})
+        self.assertEqual(sql, 'SELECT * FROM "public"."users" WHERE "email" = %s ORDER BY "id" LIMIT %s')
+        self.assertEqual(params, ["a@b.c", 5])
+        with self.assertRaises(ValueError):
+            _select_sql(self.table, {"order_by": "id; DROP TABLE users"})
+
+    def test_select_sql_numbered_placeholders(self):
+        """Statements to prepare number their placeholders in argument name order."""
+        sql, params = _select_sql(self.table, {"limit": 5, "id": 1, "email": "a@b.c"}, numbered=True)
+        self.assertEqual(sql, 'SELECT * FROM "public"."users" WHERE "email" = $1 AND "id" = $2 LIMIT $3')
+        self.assertEqual(params, ["a@b.c", 1, 5])
+
+
+if __name__ == "__main__":
+    unittest.main()
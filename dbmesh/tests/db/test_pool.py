@@ -0,0 +1,141 @@
+import time
+import unittest
+
+import anyio
+
+from dbmesh.db.pool import ConnectionPool, PoolTimeoutError
+
+
+class FakeConnection:
+    """Minimal DB-API style connection used to exercise the pool."""
+
+    def __init__(self):
+        self.closed = 0
+
+    def close(self):
+        self.closed = 1
+
+
+class TestConnectionPool(unittest.TestCase):
+    """Test cases for the ConnectionPool class."""
+
+    def setUp(self):
+        """Set up a pool backed by fake connections."""
+        self.opened = []
+
+        def connect():
+            conn = FakeConnection()
+            self.opened.append(conn)
+            return conn
+
+        self.connect = connect
+
+    def test_open_warms_min_size(self):
+        """Opening the pool creates min_size connections."""
+        pool = ConnectionPool(self.connect, min_size=2, max_size=4)
+        anyio.run(pool.open)
+        self.assertEqual(len(self.opened), 2)
+        self.assertEqual(pool.stats()["idle"], 2)
+
+    def test_cancelled_open_closes_late_connections(self):
+        """Connections finished after open was cancelled are closed, not leaked."""
+
+        def slow_connect():
+            time.sleep(0.2)
+            return self.connect()
+
+        pool = ConnectionPool(slow_connect, min_size=2, max_size=4)
+
+        async def main():
+            with anyio.move_on_after(0.05):
+                await pool.open()
+            await anyio.sleep(0.6)
+
+        start = time.perf_counter()
+        anyio.run(main)
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertEqual(len(self.opened), 2)
+        self.assertTrue(all(conn.closed for conn in self.opened))
+        self.assertEqual(pool.stats()["size"], 0)
+
+    def test_concurrent_checkouts_use_distinct_connections(self):
+        """Concurrent callers each get their own connection."""
+        pool = ConnectionPool(self.connect, min_size=0, max_size=3)
+        seen = []
+
+        async def worker():
+            async with pool.connection() as conn:
+                seen.append(conn)
+                await anyio.sleep(0.05)
+
+        async def main():
+            async with anyio.create_task_group() as tg:
+                for _ in range(3):
+                    tg.start_soon(worker)
+
+        anyio.run(main)
+        self.assertEqual(len(set(map(id, seen))), 3)
+        self.assertEqual(pool.stats()["idle"], 3)
+
+    def test_acquire_timeout(self):
+        """Acquiring from an exhausted pool times out."""
+        pool = ConnectionPool(self.connect, min_size=0, max_size=1, acquire_timeout=0.05)
+
+        async def main():
+            conn = await pool.acquire()
+            with self.assertRaises(PoolTimeoutError):
+                await pool.acquire()
+            await pool.release(conn)
+            self.assertIs(await pool.acquire(), conn)
+
+        anyio.run(main)
+
+    def test_reap_closes_stale_idle_connections(self):
+        """Idle connections past max_idle are closed down to min_size."""
+        pool = ConnectionPool(self.connect, min_size=1, max_size=3, max_idle=0)
+
+        async def main():
+            conns = [await pool.acquire() for _ in range(3)]
+            for conn in conns:
+                await pool.release(conn)
+            time.sleep(0.01)
+            return await pool.reap()
+
+        self.assertEqual(anyio.run(main), 2)
+        self.assertEqual(pool.stats()["size"], 1)
+        self.assertEqual(sum(conn.closed for conn in self.opened), 2)
+
+    def test_closed_connections_are_not_reused(self):
+        """A connection closed while checked out is dropped on release."""
+        pool = ConnectionPool(self.connect, min_size=0, max_size=2)
+
+        async def main():
+            conn = await pool.acquire()
+            conn.close()
+            await pool.release(conn)
+            return await pool.acquire()
+
+        self.assertIsNot(anyio.run(main), self.opened[0])
+        self.assertEqual(len(self.opened), 2)
+
+    def test_cancelled_checkout_is_discarded(self):
+        """A connection whose user was cancelled is closed instead of reused."""
+        pool = ConnectionPool(self.connect, min_size=0, max_size=2)
+
+        async def main():
+            with anyio.move_on_after(0.01):
+                async with pool.connection():
+                    await anyio.sleep(1)
+            async with pool.connection() as conn:
+                return conn
+
+        self.assertIsNot(anyio.run(main), self.opened[0])
+        for _ in range(100):
+            if self.opened[0].closed:
+                break
+            time.sleep(0.01)
+        self.assertEqual(self.opened[0].closed, 1)
+        self.assertEqual(pool.stats()["size"], 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,189 @@
+import unittest
+from collections import namedtuple
+
+import anyio
+
+from dbmesh.db.postgres import PostgresManager, _fetch_prepared, _load_batch, _run_batch, _top_rows_sql
+from dbmesh.db.prepared import PreparedStatements
+
+try:
+    import psycopg2.errors
+except ImportError:  # pragma: no cover
+    psycopg2 = None
+
+Column = namedtuple("Column", "name type_code")
+
+
+class FakeCursor:
+    """Cursor returning one row per query and failing on SQL containing "fail"."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.description = None
+        self.rowcount = -1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def copy_expert(self, sql, f):
+        records = f.read().splitlines()
+        self.conn.log.append(f"COPY {len(records)}")
+        if any("fail" in record for record in records):
+            raise RuntimeError("boom")
+
+    def execute(self, sql, params=None):
+        self.conn.log.append(sql)
+        if sql.startswith("EXECUTE") and self.conn.stale_plans:
+            self.conn.stale_plans -= 1
+            raise psycopg2.errors.FeatureNotSupported("cached plan must not change result type")
+        if "fail" in sql:
+            raise RuntimeError("boom")
+        self.description = [Column("n", 23)] if sql.startswith(("SELECT", "EXECUTE")) else None
+        self.rowcount = 1
+
+    def fetchall(self):
+        return [(1,)]
+
+
+class FakeConnection:
+    def __init__(self):
+        self.log = []
+        self.stale_plans = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.log.append("COMMIT")
+
+    def rollback(self):
+        self.log.append("ROLLBACK")
+
+
+class TestRunBatch(unittest.TestCase):
+    """Test cases for running statement batches in one worker call."""
+
+    def test_independent_reads_report_errors_in_place(self):
+        conn = FakeConnection()
+        results = _run_batch(conn, [("SELECT 1", None), ("SELECT fail", None), ValueError("guard")], True, False)
+        self.assertEqual(results[0], ([Column("n", 23)], [(1,)]))
+        self.assertIsInstance(results[1], RuntimeError)
+        self.assertEqual(str(results[2]), "guard")
+        self.assertNotIn("COMMIT", conn.log)
+        self.assertEqual(conn.log.count("SET TRANSACTION READ ONLY"), 2)
+
+    def test_transactional_reads_share_a_snapshot(self):
+        conn = FakeConnection()
+        _run_batch(conn, [("SELECT 1", None), ("SELECT 2", None)], True, True)
+        self.assertEqual(
+            conn.log,
+            ["SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY", "SELECT 1", "SELECT 2", "ROLLBACK"],
+        )
+
+    def test_transactional_writes_are_all_or_nothing(self):
+        conn = FakeConnection()
+        with self.assertRaisesRegex(ValueError, "Statement 1 failed, the batch was rolled back: boom"):
+            _run_batch(conn, [("INSERT 1", None), ("INSERT fail", None), ("INSERT 3", None)], False, True)
+        self.assertEqual(conn.log, ["INSERT 1", "INSERT fail", "ROLLBACK"])
+
+        conn = FakeConnection()
+        self.assertEqual(_run_batch(conn, [("INSERT 1", None), ("INSERT 2", None)], False, True), [1, 1])
+        self.assertEqual(conn.log, ["INSERT 1", "INSERT 2", "COMMIT"])
+
+    def test_independent_writes_commit_one_by_one(self):
+        conn = FakeConnection()
+        results = _run_batch(conn, [("INSERT 1", None), ("INSERT fail", None), ("INSERT 3", None)], False, False)
+        self.assertEqual(results[0], 1)
+        self.assertIsInstance(results[1], RuntimeError)
+        self.assertEqual(results[2], 1)
+        self.assertEqual(conn.log[:5], ["INSERT 1", "COMMIT", "INSERT fail", "ROLLBACK", "INSERT 3"])
+
+
+@unittest.skipIf(psycopg2 is None, "psycopg2 is not installed")
+class TestFetchPrepared(unittest.TestCase):
+    """Test cases for running generated table statements as prepared statements."""
+
+    def test_stale_plan_is_prepared_again_once(self):
+        conn = FakeConnection()
+        statements = PreparedStatements(max_size=4)
+        _fetch_prepared(conn, statements, "SELECT * FROM t", None, 0)
+        conn.log.clear()
+        conn.stale_plans = 1
+        self.assertEqual(_fetch_prepared(conn, statements, "SELECT * FROM t", None, 0)[1], [(1,)])
+        self.assertEqual(
+            conn.log,
+            [
+                "SET TRANSACTION READ ONLY",
+                "EXECUTE dbmesh_1",
+                "ROLLBACK",
+                "DEALLOCATE dbmesh_1",
+                "ROLLBACK",
+                "SET TRANSACTION READ ONLY",
+                "PREPARE dbmesh_2 AS SELECT * FROM t",
+                "EXECUTE dbmesh_2",
+                "ROLLBACK",
+            ],
+        )
+
+    def test_plan_that_stays_stale_gives_up(self):
+        conn = FakeConnection()
+        conn.stale_plans = 2
+        with self.assertRaises(psycopg2.errors.FeatureNotSupported):
+            _fetch_prepared(conn, PreparedStatements(max_size=4), "SELECT * FROM t", None, 0)
+        self.assertEqual(conn.log.count("PREPARE dbmesh_2 AS SELECT * FROM t"), 1)
+        self.assertEqual(conn.log[-1], "ROLLBACK")
+
+
+class TestSingleStatement(unittest.TestCase):
+    """Test cases for rejecting several statements in one read-only query."""
+
+    def test_later_statements_cannot_escape_the_read_only_transaction(self):
+        manager = PostgresManager(name="main")
+        sql = "SELECT 1; COMMIT; DELETE FROM users"
+        with self.assertRaisesRegex(ValueError, "Only one SQL statement"):
+            anyio.run(manager.query, sql)
+        with self.assertRaisesRegex(ValueError, "Statement 1: Only one SQL statement"):
+            anyio.run(manager.query_batch, [{"sql": "SELECT 1;"}, {"sql": sql}])
+        with self.assertRaisesRegex(ValueError, "Only one SQL statement"):
+            anyio.run(manager.query_page, sql)
+
+
+class TestQueryPage(unittest.TestCase):
+    """Test cases for argument checks of paginated queries."""
+
+    def test_page_size_must_be_positive(self):
+        manager = PostgresManager(name="main")
+        for page_size in (0, -5):
+            with self.assertRaisesRegex(ValueError, "page_size must be at least 1"):
+                anyio.run(manager.query_page, "SELECT 1", None, page_size)
+
+
+class TestTopRowsSql(unittest.TestCase):
+    """Test cases for limiting federated query shards to their top rows."""
+
+    def test_query_is_wrapped_in_order_and_limit(self):
+        self.assertEqual(
+            _top_rows_sql("SELECT * FROM t; -- all\n", ["a", 'b"c'], True, 5),
+            'SELECT * FROM (\nSELECT * FROM t\n) q ORDER BY "a" DESC, "b""c" DESC LIMIT 5',
+        )
+        self.assertEqual(_top_rows_sql("SELECT 1", None, False, 3), "SELECT * FROM (\nSELECT 1\n) q LIMIT 3")
+
+
+class TestLoadBatch(unittest.TestCase):
+    """Test cases for loading COPY batches with rejected row isolation."""
+
+    def test_rejected_rows_are_isolated(self):
+        conn = FakeConnection()
+        records = iter(["1\n", "fail\n", "3\n", "4\n", "5\n"])
+        self.assertEqual(_load_batch(conn, "COPY t FROM STDIN", records, 4), (4, 3, [(1, "boom")]))
+        # The failed batch is split until the bad row is alone
+        self.assertEqual(conn.log.count("COMMIT"), 2)
+        self.assertEqual(_load_batch(conn, "COPY t FROM STDIN", records, 4), (1, 1, []))
+        self.assertEqual(_load_batch(conn, "COPY t FROM STDIN", records, 4), (0, 0, []))
+
+
+if __name__ == "__main__":
+    unittest.main()
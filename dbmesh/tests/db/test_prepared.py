@@ -0,0 +1,61 @@
+import unittest
+
+from dbmesh.db.prepared import PreparedStatements
+
+
+class RecordingCursor:
+    def __init__(self):
+        self.executed = []
+
+    def execute(self, sql, params=None):
+        self.executed.append((sql, params))
+
+
+class TestPreparedStatements(unittest.TestCase):
+    """Test cases for the PreparedStatements class."""
+
+    def setUp(self):
+        self.statements = PreparedStatements(max_size=2)
+        self.cursor = RecordingCursor()
+
+    def test_statements_are_prepared_once(self):
+        for value in (1, 2):
+            self.statements.execute(self.cursor, "SELECT * FROM t WHERE a = $1", [value], 0)
+        self.assertEqual(
+            self.cursor.executed,
+            [
+                ("PREPARE dbmesh_1 AS SELECT * FROM t WHERE a = $1", None),
+                ("EXECUTE dbmesh_1(%s)", [1]),
+                ("EXECUTE dbmesh_1(%s)", [2]),
+            ],
+        )
+        self.assertEqual((self.statements.hits, self.statements.misses), (1, 1))
+
+    def test_least_recently_used_statement_is_deallocated(self):
+        for sql in ("SELECT 1", "SELECT 2", "SELECT 1", "SELECT 3"):
+            self.statements.execute(self.cursor, sql, None, 0)
+        self.assertIn(("DEALLOCATE dbmesh_2", None), self.cursor.executed)
+        self.assertEqual(len(self.statements), 2)
+
+    def test_schema_change_deallocates_everything(self):
+        self.statements.execute(self.cursor, "SELECT 1", None, 0)
+        self.cursor.executed.clear()
+        self.statements.execute(self.cursor, "SELECT 1", None, 1)
+        self.assertEqual(
+            self.cursor.executed,
+            [("DEALLOCATE ALL", None), ("PREPARE dbmesh_2 AS SELECT 1", None), ("EXECUTE dbmesh_2", None)],
+        )
+
+    def test_discarded_statement_is_prepared_again(self):
+        self.statements.execute(self.cursor, "SELECT 1", None, 0)
+        self.statements.discard(self.cursor, "SELECT 1")
+        self.statements.discard(self.cursor, "SELECT 2")
+        self.statements.execute(self.cursor, "SELECT 1", None, 0)
+        self.assertEqual(
+            self.cursor.executed[2:],
+            [("DEALLOCATE dbmesh_1", None), ("PREPARE dbmesh_2 AS SELECT 1", None), ("EXECUTE dbmesh_2", None)],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
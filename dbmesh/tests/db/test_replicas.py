@@ -0,0 +1,95 @@
+import unittest
+
+import anyio
+import anyio.to_thread
+
+from dbmesh.db.pool import ConnectionPool
+from dbmesh.db.replicas import Replica, ReplicaSet
+
+
+class FakeConnection:
+    closed = 0
+
+    def __init__(self, source):
+        self.source = source
+
+    def close(self):
+        self.closed = 1
+
+
+def make_pool(source, fail=False):
+    def connect():
+        if fail:
+            raise Exception(f"{source} is down")
+        return FakeConnection(source)
+
+    return ConnectionPool(connect, min_size=0, max_size=4)
+
+
+async def run_sync(fn, *args, cancel=None):
+    return await anyio.to_thread.run_sync(fn, *args)
+
+
+class TestReplicaSet(unittest.TestCase):
+    """Test cases for routing reads across replicas."""
+
+    def setUp(self):
+        self.primary = make_pool("primary")
+        self.a = Replica("a:5432", make_pool("a"))
+        self.b = Replica("b:5432", make_pool("b"))
+
+    def sources(self, replicas, count=4):
+        seen = []
+
+        async def main():
+            for _ in range(count):
+                async with replicas.connection() as conn:
+                    seen.append(conn.source)
+
+        anyio.run(main)
+        return seen
+
+    def test_reads_spread_across_replicas(self):
+        replicas = ReplicaSet([self.a, self.b], self.primary)
+        self.assertEqual(sorted(set(self.sources(replicas))), ["a", "b"])
+        self.assertEqual((self.a.in_flight, self.b.in_flight), (0, 0))
+
+    def test_least_loaded_prefers_idle_replica(self):
+        replicas = ReplicaSet([self.a, self.b], self.primary)
+        self.a.in_flight = 3
+        self.assertEqual(set(self.sources(replicas)), {"b"})
+
+    def test_latency_prefers_fast_replica(self):
+        replicas = ReplicaSet([self.a, self.b], self.primary, strategy="latency")
+        self.a.latency, self.b.latency = 0.5, 0.01
+        self.assertIs(replicas.choose(), self.b)
+        # A fast replica with a queue can lose to a slower idle one
+        self.b.in_flight = 99
+        self.assertIs(replicas.choose(), self.a)
+
+    def test_lagging_replicas_are_skipped(self):
+        replicas = ReplicaSet([self.a, self.b], self.primary, max_lag=1.0)
+        self.assertIsNone(replicas.choose())
+        self.a.lag, self.b.lag = 0.2, 30.0
+        self.assertEqual(set(self.sources(replicas)), {"a"})
+        self.a.lag = 5.0
+        self.assertEqual(set(self.sources(replicas)), {"primary"})
+
+    def test_unreachable_replica_falls_back_to_primary(self):
+        down = Replica("down:5432", make_pool("down", fail=True))
+        replicas = ReplicaSet([down], self.primary)
+        self.assertEqual(self.sources(replicas, 2), ["primary", "primary"])
+        self.assertFalse(down.healthy)
+
+    def test_health_check_measures_lag_and_revives(self):
+        replicas = ReplicaSet([self.a, self.b], self.primary, max_lag=1.0)
+        self.a.healthy = False
+        lags = {"a": 0.1, "b": 3.0}
+        anyio.run(replicas.check, run_sync, lambda conn: lags[conn.source])
+        self.assertTrue(self.a.healthy)
+        self.assertEqual((self.a.lag, self.b.lag), (0.1, 3.0))
+        self.assertIs(replicas.choose(), self.a)
+
+
+if __name__ == "__main__":
+    unittest.main()
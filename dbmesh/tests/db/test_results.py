@@ -0,0 +1,41 @@
+import datetime
+import decimal
+import json
+import unittest
+
+from dbmesh.db.results import TabularResult
+
+
+class TestTabularResult(unittest.TestCase):
+    """Test cases for TabularResult."""
+
+    def test_to_json_is_columnar(self):
+        """Columns are written once, followed by one array per row."""
+        result = TabularResult(columns=["a", "b"], rows=[(1, "x"), (2, None)])
+        self.assertEqual(json.loads(result.to_json()), {"columns": ["a", "b"], "rows": [[1, "x"], [2, None]]})
+
+    def test_extra_fields_are_top_level(self):
+        """Extra fields such as a continuation token sit next to the rows."""
+        result = TabularResult(columns=["a"], rows=[], types=["int4"], extra={"next_cursor": None})
+        self.assertEqual(
+            json.loads(result.to_json()),
+            {"columns": ["a"], "types": ["int4"], "rows": [], "next_cursor": None},
+        )
+
+    def test_database_values_are_encoded(self):
+        """Dates, decimals and bytes are encoded without custom hooks."""
+        result = TabularResult(
+            columns=["d", "n", "b"],
+            rows=[(datetime.date(2024, 1, 2), decimal.Decimal("1.50"), b"\x00\xff")],
+        )
+        self.assertEqual(json.loads(result.to_json())["rows"], [["2024-01-02", "1.50", "AP8="]])
+
+    def test_to_dicts(self):
+        """Rows can be turned back into one dict per row."""
+        result = TabularResult(columns=["a", "b"], rows=[(1, 2)])
+        self.assertEqual(result.to_dicts(), [{"a": 1, "b": 2}])
+        self.assertEqual(len(result), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
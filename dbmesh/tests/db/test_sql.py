@@ -0,0 +1,50 @@
+import unittest
+
+from dbmesh.db.sql import count_statements, normalize_sql, referenced_tables
+
+
+class TestSqlHelpers(unittest.TestCase):
+    """Test cases for the lexical SQL helpers."""
+
+    def test_normalize_keeps_literals(self):
+        """Whitespace inside string literals is significant."""
+        self.assertNotEqual(normalize_sql("SELECT 'a  b'"), normalize_sql("SELECT 'a b'"))
+
+    def test_normalize_keeps_comments_apart_from_code(self):
+        """A line comment keeps its line break; trailing semicolons and comments are dropped."""
+        self.assertEqual(normalize_sql("SELECT * FROM t -- c\n   WHERE a = 1;  -- done\n"), "SELECT * FROM t -- c\nWHERE a = 1")
+        self.assertEqual(normalize_sql("SELECT 1 /* a  b */  FROM t ;;"), "SELECT 1 /* a  b */ FROM t")
+
+    def test_count_statements(self):
+        """Only semicolons outside of literals, identifiers and comments separate statements."""
+        self.assertEqual(count_statements("SELECT 1; COMMIT; DELETE FROM users"), 3)
+        self.assertEqual(count_statements("SELECT 1;  -- done"), 1)
+        self.assertEqual(count_statements("SELECT ';', \"a;b\", $t$ ; $t$ /* ; /* ; */ ; */"), 1)
+        # Quotes inside comments, escape strings and dollar quotes do not hide what follows
+        self.assertEqual(count_statements("SELECT 1 -- '\n; DELETE FROM users; SELECT '"), 3)
+        self.assertEqual(count_statements("SELECT E'\\''; DELETE FROM users; SELECT '"), 3)
+        self.assertEqual(count_statements("SELECT $$ ' $$; DELETE FROM users"), 2)
+        self.assertEqual(count_statements("SELECT $1, a$$; DELETE FROM users"), 2)
+
+    def test_referenced_tables(self):
+        """Table names are extracted from common statements."""
+        self.assertEqual(
+            referenced_tables('SELECT * FROM users u, s."Orders" JOIN items ON true'),
+            {"users", "Orders", "items"},
+        )
+        self.assertEqual(referenced_tables("INSERT INTO logs (a) VALUES ('from x')"), {"logs"})
+        self.assertEqual(referenced_tables("UPDATE ONLY accounts SET a = 1"), {"accounts"})
+        self.assertEqual(referenced_tables("SELECT 1"), set())
+        self.assertEqual(referenced_tables("SELECT * FROM a -- it's from z\nJOIN b WHERE x = $$ from y $$"), {"a", "b"})
+
+    def test_referenced_tables_leave_out_ctes(self):
+        """Common table expressions are not tables."""
+        self.assertEqual(
+            referenced_tables("WITH recent AS (SELECT * FROM orders) SELECT * FROM recent JOIN users ON true"),
+            {"orders", "users"},
+        )
+        self.assertEqual(referenced_tables("WITH r AS MATERIALIZED (SELECT load()) SELECT * FROM r"), set())
+
+
+if __name__ == "__main__":
+    unittest.main()
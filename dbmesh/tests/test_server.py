@@ -0,0 +1,387 @@
+import json
+import os
+import tempfile
+import unittest
+
+import anyio
+from mcp.server.fastmcp import Context
+from mcp.server.fastmcp.exceptions import ToolError
+from starlette.testclient import TestClient
+
+from dbmesh.core.admission import AdmissionRejected
+from dbmesh.db.base import ToolAccess
+from dbmesh.db.example import ExampleManager
+from dbmesh.db.results import TabularResult
+from dbmesh.server import DBMeshMCPServer, _convert_to_content
+
+
+class TestResultCaching(unittest.TestCase):
+    """Test cases for the result cache in DBMeshMCPServer.call_tool."""
+
+    def setUp(self):
+        """Register a read tool and a write tool on a caching server."""
+        self.server = DBMeshMCPServer("test", result_cache_max_entries=16)
+        self.reads = 0
+
+        async def read_users(limit: int) -> list:
+            self.reads += 1
+            return [{"id": i} for i in range(limit)]
+
+        async def write_users(sql: str) -> dict:
+            return {"rowcount": 1}
+
+        self.server.add_tool(
+            read_users,
+            access=ToolAccess(database="db", read_only=True, tables=frozenset({"users"}), cache_ttl=60),
+        )
+        async def read_batch(statements: list) -> list:
+            self.reads += 1
+            return [3 for _ in statements]
+
+        async def read_sql(sql: str) -> list:
+            self.reads += 1
+            return [sql]
+
+        async def read_untagged() -> list:
+            self.reads += 1
+            return []
+
+        self.server.add_tool(write_users, access=ToolAccess(database="db", sql_argument="sql"))
+        self.server.add_tool(
+            read_sql, access=ToolAccess(database="db", read_only=True, sql_argument="sql", cache_ttl=60)
+        )
+        self.server.add_tool(read_untagged, access=ToolAccess(database="db", read_only=True, cache_ttl=60))
+        self.server.add_tool(
+            read_batch, access=ToolAccess(database="db", read_only=True, sql_argument="statements", cache_ttl=60)
+        )
+
+    def call(self, name, arguments):
+        return anyio.run(self.server.call_tool, name, arguments)
+
+    def test_repeated_reads_are_served_from_cache(self):
+        """Identical read-only calls hit the database once."""
+        first = self.call("read_users", {"limit": 2})
+        second = self.call("read_users", {"limit": 2})
+        self.assertEqual(first, second)
+        self.assertEqual(self.reads, 1)
+        self.assertEqual(self.server.result_cache.stats()["hits"], 1)
+
+    def test_write_invalidates_touched_table(self):
+        """A write to a cached table forces the next read to the database."""
+        self.call("read_users", {"limit": 2})
+        self.call("write_users", {"sql": "UPDATE orders SET x = 1"})
+        self.call("read_users", {"limit": 2})
+        self.assertEqual(self.reads, 1)
+        self.call("write_users", {"sql": "DELETE FROM users"})
+        self.call("read_users", {"limit": 2})
+        self.assertEqual(self.reads, 2)
+
+    def test_failed_write_still_invalidates(self):
+        """A write that raises may have committed part of its work."""
+
+        async def load_users(sql: str) -> dict:
+            raise RuntimeError("batch 2 failed")
+
+        self.server.add_tool(load_users, access=ToolAccess(database="db", sql_argument="sql"))
+        self.call("read_users", {"limit": 2})
+        with self.assertRaises(ToolError):
+            self.call("load_users", {"sql": "INSERT INTO users VALUES (1)"})
+        self.call("read_users", {"limit": 2})
+        self.assertEqual(self.reads, 2)
+
+    def test_write_invalidates_batches_reading_the_table(self):
+        """A batch depends on the tables of all of its statements."""
+        batch = {"statements": [{"sql": "SELECT 1 FROM orders"}, {"sql": "SELECT count(*) FROM users"}]}
+        self.call("read_batch", batch)
+        self.call("write_users", {"sql": "UPDATE items SET x = 1"})
+        self.call("read_batch", batch)
+        self.assertEqual(self.reads, 1)
+        self.call("write_users", {"sql": "DELETE FROM users"})
+        self.call("read_batch", batch)
+        self.assertEqual(self.reads, 2)
+
+    def assert_any_write_invalidates(self, name, arguments):
+        self.reads = 0
+        self.call(name, arguments)
+        self.call(name, arguments)
+        self.assertEqual(self.reads, 1)
+        self.call("write_users", {"sql": "DELETE FROM users"})
+        self.call(name, arguments)
+        self.assertEqual(self.reads, 2)
+
+    def test_write_invalidates_reads_of_unparseable_sql(self):
+        """Reads whose SQL names no recognizable table depend on every table."""
+        self.assert_any_write_invalidates("read_sql", {"sql": "EXECUTE user_count"})
+
+    def test_write_invalidates_reads_through_functions(self):
+        self.assert_any_write_invalidates("read_sql", {"sql": "SELECT count_users()"})
+
+    def test_write_invalidates_reads_of_ctes(self):
+        self.assert_any_write_invalidates("read_sql", {"sql": "WITH c AS (SELECT count_users()) SELECT * FROM c"})
+
+    def test_write_invalidates_untagged_reads(self):
+        self.assert_any_write_invalidates("read_untagged", {})
+
+    def test_cache_is_opt_in(self):
+        """Without a configured size nothing is cached."""
+        self.assertIsNone(DBMeshMCPServer("plain").result_cache)
+
+
+class TestCallCoalescing(unittest.TestCase):
+    """Test cases for single-flight coalescing in DBMeshMCPServer.call_tool."""
+
+    def test_identical_concurrent_reads_execute_once(self):
+        """Concurrent identical read-only calls share one execution."""
+        server = DBMeshMCPServer("test")
+        runs = []
+
+        async def count_rows(table: str) -> int:
+            runs.append(table)
+            await anyio.sleep(0.05)
+            return 42
+
+        server.add_tool(count_rows, access=ToolAccess(database="db", read_only=True))
+        results = []
+
+        async def main():
+            async with anyio.create_task_group() as tg:
+                for _ in range(4):
+                    tg.start_soon(lambda: self._collect(server, results, {"table": "t"}))
+                tg.start_soon(lambda: self._collect(server, results, {"table": "u"}))
+
+        anyio.run(main)
+        self.assertEqual(sorted(runs), ["t", "u"])
+        self.assertEqual(len(results), 5)
+
+    async def _collect(self, server, results, arguments):
+        results.append(await server.call_tool("count_rows", arguments))
+
+
+class TestTabularConversion(unittest.TestCase):
+    """Test cases for converting tabular results to content."""
+
+    def test_tabular_result_is_encoded_columnar(self):
+        """Column names appear once and rows are arrays."""
+        result = TabularResult(columns=["id", "name"], rows=[(1, "a"), (2, "b")], types=["int4", "text"])
+        content = _convert_to_content(result)
+        self.assertEqual(len(content), 1)
+        self.assertEqual(
+            content[0].text,
+            '{"columns":["id","name"],"types":["int4","text"],"rows":[[1,"a"],[2,"b"]]}',
+        )
+
+
+
+class TestMetrics(unittest.TestCase):
+    """Test cases for request metrics and the /metrics route."""
+
+    def setUp(self):
+        """Register a tool backed by a blocking database call."""
+        self.server = DBMeshMCPServer("test")
+        self.db = ExampleManager()
+        self.server.add_tool(
+            self.db.as_async_tool(self.db.add), access=self.db.tool_access(self.db.add)
+        )
+
+    def test_tool_calls_are_recorded(self):
+        """Calls are counted and timed per tool and database."""
+        anyio.run(self.server.call_tool, "add", {"a": 1, "b": 2})
+        with self.assertRaises(Exception):
+            anyio.run(self.server.call_tool, "add", {"a": "x"})
+        metrics = self.server.metrics
+        labels = {"tool": "add", "database": "ExampleManager", "client": ""}
+        self.assertEqual(metrics.tool_calls.value(**labels, status="ok"), 1)
+        self.assertEqual(metrics.tool_calls.value(**labels, status="error"), 1)
+        self.assertEqual(metrics.tool_seconds.count(**labels), 2)
+        self.assertEqual(metrics.database_seconds.count(**labels), 1)
+        self.assertEqual(metrics.conversion_seconds.count(tool="add"), 1)
+
+    def test_metrics_route(self):
+        """The SSE app serves metrics in the Prometheus text format."""
+        anyio.run(self.server.call_tool, "add", {"a": 1, "b": 2})
+        response = TestClient(self.server.sse_app()).get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(
+            'dbmesh_tool_calls_total{tool="add",database="ExampleManager",client="",status="ok"} 1',
+            response.text,
+        )
+        self.assertIn("dbmesh_sse_sessions 0", response.text)
+
+    def test_template_reads_are_labelled_with_their_database(self):
+        """Resources produced by a template count toward the template's database."""
+
+        async def chunk(export_id: str, index: int) -> bytes:
+            return f"{export_id}:{index}".encode()
+
+        self.server.add_resource_template(chunk, "fake://db/exports/{export_id}/{index}", database="db")
+        contents = anyio.run(self.server.read_resource, "fake://db/exports/e1/2")
+        self.assertEqual(list(contents)[0].content, b"e1:2")
+        self.assertEqual(self.server.metrics.resource_reads.value(database="db", client="", status="ok"), 1)
+
+
+class TestToolTimeouts(unittest.TestCase):
+    """Test cases for per-tool timeouts."""
+
+    def test_slow_tool_is_cancelled(self):
+        """Calls running past the tool's timeout are cancelled and reported."""
+        server = DBMeshMCPServer("test")
+        cancelled = []
+
+        async def slow() -> str:
+            try:
+                await anyio.sleep(5)
+            except anyio.get_cancelled_exc_class():
+                cancelled.append(True)
+                raise
+            return "done"
+
+        server.add_tool(slow, access=ToolAccess(database="db", read_only=True, timeout=0.05))
+        with self.assertRaisesRegex(TimeoutError, "timed out after 0.05s"):
+            anyio.run(server.call_tool, "slow", {})
+        self.assertEqual(cancelled, [True])
+        self.assertEqual(
+            server.metrics.tool_calls.value(tool="slow", database="db", client="", status="timeout"), 1
+        )
+
+
+class TestAdmissionControl(unittest.TestCase):
+    """Test cases for admission control of tool calls."""
+
+    def test_admission_is_opt_in(self):
+        self.assertIsNone(DBMeshMCPServer("test")._admission)
+
+    def test_rejected_calls_are_reported(self):
+        """Calls over the client's rate are rejected and counted."""
+        server = DBMeshMCPServer("test", client_rate_limit=0.01, client_rate_burst=1)
+        db = ExampleManager()
+        server.add_tool(db.as_async_tool(db.add), access=db.tool_access(db.add))
+
+        async def main():
+            await server.call_tool("add", {"a": 1, "b": 2})
+            await server.call_tool("add", {"a": 1, "b": 2})
+
+        with self.assertRaisesRegex(AdmissionRejected, "Rate limit"):
+            anyio.run(main)
+        metrics = server.metrics
+        self.assertEqual(metrics.tool_calls.value(tool="add", database=db.database_name, client="", status="ok"), 1)
+        self.assertEqual(
+            metrics.tool_calls.value(tool="add", database=db.database_name, client="", status="rejected"), 1
+        )
+        self.assertEqual(metrics.admission_rejections.value(client="", reason="rate"), 1)
+
+
+class TestTracing(unittest.TestCase):
+    """Test cases for opt-in request tracing."""
+
+    def test_sampled_calls_are_written_with_phases(self):
+        """A traced call records the tool, database and conversion phases."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "traces.jsonl")
+            server = DBMeshMCPServer("test", trace_sample_rate=1.0, trace_path=path)
+            db = ExampleManager()
+            server.add_tool(db.as_async_tool(db.add), access=db.tool_access(db.add))
+            anyio.run(server.call_tool, "add", {"a": 1, "b": 2})
+            with open(path) as f:
+                record = json.loads(f.readline())
+        self.assertEqual(record["name"], "add")
+        self.assertEqual(record["status"], "ok")
+        self.assertEqual([s["name"] for s in record["spans"]], ["tool", "database", "convert"])
+
+    def test_tracing_is_off_by_default(self):
+        """Nothing is written unless tracing is enabled."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "traces.jsonl")
+            server = DBMeshMCPServer("test", trace_path=path)
+            db = ExampleManager()
+            server.add_tool(db.as_async_tool(db.add), access=db.tool_access(db.add))
+            anyio.run(server.call_tool, "add", {"a": 1, "b": 2})
+            self.assertFalse(os.path.exists(path))
+
+
+class TestStreamableHTTP(unittest.TestCase):
+    """Test cases for the stateless streamable HTTP endpoint."""
+
+    def setUp(self):
+        self.server = DBMeshMCPServer("test")
+        db = ExampleManager()
+        self.server.add_tool(db.as_async_tool(db.add), access=db.tool_access(db.add))
+
+        async def count(n: int, ctx: Context) -> int:
+            for i in range(n):
+                await ctx.report_progress(i + 1, n)
+            return n
+
+        self.server.add_tool(count)
+
+        async def next_page(cursor: str) -> str:
+            return cursor
+
+        self.server.add_tool(next_page, access=ToolAccess(database="db", read_only=True, stateful=True))
+        self.client = TestClient(self.server.sse_app())
+
+    def post(self, payload, **headers):
+        return self.client.post("/mcp", json=payload, headers=headers)
+
+    def test_initialize_creates_no_session(self):
+        response = self.post({
+            "jsonrpc": "2.0", "id": 1, "method": "initialize",
+            "params": {"protocolVersion": "2025-03-26", "capabilities": {}, "clientInfo": {"name": "c", "version": "1"}},
+        })
+        self.assertEqual(response.json()["result"]["protocolVersion"], "2025-03-26")
+        self.assertIn("tools", response.json()["result"]["capabilities"])
+        self.assertNotIn("mcp-session-id", response.headers)
+        self.assertEqual(self.post({"jsonrpc": "2.0", "method": "notifications/initialized"}).status_code, 202)
+
+    def test_each_request_is_self_contained(self):
+        response = self.post([
+            {"jsonrpc": "2.0", "id": 1, "method": "tools/call", "params": {"name": "add", "arguments": {"a": 1, "b": 2}}},
+            {"jsonrpc": "2.0", "id": 2, "method": "nope"},
+        ])
+        first, second = response.json()
+        self.assertEqual(first["result"]["content"][0]["text"], "3")
+        self.assertEqual(second["error"]["code"], -32601)
+        labels = {"tool": "add", "database": "ExampleManager", "client": "unknown", "status": "ok"}
+        self.assertEqual(self.server.metrics.tool_calls.value(**labels), 1)
+
+    def test_progress_is_streamed(self):
+        response = self.post(
+            {"jsonrpc": "2.0", "id": 7, "method": "tools/call",
+             "params": {"name": "count", "arguments": {"n": 2}, "_meta": {"progressToken": "p"}}},
+            accept="application/json, text/event-stream",
+        )
+        self.assertTrue(response.headers["content-type"].startswith("text/event-stream"))
+        events = [json.loads(line[6:]) for line in response.text.splitlines() if line.startswith("data: ")]
+        self.assertEqual([e.get("method") for e in events], ["notifications/progress"] * 2 + [None])
+        self.assertEqual(events[-1]["id"], 7)
+
+    def test_stateful_tools_are_not_served(self):
+        response = self.post({"jsonrpc": "2.0", "id": 1, "method": "tools/list"})
+        self.assertEqual(sorted(tool["name"] for tool in response.json()["result"]["tools"]), ["add", "count"])
+        response = self.post({
+            "jsonrpc": "2.0", "id": 2, "method": "tools/call", "params": {"name": "next_page", "arguments": {"cursor": "c"}},
+        })
+        result = response.json()["result"]
+        self.assertTrue(result["isError"])
+        self.assertIn("only available over SSE", result["content"][0]["text"])
+
+    def test_callers_behind_a_proxy_are_told_apart_by_header(self):
+        server = DBMeshMCPServer("test", client_rate_limit=0.001, client_rate_burst=1, http_client_header="X-Forwarded-For")
+        db = ExampleManager()
+        server.add_tool(db.as_async_tool(db.add), access=db.tool_access(db.add))
+        client = TestClient(server.sse_app())
+
+        def call(forwarded):
+            payload = {"jsonrpc": "2.0", "id": 1, "method": "tools/call", "params": {"name": "add", "arguments": {"a": 1, "b": 2}}}
+            result = client.post("/mcp", json=payload, headers={"X-Forwarded-For": forwarded}).json()["result"]
+            return result.get("isError", False)
+
+        self.assertEqual([call("10.0.0.1, 10.1.1.1"), call("10.0.0.2, 10.1.1.1"), call("10.0.0.1")], [False, False, True])
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.client.get("/mcp").status_code, 405)
+        response = self.client.post("/mcp", content=b"{")
+        self.assertEqual((response.status_code, response.json()["error"]["code"]), (400, -32700))
+
+
+if __name__ == "__main__":
+    unittest.main()